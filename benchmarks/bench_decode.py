@@ -0,0 +1,78 @@
+"""
+Compare the recursive ``decode`` with the table-driven ``fast_decode``.
+
+Usage: ``PYTHONPATH=. python benchmarks/bench_decode.py [--number N]``
+"""
+import argparse
+import timeit
+
+from sfs2x.core import (
+    Bool,
+    Buffer,
+    Byte,
+    Int,
+    Long,
+    SFSArray,
+    SFSObject,
+    Short,
+    UtfString,
+    UtfStringArray,
+    decode,
+    fast_decode,
+)
+
+
+def login_response() -> bytes:
+    return SFSObject({
+        "c": Byte(0),
+        "a": Short(1),
+        "p": {
+            "zn": UtfString("BasicExamples"),
+            "un": UtfString("Guest#1042"),
+            "pi": Short(0),
+            "id": Int(1042),
+            "rs": Short(0),
+            "rl": [[Int(i), UtfString(f"Lobby {i}"), UtfString("default"), Bool(value=False)] for i in range(20)],
+        },
+    }).to_bytes()
+
+
+def room_list() -> bytes:
+    rooms = SFSArray([
+        SFSObject({
+            "id": Int(i),
+            "n": UtfString(f"Room #{i}"),
+            "g": UtfString("games"),
+            "gm": Bool(i % 2 == 0),
+            "uc": Short(i % 16),
+            "mu": Short(16),
+            "pw": Bool(value=False),
+            "ts": Long(1_700_000_000_000 + i),
+            "rv": UtfStringArray(["mode", "ctf", "map", f"arena_{i % 7}"]),
+        })
+        for i in range(200)
+    ])
+    return SFSObject({"c": Byte(0), "a": Short(3), "p": {"rl": rooms}}).to_bytes()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--number", type=int, default=200)
+    args = parser.parse_args()
+
+    for name, raw in (("login", login_response()), ("room_list", room_list())):
+        assert fast_decode(raw) == decode(Buffer(raw))  # noqa: S101
+
+        slow = min(timeit.repeat(lambda raw=raw: decode(Buffer(raw)), number=args.number, repeat=5))
+        fast = min(timeit.repeat(lambda raw=raw: fast_decode(raw), number=args.number, repeat=5))
+
+        print(  # noqa: T201
+            f"{name:<10} {len(raw):>7} B  "
+            f"decode {slow / args.number * 1e6:9.1f} us  "
+            f"fast_decode {fast / args.number * 1e6:9.1f} us  "
+            f"x{slow / fast:.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+"""
+Benchmark suite: core serialization, protocol codec, TCP / unix socket / in-memory echo, compared with a saved baseline.
+
+Usage::
+
+    python -m benchmarks.bench_suite                    # run and compare with baseline.json
+    python -m benchmarks.bench_suite --save             # store results as the new baseline
+    python -m benchmarks.bench_suite -k codec --quick   # subset, fewer repeats
+    python -m benchmarks.bench_suite --check            # exit with status 1 on regressions
+
+Micro benchmarks report the best of several repeats (least disturbed by other processes).
+Every run also times a fixed pure-Python ``reference`` workload, and results are compared
+with the baseline relative to it, so a baseline saved on a faster or slower host (or under
+different load) still shows changes of the library itself. The committed ``baseline.json``
+stores every result with the reference time of its run, so only these ratios matter.
+"""
+import argparse
+import asyncio
+import json
+import platform
+import socket
+import sys
+import tempfile
+import time
+import timeit
+from collections.abc import Callable
+from pathlib import Path
+
+from benchmarks.corpus import CORPUS, small_system
+from sfs2x.core import dumps, loads
+from sfs2x.protocol import Message, decode, encode
+from sfs2x.transport import (
+    Acceptor,
+    MemoryAcceptor,
+    MemoryTransport,
+    TCPAcceptor,
+    TCPTransport,
+    Transport,
+    UnixAcceptor,
+    UnixTransport,
+)
+
+BASELINE = Path(__file__).with_name("baseline.json")
+REFERENCE = "reference"
+KEY = b"benchmark_key_16"
+MAX_NUMBER = 1_000_000
+
+# name -> (value, unit, whether lower is better)
+Results = dict[str, tuple[float, str, bool]]
+
+
+def _best_us(func: Callable[[], object], budget: float) -> float:
+    """Return best time of ``func`` in microseconds, spending roughly ``budget`` seconds."""
+    number, elapsed = 1, 0.0
+    while elapsed < budget / 50 and number < MAX_NUMBER:
+        number *= 2
+        elapsed = timeit.timeit(func, number=number)
+    repeat = max(3, int(budget / max(elapsed, 1e-9)))
+    return min(timeit.repeat(func, number=number, repeat=min(repeat, 50))) / number * 1e6
+
+
+def _reference_work() -> object:
+    """Run fixed interpreter workload (dicts, strings, ints), which results are measured relative to."""
+    return {f"key{i}": str(i * 7919).encode() for i in range(100)}
+
+
+def bench_reference(results: Results, budget: float) -> None:
+    results[REFERENCE] = (_best_us(_reference_work, budget), "us", True)
+
+
+def bench_core(results: Results, budget: float) -> None:
+    for name, make in CORPUS.items():
+        obj = make().to_sfs_object()
+        raw = bytes(dumps(obj))
+        results[f"core.dumps.{name}"] = (_best_us(lambda obj=obj: dumps(obj), budget), "us", True)
+        results[f"core.loads.{name}"] = (_best_us(lambda raw=raw: loads(raw), budget), "us", True)
+
+
+def bench_codec(results: Results, budget: float) -> None:
+    modes = {
+        "plain": {"compress_threshold": None},
+        "zlib": {"compress_threshold": 1024},
+        "aes": {"compress_threshold": None, "encryption_key": KEY},
+        "zlib_aes": {"compress_threshold": 1024, "encryption_key": KEY},
+    }
+    for name, make in CORPUS.items():
+        msg = make()
+        for mode, kwargs in modes.items():
+            raw = bytes(encode(msg, **kwargs))
+            key = kwargs.get("encryption_key")
+            results[f"codec.encode.{name}.{mode}"] = (_best_us(lambda msg=msg, kw=kwargs: encode(msg, **kw), budget), "us", True)
+            results[f"codec.decode.{name}.{mode}"] = (
+                _best_us(lambda raw=raw, key=key: decode(raw, encryption_key=key), budget), "us", True)
+
+
+async def _echo(acceptor: Acceptor, client: Transport, messages: int, pipeline: int) -> tuple[list[float], float]:
+    async def serve() -> None:
+        async for conn in acceptor:
+            asyncio.get_running_loop().create_task(echo(conn))
+
+    async def echo(conn: Transport) -> None:
+        async for msg in conn.listen():
+            await conn.send(msg)
+
+    server = asyncio.get_running_loop().create_task(serve())
+    await asyncio.sleep(0.1)
+    msg: Message = small_system()
+    try:
+        async with client as conn:
+            for _ in range(100):  # warm up
+                await conn.send(msg)
+                await conn.recv()
+
+            latencies = []
+            for _ in range(messages):
+                start = time.perf_counter()
+                await conn.send(msg)
+                await conn.recv()
+                latencies.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            for _ in range(messages // pipeline):
+                await conn.send_many([msg] * pipeline)
+                for _ in range(pipeline):
+                    await conn.recv()
+            throughput = messages // pipeline * pipeline / (time.perf_counter() - start)
+    finally:
+        server.cancel()
+    return latencies, throughput
+
+
+def _echo_results(results: Results, prefix: str, latencies: list[float], throughput: float) -> None:
+    latencies.sort()
+    results[f"{prefix}.p50"] = (latencies[len(latencies) // 2] * 1e6, "us", True)
+    results[f"{prefix}.p99"] = (latencies[int(len(latencies) * 0.99)] * 1e6, "us", True)
+    results[f"{prefix}.throughput"] = (throughput, "msg/s", False)
+
+
+def bench_tcp(results: Results, messages: int) -> None:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    acceptor, client = TCPAcceptor("127.0.0.1", port), TCPTransport("127.0.0.1", port)
+    _echo_results(results, "tcp.echo", *asyncio.run(_echo(acceptor, client, messages, pipeline=32)))
+
+
+def bench_unix(results: Results, messages: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = f"{tmp}/bench.sock"
+        acceptor, client = UnixAcceptor(path), UnixTransport(path)
+        _echo_results(results, "unix.echo", *asyncio.run(_echo(acceptor, client, messages, pipeline=32)))
+
+
+def bench_mem(results: Results, messages: int) -> None:
+    """Echo without sockets: codec and transport overhead only, and with codec skipped."""
+    acceptor, client = MemoryAcceptor("bench"), MemoryTransport("bench")
+    _echo_results(results, "mem.echo", *asyncio.run(_echo(acceptor, client, messages, pipeline=32)))
+    acceptor, client = MemoryAcceptor("bench", skip_codec=True), MemoryTransport("bench", skip_codec=True)
+    _echo_results(results, "mem.echo_skip_codec", *asyncio.run(_echo(acceptor, client, messages, pipeline=32)))
+
+
+def _relative(value: float, reference: float, lower_is_better: bool) -> float:  # noqa: FBT001
+    """Express result in units of the reference workload time (or per it, for rates)."""
+    return value / reference if lower_is_better else value * reference
+
+
+def compare(results: Results, baseline: dict, tolerance: float) -> bool:
+    """Print results next to baseline, relative to ``reference`` of each run, return whether nothing regressed."""
+    ok = True
+    ref = results[REFERENCE][0]
+    for name, (value, unit, lower_is_better) in results.items():
+        base = baseline.get("results", {}).get(name)
+        if name == REFERENCE or base is None or not base["value"] or not base.get(REFERENCE):
+            print(f"{name:<40} {value:12.1f} {unit:<6}" + ("" if name == REFERENCE else " (no baseline)"))  # noqa: T201
+            continue
+        change = _relative(value, ref, lower_is_better) / _relative(base["value"], base[REFERENCE], lower_is_better) - 1
+        worse = change > tolerance if lower_is_better else change < -tolerance
+        ok &= not worse
+        mark = "REGRESSION" if worse else ""
+        print(f"{name:<40} {value:12.1f} {unit:<6} baseline {base['value']:12.1f} {change:+7.1%} relative {mark}")  # noqa: T201
+    return ok
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-k", dest="select", default="", help="run benchmarks, which names contain this substring")
+    parser.add_argument("--quick", action="store_true", help="spend less time per benchmark")
+    parser.add_argument("--save", action="store_true", help="store results as baseline")
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative slowdown, 0.2 = 20%%")
+    parser.add_argument("--check", action="store_true", help="exit with status 1, when any result regressed")
+    args = parser.parse_args()
+
+    budget = 0.05 if args.quick else 0.3
+    results: Results = {}
+    bench_reference(results, budget)
+    groups = {
+        "core": lambda: bench_core(results, budget),
+        "codec": lambda: bench_codec(results, budget),
+        "tcp": lambda: bench_tcp(results, 500 if args.quick else 5000),
+        "unix": lambda: bench_unix(results, 500 if args.quick else 5000),
+        "mem": lambda: bench_mem(results, 500 if args.quick else 5000),
+    }
+    # Selection naming a group runs just it, other selections filter names of all benchmarks.
+    named = [group for group in groups if args.select and args.select in group]
+    for group, run in groups.items():
+        if not named or group in named:
+            run()
+    results = {name: r for name, r in results.items() if args.select in name or name == REFERENCE}
+
+    baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+    ok = compare(results, baseline, args.tolerance)
+
+    if args.save:
+        stored = baseline.get("results", {}) if args.select else {}
+        ref = results.pop(REFERENCE)[0]
+        stored.update({
+            name: {"value": round(value, 3), "unit": unit, REFERENCE: round(ref, 3)} for name, (value, unit, _) in results.items()
+        })
+        args.baseline.write_text(json.dumps({
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "results": stored,
+        }, indent=2) + "\n")
+    elif args.check and not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
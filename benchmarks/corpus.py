@@ -0,0 +1,87 @@
+"""Payload corpus of benchmarks: shapes of real traffic, from tiny system messages to large arrays."""
+from sfs2x.core import (
+    Bool,
+    ByteArray,
+    Double,
+    DoubleArray,
+    Int,
+    IntArray,
+    Long,
+    SFSArray,
+    SFSObject,
+    Short,
+    UtfString,
+    UtfStringArray,
+)
+from sfs2x.protocol import ControllerID, Message, SysAction
+
+
+def small_system() -> Message:
+    """Handshake-sized system message."""
+    return Message(ControllerID.SYSTEM, SysAction.HANDSHAKE, SFSObject({
+        "api": UtfString("1.7.8"),
+        "cl": UtfString("UnityPlayer::"),
+        "bin": Bool(value=True),
+    }))
+
+
+def deep_extension(depth: int = 8) -> Message:
+    """Extension response with nested objects, like inventories or quest trees."""
+    node = SFSObject({"leaf": Bool(value=True), "v": Double(0.5)})
+    for i in range(depth):
+        node = SFSObject({
+            "lvl": Int(i),
+            "name": UtfString(f"node_{i}"),
+            "tags": UtfStringArray(["a", "b", "c"]),
+            "stats": SFSObject({"hp": Short(100 + i), "mp": Short(50 + i), "xp": Long(10**9 + i)}),
+            "child": node,
+            "siblings": SFSArray([SFSObject({"id": Int(j), "w": Double(j / 3)}) for j in range(4)]),
+        })
+    return Message.extension("inventory", node)
+
+
+def numeric_arrays(size: int = 10_000) -> Message:
+    """Extension response with large numeric arrays, like height maps or replays."""
+    return Message.extension("terrain", SFSObject({
+        "h": IntArray([(i * 7919) % 65_536 for i in range(size)]),
+        "w": DoubleArray([i / 7 for i in range(size)]),
+    }))
+
+
+def room_list(rooms: int = 200) -> Message:
+    """String-heavy room list, as sent to a user joining a zone."""
+    return Message(ControllerID.SYSTEM, SysAction.LOGIN, SFSObject({
+        "rl": SFSArray([
+            SFSObject({
+                "id": Int(i),
+                "n": UtfString(f"Room #{i}"),
+                "g": UtfString("games"),
+                "gm": Bool(i % 2 == 0),
+                "uc": Short(i % 16),
+                "mu": Short(16),
+                "pw": Bool(value=False),
+                "ts": Long(1_700_000_000_000 + i),
+                "rv": UtfStringArray(["mode", "ctf", "map", f"arena_{i % 7}"]),
+            })
+            for i in range(rooms)
+        ]),
+    }))
+
+
+def blob(size: int = 64 * 1024) -> Message:
+    """Already compressed binary, which zlib can't shrink."""
+    state = 0x2545F491
+    data = bytearray()
+    for _ in range(size // 4):
+        state = (state * 1_103_515_245 + 12_345) & 0xFFFF_FFFF
+        data += state.to_bytes(4, "big")
+    return Message.extension("asset", SFSObject({"name": UtfString("atlas.png"), "data": ByteArray(bytes(data))}))
+
+
+CORPUS = {
+    "small_system": small_system,
+    "deep_extension": deep_extension,
+    "numeric_arrays": numeric_arrays,
+    "room_list": room_list,
+    "blob": blob,
+}
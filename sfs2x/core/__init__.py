@@ -22,8 +22,14 @@ from sfs2x.core.types import (
 )
 
 from .buffer import Buffer
-from .registry import _registry, decode, register
+from .decoder import fast_decode, loads
+from .keys import KeyCache, KeyCacheStats, key_cache
+from .lazy import LazySFSArray, LazySFSObject, lazy_decode
+from .profiler import PayloadProfiler, ShapeStats, TypeStats, payload_profiler, set_payload_profiler
+from .registry import _registry, decode, dumps, register
+from .schema import is_schema, schema
 from .type_codes import TypeCode
+from .writer import Writer
 
 __all__ = [
     "Bool",
@@ -38,18 +44,35 @@ __all__ = [
     "FloatArray",
     "Int",
     "IntArray",
+    "KeyCache",
+    "KeyCacheStats",
+    "LazySFSArray",
+    "LazySFSObject",
     "Long",
     "LongArray",
+    "PayloadProfiler",
     "SFSArray",
     "SFSObject",
+    "ShapeStats",
     "Short",
     "ShortArray",
     "Text",
     "TypeCode",
+    "TypeStats",
     "UtfString",
     "UtfStringArray",
+    "Writer",
     "decode",
+    "dumps",
+    "fast_decode",
+    "is_schema",
+    "key_cache",
+    "lazy_decode",
+    "loads",
+    "payload_profiler",
     "register",
+    "schema",
+    "set_payload_profiler",
 ]
 
 
@@ -65,7 +88,7 @@ def patch_containers() -> None:  # noqa: C901
         def _make_put(tp: Any = _cls) -> Callable:  # noqa: ANN401
             # noinspection PyTypeChecker,PyArgumentList
             def _put_x(self: SFSObject, key: str, value: Any) -> SFSObject:  # noqa: ANN401
-                if type(value) not in (SFSObject, SFSArray):
+                if not isinstance(value, SFSObject | SFSArray):
                     return self.put(key, tp(value))
                 if type(value) is list:
                     return self.put(key, SFSArray(value))
@@ -77,7 +100,7 @@ def patch_containers() -> None:  # noqa: C901
 
         def _make_add(tp: Any = _cls) -> Callable:  # noqa: ANN401
             def _add_x(self: SFSArray, value: Any) -> SFSArray:  # noqa: ANN401
-                if type(value) not in (SFSObject, SFSArray):
+                if not isinstance(value, SFSObject | SFSArray):
                     return self.add(tp(value))
                 if type(value) is list:
                     return self.add(SFSArray(value))
@@ -1,3 +1,16 @@
+import struct
+
+from .keys import key_cache
+
+_U8 = struct.Struct(">B")
+_I8 = struct.Struct(">b")
+_U16 = struct.Struct(">H")
+_I16 = struct.Struct(">h")
+_U32 = struct.Struct(">I")
+_I32 = struct.Struct(">i")
+_I64 = struct.Struct(">q")
+_F32 = struct.Struct("f")
+_F64 = struct.Struct("d")
 
 
 class Buffer:
@@ -29,5 +42,64 @@ class Buffer:
     def seek(self, pos: int) -> None:
         self._pos = pos
 
+    # Typed reads unpack straight from the underlying buffer, without slicing it.
+
+    def _unpack(self, unpacker: struct.Struct) -> int | float:
+        try:
+            value = unpacker.unpack_from(self._mv, self._pos)[0]
+        except struct.error:
+            msg = "Buffer overflow"
+            raise EOFError(msg) from None
+        self._pos += unpacker.size
+        return value
+
+    def read_u8(self) -> int:
+        return self._unpack(_U8)  # type: ignore[return-value]
+
+    def read_i8(self) -> int:
+        return self._unpack(_I8)  # type: ignore[return-value]
+
+    def read_u16(self) -> int:
+        return self._unpack(_U16)  # type: ignore[return-value]
+
+    def read_i16(self) -> int:
+        return self._unpack(_I16)  # type: ignore[return-value]
+
+    def read_u32(self) -> int:
+        return self._unpack(_U32)  # type: ignore[return-value]
 
+    def read_i32(self) -> int:
+        return self._unpack(_I32)  # type: ignore[return-value]
 
+    def read_i64(self) -> int:
+        return self._unpack(_I64)  # type: ignore[return-value]
+
+    def read_f32(self) -> float:
+        return self._unpack(_F32)
+
+    def read_f64(self) -> float:
+        return self._unpack(_F64)
+
+    def read_utf(self) -> str:
+        """Read UTF-8 string with 16-bit length."""
+        return self._read_str(self.read_u16())
+
+    def read_text(self) -> str:
+        """Read UTF-8 string with 32-bit length."""
+        return self._read_str(self.read_u32())
+
+    def read_key(self) -> str:
+        """Read SFSObject key (like ``read_utf``) through the key cache."""
+        n = self.read_u16()
+        key = key_cache.decode(self._mv, self._pos, n)
+        self._pos += n
+        return key
+
+    def _read_str(self, n: int) -> str:
+        end = self._pos + n
+        if end > len(self._mv):
+            msg = "Buffer overflow"
+            raise EOFError(msg)
+        value = str(self._mv[self._pos:end], "utf-8")
+        self._pos = end
+        return value
@@ -0,0 +1,432 @@
+"""
+Table-driven decoder for SFS2X binary payloads.
+
+Walks the payload with precompiled ``struct`` unpackers and plain offset arithmetic,
+building containers iteratively (with an explicit stack) instead of recursing through
+``registry.decode`` and ``from_buffer``. Produces the same ``Field`` trees.
+"""
+import struct
+from collections.abc import Callable
+from typing import Any
+
+from .buffer import Buffer
+from .field import Field
+from .keys import key_cache
+from .registry import Packable
+from .type_codes import TypeCode
+from .types import (
+    Bool,
+    BoolArray,
+    Byte,
+    ByteArray,
+    Double,
+    DoubleArray,
+    Float,
+    FloatArray,
+    Int,
+    IntArray,
+    Long,
+    LongArray,
+    SFSArray,
+    SFSObject,
+    Short,
+    ShortArray,
+    Text,
+    UtfString,
+    UtfStringArray,
+)
+from .types.arrays import ArrayView, unpack_numbers
+
+__all__ = ["fast_decode", "loads", "read_leaf", "skip_value"]
+
+_U16 = struct.Struct(">H")
+_U32 = struct.Struct(">I")
+_I8 = struct.Struct(">b")
+_I16 = struct.Struct(">h")
+_I32 = struct.Struct(">i")
+_I64 = struct.Struct(">q")
+_F32 = struct.Struct("f")
+_F64 = struct.Struct("d")
+
+_OBJECT = int(TypeCode.SFS_OBJECT)
+_ARRAY = int(TypeCode.SFS_ARRAY)
+
+_new = object.__new__
+
+LeafReader = Callable[[memoryview, int], tuple[Field, int]]
+
+
+def _read_str(mv: memoryview, pos: int, ln: int) -> str:
+    end = pos + ln
+    if end > len(mv):
+        msg = "Buffer overflow"
+        raise EOFError(msg)
+    return str(mv[pos:end], "utf-8")
+
+
+def _scalar(cls: type[Field], unpacker: struct.Struct) -> LeafReader:
+    unpack_from = unpacker.unpack_from
+    size = unpacker.size
+
+    def _read(mv: memoryview, pos: int) -> tuple[Field, int]:
+        return cls(unpack_from(mv, pos)[0]), pos + size
+
+    return _read
+
+
+def _numeric_array(cls: type[Field] | None, order: str, fmt: str, view: ArrayView) -> LeafReader:
+    """Return reader of numeric array, which returns plain values without ``cls``."""
+    size = struct.calcsize(fmt)
+
+    def _read(mv: memoryview, pos: int) -> tuple[Any, int]:
+        end = pos + 2 + _U16.unpack_from(mv, pos)[0] * size
+        if end > len(mv):
+            msg = "Buffer overflow"
+            raise EOFError(msg)
+        values = unpack_numbers(mv[pos + 2:end], order, fmt, view)
+        return (cls(values) if cls is not None else values), end
+
+    return _read
+
+
+def _read_bool(mv: memoryview, pos: int) -> tuple[Field, int]:
+    return Bool(bool(mv[pos])), pos + 1
+
+
+def _plain_utf_string(mv: memoryview, pos: int) -> tuple[Any, int]:
+    ln = _U16.unpack_from(mv, pos)[0]
+    pos += 2
+    return _read_str(mv, pos, ln), pos + ln
+
+
+def _read_utf_string(mv: memoryview, pos: int) -> tuple[Field, int]:
+    value, pos = _plain_utf_string(mv, pos)
+    return UtfString(value), pos
+
+
+def _plain_text(mv: memoryview, pos: int) -> tuple[Any, int]:
+    ln = _U32.unpack_from(mv, pos)[0]
+    pos += 4
+    return _read_str(mv, pos, ln), pos + ln
+
+
+def _read_text(mv: memoryview, pos: int) -> tuple[Field, int]:
+    value, pos = _plain_text(mv, pos)
+    return Text(value), pos
+
+
+def _plain_bool_array(mv: memoryview, pos: int) -> tuple[Any, int]:
+    n = _U16.unpack_from(mv, pos)[0]
+    pos += 2
+    if pos + n > len(mv):
+        msg = "Buffer overflow"
+        raise EOFError(msg)
+    return [bool(b) for b in mv[pos:pos + n]], pos + n
+
+
+def _read_bool_array(mv: memoryview, pos: int) -> tuple[Field, int]:
+    value, pos = _plain_bool_array(mv, pos)
+    return BoolArray(value), pos
+
+
+def _read_byte_array(mv: memoryview, pos: int) -> tuple[Field, int]:
+    n = _U32.unpack_from(mv, pos)[0]
+    pos += 4
+    if pos + n > len(mv):
+        msg = "Buffer overflow"
+        raise EOFError(msg)
+    return ByteArray(mv[pos:pos + n]), pos + n
+
+
+def _plain_utf_string_array(mv: memoryview, pos: int) -> tuple[Any, int]:
+    n = _U16.unpack_from(mv, pos)[0]
+    pos += 2
+    arr = []
+    for _ in range(n):
+        ln = _U16.unpack_from(mv, pos)[0]
+        pos += 2
+        arr.append(_read_str(mv, pos, ln))
+        pos += ln
+    return arr, pos
+
+
+def _read_utf_string_array(mv: memoryview, pos: int) -> tuple[Field, int]:
+    value, pos = _plain_utf_string_array(mv, pos)
+    return UtfStringArray(value), pos
+
+
+_LEAF_READERS: dict[int, LeafReader] = {
+    TypeCode.BOOL: _read_bool,
+    TypeCode.BYTE: _scalar(Byte, _I8),
+    TypeCode.SHORT: _scalar(Short, _I16),
+    TypeCode.INT: _scalar(Int, _I32),
+    TypeCode.LONG: _scalar(Long, _I64),
+    TypeCode.FLOAT: _scalar(Float, _F32),
+    TypeCode.DOUBLE: _scalar(Double, _F64),
+    TypeCode.UTF_STRING: _read_utf_string,
+    TypeCode.TEXT: _read_text,
+    TypeCode.BOOL_ARRAY: _read_bool_array,
+    TypeCode.BYTE_ARRAY: _read_byte_array,
+    TypeCode.UTF_STRING_ARRAY: _read_utf_string_array,
+}
+
+_NUMERIC_ARRAYS: dict[int, tuple[type[Field], str, str]] = {
+    TypeCode.SHORT_ARRAY: (ShortArray, ">", "h"),
+    TypeCode.INT_ARRAY: (IntArray, ">", "i"),
+    TypeCode.LONG_ARRAY: (LongArray, ">", "q"),
+    TypeCode.FLOAT_ARRAY: (FloatArray, "=", "f"),
+    TypeCode.DOUBLE_ARRAY: (DoubleArray, "=", "d"),
+}
+
+_READERS_BY_VIEW: dict[str, dict[int, LeafReader]] = {}
+
+
+def _readers(view: ArrayView) -> dict[int, LeafReader]:
+    try:
+        return _READERS_BY_VIEW[view]
+    except KeyError:
+        if view not in ("list", "array", "numpy"):
+            msg = f"Unknown array view: {view!r}"
+            raise ValueError(msg) from None
+    readers = _LEAF_READERS | {tc: _numeric_array(*spec, view) for tc, spec in _NUMERIC_ARRAYS.items()}
+    _READERS_BY_VIEW[view] = readers
+    return readers
+
+
+def _plain_scalar(unpacker: struct.Struct) -> LeafReader:
+    unpack_from = unpacker.unpack_from
+    size = unpacker.size
+
+    def _read(mv: memoryview, pos: int) -> tuple[Any, int]:
+        return unpack_from(mv, pos)[0], pos + size
+
+    return _read
+
+
+def _plain_byte_array(mv: memoryview, pos: int) -> tuple[Any, int]:
+    n = _U32.unpack_from(mv, pos)[0]
+    pos += 4
+    if pos + n > len(mv):
+        msg = "Buffer overflow"
+        raise EOFError(msg)
+    return bytes(mv[pos:pos + n]), pos + n
+
+
+_PLAIN_READERS_BY_VIEW: dict[str, dict[int, LeafReader]] = {}
+
+
+def _plain_readers(view: ArrayView) -> dict[int, LeafReader]:
+    """Leaf readers, which return plain Python values instead of fields."""
+    try:
+        return _PLAIN_READERS_BY_VIEW[view]
+    except KeyError:
+        _readers(view)  # validates view
+    readers: dict[int, LeafReader] = {
+        TypeCode.BOOL: lambda mv, pos: (bool(mv[pos]), pos + 1),
+        TypeCode.BYTE: _plain_scalar(_I8),
+        TypeCode.SHORT: _plain_scalar(_I16),
+        TypeCode.INT: _plain_scalar(_I32),
+        TypeCode.LONG: _plain_scalar(_I64),
+        TypeCode.FLOAT: _plain_scalar(_F32),
+        TypeCode.DOUBLE: _plain_scalar(_F64),
+        TypeCode.UTF_STRING: _plain_utf_string,
+        TypeCode.TEXT: _plain_text,
+        TypeCode.BOOL_ARRAY: _plain_bool_array,
+        TypeCode.BYTE_ARRAY: _plain_byte_array,
+        TypeCode.UTF_STRING_ARRAY: _plain_utf_string_array,
+    } | {tc: _numeric_array(None, order, fmt, view) for tc, (_, order, fmt) in _NUMERIC_ARRAYS.items()}
+    _PLAIN_READERS_BY_VIEW[view] = readers
+    return readers
+
+
+_FIXED_SIZES: dict[int, int] = {
+    TypeCode.BOOL: 1,
+    TypeCode.BYTE: 1,
+    TypeCode.SHORT: 2,
+    TypeCode.INT: 4,
+    TypeCode.LONG: 8,
+    TypeCode.FLOAT: 4,
+    TypeCode.DOUBLE: 8,
+}
+
+_ELEM_SIZES: dict[int, int] = {
+    TypeCode.BOOL_ARRAY: 1,
+    TypeCode.SHORT_ARRAY: 2,
+    TypeCode.INT_ARRAY: 4,
+    TypeCode.LONG_ARRAY: 8,
+    TypeCode.FLOAT_ARRAY: 4,
+    TypeCode.DOUBLE_ARRAY: 8,
+}
+
+
+def skip_value(mv: memoryview, pos: int) -> int:  # noqa: C901, PLR0912
+    """Return end offset of value which type code is at ``pos``, without decoding it."""
+    u16 = _U16.unpack_from
+    u32 = _U32.unpack_from
+    # Each frame is [remaining children, is_object].
+    stack: list[list[Any]] = []
+
+    try:
+        while True:
+            if stack:
+                frame = stack[-1]
+                if frame[0] == 0:
+                    stack.pop()
+                    if not stack:
+                        break
+                    continue
+                frame[0] -= 1
+                if frame[1]:
+                    pos += 2 + u16(mv, pos)[0]
+
+            tc = mv[pos]
+            pos += 1
+
+            if tc in _FIXED_SIZES:
+                pos += _FIXED_SIZES[tc]
+            elif tc in _ELEM_SIZES:
+                pos += 2 + u16(mv, pos)[0] * _ELEM_SIZES[tc]
+            elif tc == TypeCode.UTF_STRING:
+                pos += 2 + u16(mv, pos)[0]
+            elif tc in (TypeCode.TEXT, TypeCode.BYTE_ARRAY):
+                pos += 4 + u32(mv, pos)[0]
+            elif tc == TypeCode.UTF_STRING_ARRAY:
+                count = u16(mv, pos)[0]
+                pos += 2
+                for _ in range(count):
+                    pos += 2 + u16(mv, pos)[0]
+            elif tc in (_OBJECT, _ARRAY):
+                stack.append([u16(mv, pos)[0], tc == _OBJECT])
+                pos += 2
+            else:
+                msg = "Unknown type"
+                raise ValueError(msg)
+
+            if not stack:
+                break
+    except (IndexError, struct.error) as e:
+        msg = "Buffer overflow"
+        raise EOFError(msg) from e
+
+    if pos > len(mv):
+        msg = "Buffer overflow"
+        raise EOFError(msg)
+    return pos
+
+
+def read_leaf(mv: memoryview, pos: int) -> tuple[Field, int]:
+    """Decode non-container value which type code is at ``pos``, return it with end offset."""
+    try:
+        reader = _readers("list")[mv[pos]]
+    except KeyError:
+        msg = "Unknown type"
+        raise ValueError(msg) from None
+    return reader(mv, pos + 1)
+
+
+def _decode(mv: memoryview, pos: int, readers: dict[int, LeafReader], *, native: bool = False) -> tuple[Any, int]:  # noqa: C901, PLR0912, PLR0915
+    u16 = _U16.unpack_from
+    # Key cache lookup is inlined, misses (and bounds errors) go through ``key_cache.decode``.
+    known_keys = key_cache._decoded  # noqa: SLF001
+    hashable = type(mv.obj) is bytes
+    size = len(mv)
+    hits = 0
+
+    root: Any = None
+    # Each frame is [children (dict | list), remaining children, is_object].
+    stack: list[list[Any]] = []
+    key = ""
+
+    while True:
+        if stack:
+            frame = stack[-1]
+            if frame[1] == 0:
+                stack.pop()
+                if not stack:
+                    key_cache.hits += hits
+                    return root, pos
+                continue
+            frame[1] -= 1
+            if frame[2]:
+                ln = u16(mv, pos)[0]
+                pos += 2
+                end = pos + ln
+                raw = mv[pos:end]
+                key = known_keys.get(raw if hashable else bytes(raw))
+                if key is None or end > size:
+                    key = key_cache.decode(mv, pos, ln)
+                else:
+                    hits += 1
+                pos = end
+
+        tc = mv[pos]
+        pos += 1
+
+        reader = readers.get(tc)
+        if reader is not None:
+            value, pos = reader(mv, pos)
+        elif tc in (_OBJECT, _ARRAY):
+            count = u16(mv, pos)[0]
+            pos += 2
+            is_object = tc == _OBJECT
+            children: dict[str, Any] | list[Any] = {} if is_object else []
+            if native:
+                value = children
+            else:
+                value = _new(SFSObject if is_object else SFSArray)
+                value.value = children
+            stack.append([children, count, is_object])
+        elif tc == TypeCode.CLASS:
+            msg = "Class not implemented yet"
+            raise NotImplementedError(msg)
+        else:
+            msg = "Unknown type"
+            raise ValueError(msg)
+
+        if root is None:
+            root = value
+            if reader is not None:
+                return root, pos
+        else:
+            # Frame belongs to the parent when the value itself is a container.
+            parent = stack[-2] if reader is None else stack[-1]
+            if parent[2]:
+                parent[0][key] = value
+            else:
+                parent[0].append(value)
+
+
+def fast_decode(data: bytes | bytearray | memoryview | Buffer, *, array_view: ArrayView = "list") -> Packable:
+    """
+    Decode raw bytes (or buffer at its current position) into Packable.
+
+    ``array_view`` controls how numeric arrays are returned, see ``unpack_numbers``.
+    """
+    return loads(data, array_view=array_view)
+
+
+def loads(data: bytes | bytearray | memoryview | Buffer, *, raw: bool = False, array_view: ArrayView = "list") -> Any:  # noqa: ANN401
+    """
+    Decode raw bytes (or buffer at its current position).
+
+    With ``raw=True`` returns plain Python values: ``dict``, ``list``, ``bool``, ``int``, ``float``,
+    ``str`` and ``bytes`` (for ByteArray), numeric arrays are returned as ``array_view`` says.
+    Otherwise, returns fields, like ``fast_decode``.
+    """
+    if isinstance(data, Buffer):
+        mv, pos = data._mv, data._pos  # noqa: SLF001
+    else:
+        mv, pos = memoryview(data), 0
+
+    try:
+        if raw:
+            value, pos = _decode(mv, pos, _plain_readers(array_view), native=True)
+        else:
+            value, pos = _decode(mv, pos, _readers(array_view))
+    except (IndexError, struct.error) as e:
+        msg = "Buffer overflow"
+        raise EOFError(msg) from e
+
+    if isinstance(data, Buffer):
+        data.seek(pos)
+    return value
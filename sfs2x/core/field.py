@@ -15,6 +15,12 @@ class Field(Packable, Generic[T]):
     value: T
 
     def to_bytes(self) -> bytearray:
+        out = bytearray()
+        self.write_into(out)
+        return out
+
+    def write_into(self, out: bytearray, /) -> None:
+        """Append serialized field to the end of ``out``."""
         raise NotImplementedError
 
     @classmethod
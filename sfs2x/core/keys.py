@@ -0,0 +1,134 @@
+"""
+Cache of SFSObject keys.
+
+Payloads reuse a small vocabulary of keys, so every key is UTF-8 encoded (with its 16-bit
+length prefix) only once, and decoded keys are looked up by their raw bytes and shared
+instead of decoding a fresh ``str`` each time.
+
+Keys may come from the network, so the cache admits a key only on its second miss (one-off
+keys never enter it), skips keys longer than ``max_key_length`` bytes, and once a table holds
+``maxsize`` keys, it drops all but seeded ones, so keys in use are soon cached again instead
+of the table staying filled with whatever came first.
+
+Hits of hot paths (serializers and ``fast_decode``) are counted in bulk, once per container
+or payload, not per key.
+"""
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+__all__ = ["KeyCache", "KeyCacheStats", "key_cache"]
+
+
+@dataclass(slots=True)
+class KeyCacheStats:
+    """Snapshot of key cache counters."""
+
+    hits: int
+    misses: int
+    encoded_keys: int
+    decoded_keys: int
+    flushes: int = 0  # times a full table was emptied
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class KeyCache:
+    """Bounded two-way table of keys: ``str`` → length-prefixed UTF-8 and raw UTF-8 → ``str``."""
+
+    __slots__ = (
+        "_candidates", "_decoded", "_encoded", "_seeded", "flushes", "hits", "max_key_length", "maxsize", "misses",
+    )
+
+    def __init__(self, maxsize: int = 4096, max_key_length: int = 64) -> None:
+        self.maxsize = maxsize
+        self.max_key_length = max_key_length
+        # Tables are never replaced, only cleared, decoder keeps references to them.
+        self._encoded: dict[str, bytes] = {}
+        self._decoded: dict[bytes, str] = {}
+        self._seeded: dict[str, bytes] = {}
+        self._candidates: set[str | bytes] = set()  # keys missed once
+        self.hits = 0
+        self.misses = 0
+        self.flushes = 0
+
+    def encode(self, key: str) -> bytes:
+        """Return key as UTF-8 with 16-bit length prefix."""
+        try:
+            encoded = self._encoded[key]
+        except KeyError:
+            self.misses += 1
+            raw = key.encode("utf-8")
+            encoded = len(raw).to_bytes(2, "big") + raw
+            if len(raw) <= self.max_key_length and self._admit(key, self._encoded):
+                self._encoded[key] = encoded
+            return encoded
+        self.hits += 1
+        return encoded
+
+    def decode(self, mv: memoryview, pos: int, n: int) -> str:
+        """Return key, which UTF-8 bytes are ``mv[pos:pos + n]``."""
+        end = pos + n
+        if end > len(mv):
+            msg = "Buffer overflow"
+            raise EOFError(msg)
+        # Views are hashable only over immutable objects.
+        raw = mv[pos:end] if type(mv.obj) is bytes else bytes(mv[pos:end])
+        try:
+            key = self._decoded[raw]
+        except KeyError:
+            self.misses += 1
+            key = str(raw, "utf-8")
+            if n <= self.max_key_length:
+                raw = bytes(raw)
+                if self._admit(raw, self._decoded):
+                    self._decoded[raw] = key
+            return key
+        self.hits += 1
+        return key
+
+    def _admit(self, key: str | bytes, table: dict) -> bool:
+        """Return whether missed key should be cached, making room in a full ``table``."""
+        candidates = self._candidates
+        if key not in candidates:
+            if len(candidates) >= self.maxsize:
+                candidates.clear()
+            candidates.add(key)
+            return False
+        candidates.discard(key)
+        if len(table) >= self.maxsize:
+            self._flush(table)
+        return True
+
+    def _flush(self, table: dict) -> None:
+        self.flushes += 1
+        table.clear()
+        if table is self._encoded:
+            table.update(self._seeded)
+        else:
+            table.update((encoded[2:], key) for key, encoded in self._seeded.items())
+
+    def seed(self, keys: Iterable[str]) -> None:
+        """Pre-populate both tables with known keys (ignoring ``maxsize``), they survive flushes."""
+        for key in keys:
+            raw = key.encode("utf-8")
+            encoded = len(raw).to_bytes(2, "big") + raw
+            self._seeded[key] = self._encoded[key] = encoded
+            self._decoded[raw] = key
+
+    def stats(self) -> KeyCacheStats:
+        return KeyCacheStats(self.hits, self.misses, len(self._encoded), len(self._decoded), self.flushes)
+
+    def clear(self) -> None:
+        """Drop cached and seeded keys and reset counters."""
+        self._encoded.clear()
+        self._decoded.clear()
+        self._seeded.clear()
+        self._candidates.clear()
+        self.hits = self.misses = self.flushes = 0
+
+
+key_cache = KeyCache()
+key_cache.seed(("c", "a", "p", "r"))
@@ -0,0 +1,424 @@
+"""
+Lazy containers, which decode their values on first access.
+
+Entries are indexed incrementally: the first lookup in an object skims its entries (without
+decoding values), so a duplicated key resolves to the last value, as in eager decode. Nested
+``SFSObject`` and ``SFSArray`` values stay lazy the same way until touched.
+
+Lazy containers keep their original wire slice: untouched containers (and untouched entries
+of modified ones) are written back by copying those bytes verbatim.
+"""
+import struct
+from collections.abc import Iterator
+from itertools import pairwise
+from typing import Any
+
+from .buffer import Buffer
+from .decoder import read_leaf, skip_value
+from .field import Field
+from .keys import key_cache
+from .registry import Packable
+from .type_codes import TypeCode
+from .types import ByteArray, SFSArray, SFSObject
+
+__all__ = ["LazySFSArray", "LazySFSObject", "lazy_decode"]
+
+_U16 = struct.Struct(">H")
+
+# Slot, which stores materialized ``value`` (shadowed by properties below).
+_VALUE = Field.__dict__["value"]
+
+
+_IMMUTABLE = (int, float, str, bytes)
+
+
+def _is_clean(field: Field) -> bool:
+    """Check that cached field can't have been changed since it was decoded."""
+    if isinstance(field, LazySFSObject | LazySFSArray):
+        return not field.dirty
+    return type(field) is ByteArray or isinstance(field.value, _IMMUTABLE)
+
+
+def _load(src: memoryview, start: int, end: int = -1) -> Field:
+    """Load value at ``start``, containers with unknown ``end`` find it themselves when needed."""
+    tc = src[start]
+    if tc == TypeCode.SFS_OBJECT:
+        return LazySFSObject.from_wire(src[start:end], end - start) if end >= 0 else LazySFSObject.from_wire(src[start:])
+    if tc == TypeCode.SFS_ARRAY:
+        return LazySFSArray.from_wire(src[start:end], end - start) if end >= 0 else LazySFSArray.from_wire(src[start:])
+    return read_leaf(src, start)[0]
+
+
+class LazySFSObject(SFSObject):
+    """SFSObject, which decodes values only when they are accessed."""
+
+    __slots__ = ("_cache", "_count", "_dirty", "_end", "_index", "_last", "_next", "_pending", "_src", "_tail")
+
+    _src: memoryview
+    _dirty: bool
+    _index: dict[str, int] | None  # key -> offset of value, -1 for keys added after decoding
+    _cache: dict[str, Field]
+    _count: int  # entries on the wire
+    _pending: int  # entries, which are not indexed yet
+    _next: int  # offset of first not indexed entry
+    _tail: int  # offset of last indexed value, if its end is not known yet
+    _last: int  # offset of last value on the wire, once indexed
+    _end: int  # end of the object, -1 while not known
+
+    @classmethod
+    def from_wire(cls, raw: memoryview, end: int = -1) -> "LazySFSObject":
+        """Wrap serialized SFSObject (starting with type code), ``raw`` may continue after it if ``end`` is unknown."""
+        self = object.__new__(cls)
+        self._src = raw
+        self._dirty = False
+        self._index = {}
+        self._cache = {}
+        self._count = self._pending = _U16.unpack_from(raw, 1)[0]
+        self._next = 3
+        self._tail = self._last = -1
+        self._end = end
+        return self
+
+    @property
+    def raw(self) -> memoryview | None:
+        """Original wire slice (with type code), ``None`` once the object was materialized."""
+        if self._index is None:
+            return None
+        return self._src[:self._wire_end()]
+
+    @property
+    def dirty(self) -> bool:
+        """Check whether the object may differ from its original wire slice."""
+        return self._index is None or self._dirty or not all(map(_is_clean, self._cache.values()))
+
+    def write_into(self, out: bytearray, /) -> None:
+        if self._index is None:
+            super().write_into(out)
+            return
+        if not self.dirty:
+            out += self._src[:self._wire_end()]
+            return
+
+        src, cache = self._src, self._cache
+        ends = self._value_ends()
+        out.append(self.type_code)
+        out += len(self._index).to_bytes(2, "big")
+        for key, start in self._index.items():
+            out += key_cache.encode(key)
+            if key in cache:
+                cache[key].write_into(out)
+            else:
+                out += src[start:ends[key]]
+
+    def _value_ends(self) -> dict[str, int]:
+        """Return end offsets of all values on the wire."""
+        self._scan()
+        wire = [(k, start) for k, start in self._index.items() if start >= 0]  # type: ignore[union-attr]
+        if len(wire) != self._count:
+            # Duplicated keys, entries are not contiguous anymore.
+            return {k: skip_value(self._src, start) for k, start in wire}
+        # Value ends where the next entry (key length + key) starts.
+        ends = {k: start - 2 - len(key.encode("utf-8")) for (k, _), (key, start) in pairwise(wire)}
+        if wire:
+            ends[wire[-1][0]] = self._wire_end()
+        return ends
+
+    def _scan(self, until: str | None = None) -> None:
+        """Index entries until ``until`` key is found (or all of them)."""
+        src, index = self._src, self._index
+        while self._pending:
+            if self._tail >= 0:
+                self._next = skip_value(src, self._tail)
+            pos = self._next
+            ln = _U16.unpack_from(src, pos)[0]
+            key = key_cache.decode(src, pos + 2, ln)
+            self._tail = pos + 2 + ln
+            self._pending -= 1
+            if not self._pending:
+                self._last = self._tail
+            index[key] = self._tail  # type: ignore[index]  # duplicated key, the last value wins
+            if key == until:
+                return
+
+    def _wire_end(self) -> int:
+        if self._end < 0:
+            self._scan()
+            if self._tail >= 0:
+                self._next = skip_value(self._src, self._tail)
+                self._tail = -1
+            self._end = self._next
+        return self._end
+
+    def _field(self, key: str) -> Field | None:
+        index = self._index
+        if index is None:
+            return _VALUE.__get__(self).get(key)
+        if key in self._cache:
+            return self._cache[key]
+        # Whole object is indexed, a duplicate of the key may follow.
+        self._scan()
+        start = index.get(key)
+        if start is None:
+            return None
+        field = self._cache[key] = _load(self._src, start, self._end if start == self._last else -1)
+        return field
+
+    @property  # type: ignore[override]
+    def value(self) -> dict[str, Field]:
+        if self._index is not None:
+            _VALUE.__set__(self, self._fields())
+            self._index = None
+            self._cache = {}
+        return _VALUE.__get__(self)
+
+    @value.setter
+    def value(self, value: dict[str, Field]) -> None:
+        _VALUE.__set__(self, value)
+        self._index = None
+        self._cache = {}
+
+    def get(self, item: str, default: Any = None) -> Any:  # noqa: ANN401
+        value = self._field(item)
+        if value is None:
+            return default
+        if isinstance(value, SFSObject | SFSArray):
+            return value
+        return value.value
+
+    def put(self, item: str, value: Field) -> "LazySFSObject":
+        """Add or update a key-value pair in the SFSObject."""
+        if self._index is None:
+            return super().put(item, value)
+        if type(value) is dict:
+            value = SFSObject(value)
+        elif type(value) is list:
+            value = SFSArray(value)
+        self._scan()
+        self._index.setdefault(item, -1)
+        self._cache[item] = value
+        self._dirty = True
+        return self
+
+    def __setitem__(self, key: str, value: Any) -> None:  # noqa: ANN401
+        """Set a value in the SFSObject using dictionary-style access."""
+        self.put(key, value)
+
+    def __contains__(self, key: str) -> bool:
+        """Check if a key exists in the SFSObject."""
+        if self._index is None:
+            return key in _VALUE.__get__(self)
+        if key not in self._index:
+            self._scan(key)
+        return key in self._index
+
+    def keys(self) -> Iterator[str]:
+        if self._index is None:
+            return iter(_VALUE.__get__(self))
+        self._scan()
+        return iter(self._index)
+
+    def values(self) -> Iterator[Any]:
+        for v in self._fields().values():
+            yield v if isinstance(v, SFSObject | SFSArray) else v.value
+
+    def items(self) -> Iterator[tuple[str, Any]]:
+        for k, v in self._fields().items():
+            yield k, v if isinstance(v, SFSObject | SFSArray) else v.value
+
+    def _fields(self) -> dict[str, Field]:
+        """Return all fields without materializing (and dirtying) the object."""
+        if self._index is None:
+            return _VALUE.__get__(self)
+        self._scan()
+        return {k: self._field(k) for k in self._index}  # type: ignore[misc]
+
+    def __eq__(self, other: object) -> bool:
+        """Compare with any SFSObject by value."""
+        if not isinstance(other, SFSObject):
+            return NotImplemented
+        return self._fields() == (other._fields() if isinstance(other, LazySFSObject) else other.value)
+
+    def __repr__(self) -> str:
+        """Return represented object."""
+        return f"LazySFSObject(value={self._fields()!r})"
+
+    def __reduce__(self) -> tuple:
+        """Pickle (and deepcopy) as serialized bytes, which are loaded lazily again."""
+        return _from_bytes, (type(self), bytes(self.to_bytes()))
+
+    __hash__ = None  # type: ignore[assignment]
+
+
+class LazySFSArray(SFSArray):
+    """SFSArray, which decodes items only when they are accessed."""
+
+    __slots__ = ("_cache", "_end", "_index", "_next", "_pending", "_src", "_tail")
+
+    _src: memoryview
+    _index: list[int] | None  # offsets of items
+    _cache: dict[int, Field]
+    _pending: int
+    _next: int
+    _tail: int
+    _end: int
+
+    @classmethod
+    def from_wire(cls, raw: memoryview, end: int = -1) -> "LazySFSArray":
+        """Wrap serialized SFSArray (starting with type code), ``raw`` may continue after it if ``end`` is unknown."""
+        self = object.__new__(cls)
+        self._src = raw
+        self._index = []
+        self._cache = {}
+        self._pending = _U16.unpack_from(raw, 1)[0]
+        self._next = 3
+        self._tail = -1
+        self._end = end
+        return self
+
+    @property
+    def raw(self) -> memoryview | None:
+        """Original wire slice (with type code), ``None`` once the array was materialized."""
+        if self._index is None:
+            return None
+        return self._src[:self._wire_end()]
+
+    @property
+    def dirty(self) -> bool:
+        """Check whether the array may differ from its original wire slice."""
+        return self._index is None or not all(map(_is_clean, self._cache.values()))
+
+    def write_into(self, out: bytearray, /) -> None:
+        if self._index is None:
+            super().write_into(out)
+            return
+        if not self.dirty:
+            out += self._src[:self._wire_end()]
+            return
+
+        self._scan()
+        src, cache, offsets = self._src, self._cache, self._index
+        out.append(self.type_code)
+        out += len(offsets).to_bytes(2, "big")
+        for i, start in enumerate(offsets):
+            if i in cache:
+                cache[i].write_into(out)
+            else:
+                out += src[start:offsets[i + 1] if i + 1 < len(offsets) else self._wire_end()]
+
+    def _scan(self, until: int | None = None) -> None:
+        """Index items until ``until`` position is reached (or all of them)."""
+        src, index = self._src, self._index
+        while self._pending and (until is None or len(index) <= until):  # type: ignore[arg-type]
+            if self._tail >= 0:
+                self._next = skip_value(src, self._tail)
+            self._tail = self._next
+            self._pending -= 1
+            index.append(self._tail)  # type: ignore[union-attr]
+
+    def _wire_end(self) -> int:
+        if self._end < 0:
+            self._scan()
+            if self._tail >= 0:
+                self._next = skip_value(self._src, self._tail)
+                self._tail = -1
+            self._end = self._next
+        return self._end
+
+    def _field(self, index: int) -> Field:
+        offsets = self._index
+        if offsets is None:
+            return _VALUE.__get__(self)[index]
+        if index < 0:
+            index += len(offsets) + self._pending
+        if index in self._cache:
+            return self._cache[index]
+        self._scan(index)
+        if not 0 <= index < len(offsets):
+            msg = "SFSArray index out of range"
+            raise IndexError(msg)
+        last = not self._pending and index == len(offsets) - 1
+        field = self._cache[index] = _load(self._src, offsets[index], self._end if last else -1)
+        return field
+
+    @property  # type: ignore[override]
+    def value(self) -> list[Field]:
+        if self._index is not None:
+            _VALUE.__set__(self, self._fields())
+            self._index = None
+            self._cache = {}
+        return _VALUE.__get__(self)
+
+    @value.setter
+    def value(self, value: list[Field]) -> None:
+        _VALUE.__set__(self, value)
+        self._index = None
+        self._cache = {}
+
+    def get(self, index: int) -> Any:  # noqa: ANN401
+        """Get item from SFSArray."""
+        value = self._field(index)
+        if isinstance(value, SFSObject | SFSArray):
+            return value
+        return value.value
+
+    def __iter__(self) -> Iterator[Any]:
+        """Iterate all values, nested lazy containers as snapshots of their fields (change them through ``get``)."""
+        for v in self._fields():
+            if isinstance(v, LazySFSObject | LazySFSArray):
+                yield v._fields()
+            elif isinstance(v, SFSObject | SFSArray):
+                yield v.value
+            else:
+                yield v
+
+    def _fields(self) -> list[Field]:
+        """Return all items without materializing (and dirtying) the array."""
+        if self._index is None:
+            return _VALUE.__get__(self)
+        self._scan()
+        return [self._field(i) for i in range(len(self._index))]
+
+    def __eq__(self, other: object) -> bool:
+        """Compare with any SFSArray by value."""
+        if not isinstance(other, SFSArray):
+            return NotImplemented
+        return self._fields() == (other._fields() if isinstance(other, LazySFSArray) else other.value)
+
+    def __repr__(self) -> str:
+        """Return represented array."""
+        return f"LazySFSArray(value={self._fields()!r})"
+
+    def __reduce__(self) -> tuple:
+        """Pickle (and deepcopy) as serialized bytes, which are loaded lazily again."""
+        return _from_bytes, (type(self), bytes(self.to_bytes()))
+
+    __hash__ = None  # type: ignore[assignment]
+
+
+def _from_bytes(cls: type[LazySFSObject | LazySFSArray], raw: bytes) -> LazySFSObject | LazySFSArray:
+    return cls.from_wire(memoryview(raw), len(raw))
+
+
+def lazy_decode(data: bytes | bytearray | memoryview | Buffer) -> Packable:
+    """
+    Decode raw bytes (or buffer at its current position), containers are decoded lazily.
+
+    Raw bytes must hold exactly one value (as protocol payloads do), use ``Buffer`` to decode
+    a value followed by other data.
+    """
+    if isinstance(data, Buffer):
+        mv, pos = data._mv, data._pos  # noqa: SLF001
+        end = -1
+    else:
+        mv, pos = memoryview(data), 0
+        end = len(mv)
+
+    if pos >= len(mv):
+        msg = "Buffer overflow"
+        raise EOFError(msg)
+
+    value = _load(mv, pos, end)
+
+    if isinstance(data, Buffer):
+        data.seek(pos + value._wire_end() if isinstance(value, LazySFSObject | LazySFSArray) else skip_value(mv, pos))  # noqa: SLF001
+    return value
@@ -0,0 +1,141 @@
+"""
+Serializer of plain Python values (``dict``, ``list``, ``int``, ``str``, ...) without ``Field`` wrappers.
+
+Types are inferred: ``dict`` → SFSObject, ``list`` / ``tuple`` → SFSArray, ``bool`` → Bool,
+``int`` → the narrowest of ``int_type`` and wider integer types, which fits the value,
+``float`` → Double, ``str`` → UtfString (Text when longer than 65535 bytes) and bytes-like → ByteArray.
+``type_hints`` maps object keys to field types, which override inference wherever the key appears.
+Fields (and other packables) inside of plain trees are written as usual.
+"""
+import struct
+from typing import Any
+
+from .exceptions import FieldError
+from .field import Field
+from .keys import key_cache
+from .type_codes import TypeCode
+from .types import Bool, Byte, Double, Float, Int, Long, SFSArray, SFSObject, Short
+
+__all__ = ["TypeHints", "write_native"]
+
+TypeHints = dict[str, type[Field]]
+
+_SHORT_MAX = 0xFFFF
+
+# (field type, type code, min, max, packer), ordered by width
+_INTS: tuple[tuple[type[Field], int, int, int, struct.Struct], ...] = (
+    (Byte, TypeCode.BYTE, -0x80, 0x7F, struct.Struct(">b")),
+    (Short, TypeCode.SHORT, -0x8000, 0x7FFF, struct.Struct(">h")),
+    (Int, TypeCode.INT, -0x8000_0000, 0x7FFF_FFFF, struct.Struct(">i")),
+    (Long, TypeCode.LONG, -0x8000_0000_0000_0000, 0x7FFF_FFFF_FFFF_FFFF, struct.Struct(">q")),
+)
+
+# Hinted scalars packed without wrapping them.
+_PACKERS: dict[type[Field], tuple[int, struct.Struct]] = {
+    Bool: (TypeCode.BOOL, struct.Struct(">?")),
+    **{tp: (tc, packer) for tp, tc, _, _, packer in _INTS},
+    Float: (TypeCode.FLOAT, struct.Struct("f")),
+    Double: (TypeCode.DOUBLE, struct.Struct("d")),
+}
+
+_F64 = _PACKERS[Double][1]
+
+
+def _int_ranges(int_type: type[Field]) -> tuple[tuple[Any, ...], ...]:
+    for i, spec in enumerate(_INTS):
+        if spec[0] is int_type:
+            return _INTS[i:]
+    msg = f"int_type must be one of Byte, Short, Int or Long, got {int_type!r}"
+    raise ValueError(msg)
+
+
+def write_native(
+    out: bytearray,
+    obj: Any,  # noqa: ANN401
+    type_hints: TypeHints | None = None,
+    int_type: type[Field] | None = None,
+) -> None:
+    """Append plain Python value to ``out``, see module docs, ``int_type`` defaults to ``Int``."""
+    _Writer(type_hints or {}, _int_ranges(int_type or Int)).write(out, obj)
+
+
+class _Writer:
+    __slots__ = ("hints", "ints")
+
+    def __init__(self, hints: TypeHints, ints: tuple[tuple[Any, ...], ...]) -> None:
+        self.hints = hints
+        self.ints = ints
+
+    def write(self, out: bytearray, v: Any) -> None:  # noqa: ANN401, C901, PLR0912, PLR0915
+        tp = type(v)
+        if tp is dict:
+            out.append(TypeCode.SFS_OBJECT)
+            out += len(v).to_bytes(2, "big")
+            known_keys = key_cache._encoded  # noqa: SLF001
+            encode_key = key_cache.encode
+            hints = self.hints
+            hits = 0
+            for key, item in v.items():
+                raw = known_keys.get(key)
+                if raw is None:
+                    raw = encode_key(key)
+                else:
+                    hits += 1
+                out += raw
+                hint = hints.get(key) if hints else None
+                if hint is None:
+                    self.write(out, item)
+                else:
+                    self.write_hinted(out, item, hint)
+            key_cache.hits += hits
+        elif tp is list or tp is tuple:
+            out.append(TypeCode.SFS_ARRAY)
+            out += len(v).to_bytes(2, "big")
+            for item in v:
+                self.write(out, item)
+        elif tp is bool:
+            out.append(TypeCode.BOOL)
+            out.append(1 if v else 0)
+        elif tp is int:
+            for _, tc, lo, hi, packer in self.ints:
+                if lo <= v <= hi:
+                    out.append(tc)
+                    out += packer.pack(v)
+                    break
+            else:
+                msg = f"Integer {v} doesn't fit into Long"
+                raise OverflowError(msg)
+        elif tp is float:
+            out.append(TypeCode.DOUBLE)
+            out += _F64.pack(v)
+        elif tp is str:
+            encoded = v.encode("utf-8")
+            if len(encoded) > _SHORT_MAX:
+                out.append(TypeCode.TEXT)
+                out += len(encoded).to_bytes(4, "big")
+            else:
+                out.append(TypeCode.UTF_STRING)
+                out += len(encoded).to_bytes(2, "big")
+            out += encoded
+        elif tp is bytes or tp is bytearray or tp is memoryview:
+            data = v if tp is not memoryview else v.cast("B")
+            out.append(TypeCode.BYTE_ARRAY)
+            out += len(data).to_bytes(4, "big")
+            out += data
+        elif hasattr(v, "write_into"):
+            v.write_into(out)
+        else:
+            msg = f"Can't serialize {tp.__name__}, use type_hints or Field instead."
+            raise FieldError(msg)
+
+    def write_hinted(self, out: bytearray, v: Any, hint: type[Field]) -> None:  # noqa: ANN401
+        if hasattr(v, "write_into"):
+            v.write_into(out)
+        elif hint in _PACKERS:
+            tc, packer = _PACKERS[hint]
+            out.append(tc)
+            out += packer.pack(v)
+        elif hint is SFSObject or hint is SFSArray:
+            self.write(out, v)
+        else:
+            hint(v).write_into(out)
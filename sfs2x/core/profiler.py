@@ -0,0 +1,282 @@
+"""
+Type-code histogram and shape profiler of decoded payloads.
+
+Install a ``PayloadProfiler`` with ``set_payload_profiler`` (or the ``payload_profiler``
+context manager), and ``sfs2x.protocol.decode`` passes every decoded payload to it. Sampled
+payloads are walked once more: values, bytes and decode time are counted per ``TypeCode``,
+and per command (extension ``cmd``, ``controller/action`` of others) it records nesting
+depth, key frequency and array lengths. ``SFSArray`` of one scalar type, which a typed
+array (e.g. ``IntArray``) would carry much cheaper, is reported separately.
+
+Bytes of containers are their headers and keys, so type bytes sum up to payload size.
+Time of leaves is time of their decoders, time of containers is time of reading keys.
+With ``sample_rate=0.01`` only 1% of payloads pay for the walk.
+
+Commands and keys come from peers, so a profiler tracks at most ``max_commands`` commands and
+``max_keys`` keys (and arrays) per command, the rest is counted under ``OTHER``.
+"""
+import random
+import struct
+import threading
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from functools import cache
+from time import perf_counter
+
+from .buffer import Buffer
+from .decoder import read_leaf
+from .type_codes import TypeCode
+
+__all__ = ["OTHER", "PayloadProfiler", "ShapeStats", "TypeStats", "payload_profiler", "set_payload_profiler"]
+
+_U16 = struct.Struct(">H")
+_U32 = struct.Struct(">I")
+
+# Command or key, which stands for all of them above the limits.
+OTHER = "<other>"
+
+_OBJECT = int(TypeCode.SFS_OBJECT)
+_ARRAY = int(TypeCode.SFS_ARRAY)
+
+# Scalar type -> typed array, which stores it without per-element type codes.
+_TYPED_ARRAYS = {
+    TypeCode.BOOL: TypeCode.BOOL_ARRAY,
+    TypeCode.BYTE: TypeCode.BYTE_ARRAY,
+    TypeCode.SHORT: TypeCode.SHORT_ARRAY,
+    TypeCode.INT: TypeCode.INT_ARRAY,
+    TypeCode.LONG: TypeCode.LONG_ARRAY,
+    TypeCode.FLOAT: TypeCode.FLOAT_ARRAY,
+    TypeCode.DOUBLE: TypeCode.DOUBLE_ARRAY,
+    TypeCode.UTF_STRING: TypeCode.UTF_STRING_ARRAY,
+}
+_U16_LENGTH = frozenset({*_TYPED_ARRAYS.values()} - {TypeCode.BYTE_ARRAY})
+
+profiler: "PayloadProfiler | None" = None
+
+
+@cache
+def _timer_overhead() -> float:
+    """Return cost of a ``perf_counter`` pair, measured once, when the first payload is recorded."""
+    best = 1.0
+    for _ in range(1000):
+        start = perf_counter()
+        best = min(best, perf_counter() - start)
+    return best
+
+
+def set_payload_profiler(new: "PayloadProfiler | None") -> "PayloadProfiler | None":
+    """Install profiler (``None`` disables profiling) and return the previous one."""
+    global profiler
+    old, profiler = profiler, new
+    return old
+
+
+@contextmanager
+def payload_profiler(new: "PayloadProfiler") -> Iterator["PayloadProfiler"]:
+    """Install profiler for the duration of ``with`` block."""
+    old = set_payload_profiler(new)
+    try:
+        yield new
+    finally:
+        set_payload_profiler(old)
+
+
+@dataclass(slots=True)
+class TypeStats:
+    """Values, bytes and decode time of one type code."""
+
+    count: int = 0
+    bytes: int = 0
+    seconds: float = 0.0
+
+
+@dataclass(slots=True)
+class _Lengths:
+    count: int = 0
+    total: int = 0
+    max: int = 0
+
+    def add(self, n: int) -> None:
+        self.count += 1
+        self.total += n
+        self.max = max(self.max, n)
+
+
+@dataclass(slots=True)
+class ShapeStats:
+    """Shape of payloads of one command."""
+
+    messages: int = 0
+    bytes: int = 0
+    max_depth: int = 0
+    keys: Counter[str] = field(default_factory=Counter)
+    # (key, array type) -> lengths; elements of arrays are named ``key[]``
+    arrays: dict[tuple[str, TypeCode], _Lengths] = field(default_factory=dict)
+    # (key, element type) -> number of SFSArrays, which hold only elements of this type
+    homogeneous: Counter[tuple[str, TypeCode]] = field(default_factory=Counter)
+
+
+class PayloadProfiler:
+    """Collector of type histogram and payload shapes, see module docs."""
+
+    def __init__(self, sample_rate: float = 1.0, *, max_commands: int = 256, max_keys: int = 256) -> None:
+        if not 0 < sample_rate <= 1:
+            msg = "sample_rate must be in (0, 1]"
+            raise ValueError(msg)
+        self.sample_rate = sample_rate
+        self.max_commands = max_commands
+        self.max_keys = max_keys  # per command, for keys and for arrays
+        self.seen = 0
+        self.sampled = 0
+        self.types: dict[TypeCode, TypeStats] = {}
+        self.shapes: dict[str, ShapeStats] = {}
+        self._lock = threading.Lock()
+
+    def sample(self) -> bool:
+        """Count payload and return whether it should be recorded."""
+        with self._lock:
+            self.seen += 1
+        return self.sample_rate >= 1 or random.random() < self.sample_rate  # noqa: S311
+
+    def observe(self, data: bytes | bytearray | memoryview | Buffer, command: str = "") -> None:
+        """Profile serialized payload (maybe skipping it by sampling), ``command`` groups shapes."""
+        if self.sample():
+            self.record(data, command)
+
+    def record(self, data: bytes | bytearray | memoryview | Buffer, command: str = "") -> None:
+        """Profile serialized payload without sampling."""
+        mv = data._mv[data._pos:] if isinstance(data, Buffer) else memoryview(data)  # noqa: SLF001
+        with self._lock:
+            self.sampled += 1
+            shape = self.shapes.get(command)
+            if shape is None:
+                if len(self.shapes) >= self.max_commands:
+                    command = OTHER
+                shape = self.shapes.get(command)
+                if shape is None:
+                    shape = self.shapes[command] = ShapeStats()
+            shape.messages += 1
+            shape.bytes += len(mv)
+            self._walk(mv, shape)
+
+    def _walk(self, mv: memoryview, shape: ShapeStats) -> None:  # noqa: C901, PLR0912, PLR0915
+        u16 = _U16.unpack_from
+        types = self.types
+        max_keys = self.max_keys
+        # Subtracted from every timed value, so tiny scalars aren't dominated by the clock itself.
+        overhead = _timer_overhead()
+        # Each frame is [remaining children, is_object, key, element type (None - no elements, -1 - mixed)].
+        stack: list[list] = []
+        pos = 0
+        key = ""
+
+        while True:
+            if stack:
+                frame = stack[-1]
+                if frame[0] == 0:
+                    stack.pop()
+                    elem = frame[3]
+                    if not frame[1] and elem in _TYPED_ARRAYS:
+                        homogeneous = shape.homogeneous
+                        name = frame[2] if (frame[2], elem) in homogeneous or len(homogeneous) < max_keys else OTHER
+                        homogeneous[name, TypeCode(elem)] += 1
+                    if not stack:
+                        return
+                    continue
+                frame[0] -= 1
+                if frame[1]:
+                    start = perf_counter()
+                    ln = u16(mv, pos)[0]
+                    key = str(mv[pos + 2:pos + 2 + ln], "utf-8")
+                    stats = types[TypeCode.SFS_OBJECT]
+                    stats.seconds += max(perf_counter() - start - overhead, 0.0)
+                    stats.bytes += 2 + ln
+                    pos += 2 + ln
+                    if key not in shape.keys and len(shape.keys) >= max_keys:
+                        key = OTHER
+                    shape.keys[key] += 1
+                else:
+                    key = frame[2] + "[]"
+
+            tc = mv[pos]
+            if stack and not stack[-1][1]:
+                frame = stack[-1]
+                frame[3] = tc if frame[3] in (None, tc) else -1
+
+            stats = types.get(tc)  # type: ignore[call-overload]
+            if stats is None:
+                stats = types[TypeCode(tc)] = TypeStats()
+            stats.count += 1
+
+            if tc in (_OBJECT, _ARRAY):
+                count = u16(mv, pos + 1)[0]
+                stats.bytes += 3
+                pos += 3
+                if tc == _ARRAY:
+                    _lengths(shape, key, tc, max_keys).add(count)
+                stack.append([count, tc == _OBJECT, key, None])
+                shape.max_depth = max(shape.max_depth, len(stack))
+                continue
+
+            start = perf_counter()
+            _, end = read_leaf(mv, pos)
+            stats.seconds += max(perf_counter() - start - overhead, 0.0)
+            stats.bytes += end - pos
+            if tc in _U16_LENGTH:
+                _lengths(shape, key, tc, max_keys).add(u16(mv, pos + 1)[0])
+            elif tc == TypeCode.BYTE_ARRAY:
+                _lengths(shape, key, tc, max_keys).add(_U32.unpack_from(mv, pos + 1)[0])
+            pos = end
+            if not stack:
+                return
+
+    def report(self, top: int = 10) -> str:
+        """Format type histogram, shapes of commands and arrays, which typed arrays would replace."""
+        total_bytes = sum(s.bytes for s in self.types.values()) or 1
+        lines = [
+            f"sampled {self.sampled} of {self.seen} payloads",
+            "",
+            f"{'type':<18} {'values':>10} {'KB':>10} {'bytes %':>8} {'ms':>9} {'ns/value':>9}",
+        ]
+        for tc, s in sorted(self.types.items(), key=lambda item: item[1].bytes, reverse=True):
+            lines.append(
+                f"{tc.name:<18} {s.count:>10} {s.bytes / 1024:>10.1f} {s.bytes / total_bytes:>8.1%} "
+                f"{s.seconds * 1e3:>9.2f} {s.seconds / s.count * 1e9:>9.0f}",
+            )
+
+        for command, shape in sorted(self.shapes.items(), key=lambda item: item[1].bytes, reverse=True):
+            lines += [
+                "",
+                (f"{command or '-'}: {shape.messages} payloads, {shape.bytes / shape.messages:.0f} B average, "
+                 f"depth {shape.max_depth}"),
+                "  keys: " + ", ".join(f"{k} ({n})" for k, n in shape.keys.most_common(top)),
+            ]
+            arrays = sorted(shape.arrays.items(), key=lambda item: item[1].total, reverse=True)[:top]
+            lines += [
+                f"  {key} {tc.name}: {n.count} arrays, {n.total / n.count:.1f} average, {n.max} max length"
+                for (key, tc), n in arrays
+            ]
+            lines += [
+                f"  {key} SFS_ARRAY of {tc.name} ({n}x) could be {_TYPED_ARRAYS[tc].name}"
+                for (key, tc), n in shape.homogeneous.most_common(top)
+            ]
+        return "\n".join(lines)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.seen = self.sampled = 0
+            self.types.clear()
+            self.shapes.clear()
+
+
+def _lengths(shape: ShapeStats, key: str, tc: int, max_keys: int) -> _Lengths:
+    lengths = shape.arrays.get((key, tc))  # type: ignore[arg-type]
+    if lengths is None:
+        if len(shape.arrays) >= max_keys:
+            key = OTHER
+        lengths = shape.arrays.get((key, tc))  # type: ignore[arg-type]
+        if lengths is None:
+            lengths = shape.arrays[key, TypeCode(tc)] = _Lengths()
+    return lengths
@@ -1,6 +1,7 @@
 from typing import Any, ClassVar, Protocol, runtime_checkable
 
 from .buffer import Buffer
+from .writer import Writer
 
 
 @runtime_checkable
@@ -12,6 +13,8 @@ class Packable(Protocol):
 
     def to_bytes(self) -> bytearray: ...
 
+    def write_into(self, out: bytearray, /) -> None: ...
+
     @classmethod
     def from_buffer(cls, buf: Buffer) -> "Packable": ...
 
@@ -23,9 +26,18 @@ def register(cls: type[Packable]) -> type[Packable]:
     return cls
 
 
-def decode(buf: Buffer) -> Packable:
-    """Decode buffer into Packable."""
-    type_id = int.from_bytes(buf.read(1))
+def decode(buf: Buffer, *, lazy: bool = False) -> Packable:
+    """
+    Decode buffer into Packable.
+
+    With ``lazy=True`` containers only index their values and decode them on first access.
+    """
+    if lazy:
+        from .lazy import lazy_decode  # noqa: PLC0415
+
+        return lazy_decode(buf)
+
+    type_id = buf.read_u8()
 
     try:
         cls = _registry[type_id]
@@ -34,3 +46,31 @@ def decode(buf: Buffer) -> Packable:
         raise ValueError(msg) from e
 
     return cls.from_buffer(buf)
+
+
+def dumps(
+    obj: Any,  # noqa: ANN401
+    out: bytearray | Writer | None = None,
+    *,
+    type_hints: dict[str, type[Packable]] | None = None,
+    int_type: type[Packable] | None = None,
+) -> bytearray | Writer:
+    """
+    Serialize packable (with all nested fields) into ``out`` (a new ``bytearray`` by default), it may be a reused one.
+
+    Plain Python values (``dict``, ``list``, ``int``, ``str``, ...) are serialized directly, without
+    ``Field`` wrappers, see ``sfs2x.core.native`` for type inference, ``type_hints`` and ``int_type``.
+    """
+    if out is None:
+        out = bytearray()
+    elif isinstance(out, Writer):
+        # Fields append to a bytearray at C speed, the writer gets one copy of the result.
+        out.write_bytes(dumps(obj, type_hints=type_hints, int_type=int_type))
+        return out
+    if hasattr(obj, "write_into"):
+        obj.write_into(out)
+    else:
+        from .native import write_native  # noqa: PLC0415
+
+        write_native(out, obj, type_hints, int_type)
+    return out
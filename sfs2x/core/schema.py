@@ -0,0 +1,275 @@
+"""
+Schema-compiled SFSObject shapes.
+
+A ``@schema`` class is a dataclass, which annotations are wire types (``Int``, ``UtfString``,
+arrays, containers or other schema classes) while attribute values are plain Python values.
+At class creation its layout is compiled into specialized ``write_into`` and reader
+functions, which pack values straight into the output (without ``Field`` boxing) and
+produce bytes identical to the equivalent ``SFSObject``::
+
+    @schema
+    class Move:
+        x: Int
+        y: Int
+        cmd: UtfString = field(default="move", metadata={"key": "c"})
+
+    dumps(Move(1, 2)) == SFSObject({"x": Int(1), "y": Int(2), "c": UtfString("move")}).to_bytes()
+
+Schema instances are ``Packable``, so they can be nested into containers and messages directly.
+"""
+import struct
+from dataclasses import dataclass, fields, is_dataclass
+from typing import Any, get_type_hints
+
+from .buffer import Buffer
+from .decoder import _decode, _readers
+from .exceptions import FieldError
+from .field import Field
+from .type_codes import TypeCode
+from .types import (
+    Bool,
+    Byte,
+    ByteArray,
+    Double,
+    Float,
+    Int,
+    Long,
+    SFSArray,
+    SFSObject,
+    Short,
+    Text,
+    UtfString,
+)
+
+__all__ = ["is_schema", "schema"]
+
+_FIXED: dict[type[Field], str] = {Bool: "?", Byte: "b", Short: "h", Int: "i", Long: "q"}
+_NATIVE: dict[type[Field], struct.Struct] = {Float: struct.Struct("f"), Double: struct.Struct("d")}
+_STRINGS: dict[type[Field], str] = {UtfString: "H", Text: "I"}
+
+_OBJECT_TC = int(TypeCode.SFS_OBJECT)
+
+
+class _Mismatch(Exception):  # noqa: N818
+    """Wire layout differs from the compiled one."""
+
+
+def is_schema(tp: object) -> bool:
+    """Check whether ``tp`` is a schema class."""
+    return isinstance(tp, type) and hasattr(tp, "_sfs_read")
+
+
+def _as_field(tp: type[Field], value: Any) -> Field:  # noqa: ANN401
+    return value if isinstance(value, Field) else tp(value)
+
+
+class _Compiler:
+    """Collects generated source of ``write_into`` and reader of one schema class."""
+
+    def __init__(self) -> None:
+        self.ns: dict[str, Any] = {
+            "_Mismatch": _Mismatch,
+            "_as_field": _as_field,
+            "_EOF": EOFError,
+        }
+        self.enc: list[str] = []
+        self.dec: list[str] = []
+        self.run: list[tuple[str, str, str]] = []  # (struct format, encode arg, decode target)
+
+    def name(self, prefix: str, value: Any) -> str:  # noqa: ANN401
+        name = f"_{prefix}{len(self.ns)}"
+        self.ns[name] = value
+        return name
+
+    def const(self, data: bytes) -> None:
+        # Decode target ``!name`` marks constant, which must match on the wire.
+        name = self.name("c", data)
+        self.run.append((f"{len(data)}s", name, "!" + name))
+
+    def value(self, fmt: str, expr: str, target: str) -> None:
+        self.run.append((fmt, expr, target))
+
+    def flush(self) -> None:
+        if not self.run:
+            return
+        run, self.run = self.run, []
+        packer = struct.Struct(">" + "".join(fmt for fmt, _, _ in run))
+
+        if all(target.startswith("!") for _, _, target in run):
+            data = b"".join(self.ns[expr] for _, expr, _ in run)
+            name = self.name("c", data)
+            self.enc.append(f"out += {name}")
+            self.dec.append(f"if mv[pos:pos + {len(data)}] != {name}: raise _Mismatch")
+            self.dec.append(f"pos += {len(data)}")
+            return
+
+        s = self.name("s", packer)
+        self.enc.append(f"out += {s}.pack({', '.join(expr for _, expr, _ in run)})")
+        targets = [f"_k{i}" if target.startswith("!") else target for i, (_, _, target) in enumerate(run)]
+        self.dec.append(f"{', '.join(targets)}, = {s}.unpack_from(mv, pos)")
+        checks = [f"_k{i} != {target[1:]}" for i, (_, _, target) in enumerate(run) if target.startswith("!")]
+        self.dec.append(f"if {' or '.join(checks)}: raise _Mismatch")
+        self.dec.append(f"pos += {packer.size}")
+
+
+def _key_prefix(key: str) -> bytes:
+    encoded = key.encode("utf-8")
+    return len(encoded).to_bytes(2, "big") + encoded
+
+
+def _compile(cls: type, specs: list[tuple[str, str, Any]]) -> None:
+    c = _Compiler()
+    c.const(bytes([_OBJECT_TC]) + len(specs).to_bytes(2, "big"))
+
+    for i, (attr, key, tp) in enumerate(specs):
+        v = f"v{i}"
+        c.enc.append(f"{v} = self.{attr}")
+        prefix = _key_prefix(key)
+
+        if tp in _FIXED:
+            c.const(prefix + bytes([tp.type_code]))
+            c.value(_FIXED[tp], v, v)
+        elif tp in _STRINGS:
+            c.enc.append(f"{v} = {v}.encode('utf-8')")
+            c.const(prefix + bytes([tp.type_code]))
+            c.value(_STRINGS[tp], f"len({v})", f"{v}_len")
+            c.flush()
+            c.enc.append(f"out += {v}")
+            c.dec.append(f"if pos + {v}_len > len(mv): raise _EOF('Buffer overflow')")
+            c.dec.append(f"{v} = str(mv[pos:pos + {v}_len], 'utf-8')")
+            c.dec.append(f"pos += {v}_len")
+        elif tp in _NATIVE:
+            c.const(prefix + bytes([tp.type_code]))
+            c.flush()
+            packer = c.name("n", _NATIVE[tp])
+            c.enc.append(f"out += {packer}.pack({v})")
+            c.dec.append(f"{v} = {packer}.unpack_from(mv, pos)[0]")
+            c.dec.append(f"pos += {_NATIVE[tp].size}")
+        else:
+            # Nested schema or any other field writes own type code.
+            c.const(prefix)
+            c.flush()
+            tc = _OBJECT_TC if is_schema(tp) else int(tp.type_code)
+            c.dec.append(f"if mv[pos] != {tc}: raise _Mismatch")
+            if is_schema(tp):
+                c.enc.append(f"{v}.write_into(out)")
+                c.dec.append(f"{v}, pos = {c.name('t', tp)}._sfs_read(mv, pos)")
+            else:
+                t = c.name("t", tp)
+                c.enc.append(f"_as_field({t}, {v}).write_into(out)")
+                c.dec.append(f"{v}, pos = _decode(mv, pos, _leaf)")
+                if issubclass(tp, ByteArray):
+                    c.dec.append(f"{v} = bytes({v}.data)")  # like loads(raw=True), not a list of ints
+                elif not issubclass(tp, SFSObject | SFSArray):
+                    c.dec.append(f"{v} = {v}.value")
+    c.flush()
+
+    c.ns.update(_decode=_decode, _leaf=_readers("list"), _cls=cls)
+    args = ", ".join(f"v{i}" for i in range(len(specs)))
+    src = "\n".join([
+        "def write_into(self, out, /):",
+        *(f"    {line}" for line in c.enc),
+        "def _sfs_read_exact(mv, pos):",
+        *(f"    {line}" for line in c.dec),
+        f"    return _cls({args}), pos",
+    ])
+    exec(src, c.ns)  # noqa: S102
+
+    cls.write_into = c.ns["write_into"]
+    cls._sfs_read_exact = staticmethod(c.ns["_sfs_read_exact"])
+
+
+def _to_sfs_object(self: Any) -> SFSObject:  # noqa: ANN401
+    """Convert to generic SFSObject."""
+    out = SFSObject()
+    for attr, key, tp in self._sfs_specs:
+        v = getattr(self, attr)
+        out.value[key] = v.to_sfs_object() if is_schema(tp) else _as_field(tp, v)
+    return out
+
+
+def _from_sfs_object(cls: type, obj: SFSObject) -> Any:  # noqa: ANN401
+    """Build instance from generic SFSObject, missing keys take dataclass defaults."""
+    if not isinstance(obj, SFSObject):
+        msg = f"Can't load {cls.__name__} from {type(obj).__name__}"
+        raise TypeError(msg)
+    kwargs = {}
+    for attr, key, tp in cls._sfs_specs:
+        if key not in obj:
+            continue
+        v = obj.value[key]
+        if is_schema(tp):
+            kwargs[attr] = tp.from_sfs_object(v)
+        elif isinstance(v, SFSObject | SFSArray):
+            kwargs[attr] = v
+        elif isinstance(v, ByteArray):
+            kwargs[attr] = bytes(v.data)
+        else:
+            kwargs[attr] = v.value
+    return cls(**kwargs)
+
+
+def _sfs_read(cls: type, mv: memoryview, pos: int) -> tuple[Any, int]:
+    try:
+        return cls._sfs_read_exact(mv, pos)
+    except _Mismatch:
+        # Other key order, extra or missing keys, go the generic way.
+        obj, end = _decode(mv, pos, _readers("list"))
+        return cls.from_sfs_object(obj), end
+
+
+def _loads(cls: type, data: bytes | bytearray | memoryview | Buffer) -> Any:  # noqa: ANN401
+    """Decode serialized SFSObject (or buffer at its current position)."""
+    if isinstance(data, Buffer):
+        mv, pos = data._mv, data._pos  # noqa: SLF001
+    else:
+        mv, pos = memoryview(data), 0
+    try:
+        value, end = cls._sfs_read(mv, pos)
+    except (IndexError, struct.error) as e:
+        msg = "Buffer overflow"
+        raise EOFError(msg) from e
+    if isinstance(data, Buffer):
+        data.seek(end)
+    return value
+
+
+def _from_buffer(cls: type, buf: Buffer, /) -> Any:  # noqa: ANN401
+    """Load from buffer positioned after the type code, like ``Field.from_buffer``."""
+    buf.seek(buf.tell() - 1)
+    return cls.loads(buf)
+
+
+def _to_bytes(self: Any) -> bytearray:  # noqa: ANN401
+    out = bytearray()
+    self.write_into(out)
+    return out
+
+
+def schema[T](cls: type[T]) -> type[T]:
+    """Compile dataclass-like class into SFSObject schema, see module docs."""
+    if not is_dataclass(cls):
+        cls = dataclass(slots=True)(cls)
+
+    hints = get_type_hints(cls)
+    specs: list[tuple[str, str, Any]] = []
+    for f in fields(cls):
+        tp = hints[f.name]
+        if not (is_schema(tp) or (isinstance(tp, type) and issubclass(tp, Field))):
+            msg = f"Schema field {cls.__name__}.{f.name} must be annotated with Field type or schema class, got {tp!r}"
+            raise FieldError(msg)
+        specs.append((f.name, f.metadata.get("key", f.name), tp))
+
+    cls.type_code = TypeCode.SFS_OBJECT
+    cls._sfs_specs = tuple(specs)
+    cls._sfs_read = classmethod(_sfs_read)
+    cls.to_bytes = _to_bytes
+    cls.to_sfs_object = _to_sfs_object
+    cls.from_sfs_object = classmethod(_from_sfs_object)
+    cls.from_buffer = classmethod(_from_buffer)
+    cls.loads = classmethod(_loads)
+    if all(attr != "value" for attr, _, _ in specs):
+        # Containers return ``value`` of nested fields.
+        cls.value = property(lambda self: self)
+    _compile(cls, specs)
+    return cls
@@ -1,16 +1,67 @@
 import struct
+import sys
+from array import array
 from dataclasses import dataclass
-from typing import ClassVar
+from typing import Any, ClassVar, Literal
 
 from sfs2x.core.buffer import Buffer
 from sfs2x.core.field import Field
 from sfs2x.core.registry import register
 from sfs2x.core.type_codes import TypeCode
-from sfs2x.core.utils import read_small_string, write_small_string
+from sfs2x.core.utils import write_small_string_into
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+ArrayView = Literal["list", "array", "numpy"]
+
+_SWAP = sys.byteorder == "little"
+
+
+def pack_numbers(out: bytearray, order: str, fmt: str, values: Any) -> None:  # noqa: ANN401
+    """Append length and all values of numeric array to ``out``, packed in one call."""
+    out += len(values).to_bytes(2, "big")
+    if np is not None and isinstance(values, np.ndarray):
+        out += values.astype(f"{order}{fmt}", copy=False).tobytes()
+    elif type(values) is array and values.typecode == fmt:
+        if order == ">" and _SWAP:
+            values = array(fmt, values)
+            values.byteswap()
+        out += values
+    else:
+        out += struct.pack(f"{order}{len(values)}{fmt}", *values)
+
+
+def unpack_numbers(data: memoryview, order: str, fmt: str, view: ArrayView = "list") -> Any:  # noqa: ANN401
+    """
+    Unpack whole numeric array body in one call.
+
+    ``view`` selects result type: ``list`` of Python numbers, ``array.array`` or read-only
+    ``numpy.ndarray`` over ``data`` (both without per-element Python objects).
+    """
+    if view == "list":
+        return list(struct.unpack(f"{order}{len(data) // struct.calcsize(fmt)}{fmt}", data))
+    if view == "array":
+        arr = array(fmt)
+        arr.frombytes(data)
+        if order == ">" and _SWAP:
+            arr.byteswap()
+        return arr
+    if view == "numpy":
+        if np is None:
+            msg = "Library numpy is not installed. Install it before using numpy views (pip install numpy)."
+            raise ImportError(msg)
+        return np.frombuffer(data, dtype=f"{order}{fmt}")
+    msg = f"Unknown array view: {view!r}"
+    raise ValueError(msg)
 
 
 class _NumericArrayMixin(Field[list[int]]):
     _elem_size: ClassVar[int]
+    _fmt: ClassVar[str]
+    _order: ClassVar[str] = ">"
     type_code: ClassVar[int]
 
     def __init__(self, *args: tuple[list[bool]] | list[bool]) -> None:
@@ -22,22 +73,14 @@ class _NumericArrayMixin(Field[list[int]]):
         else:
             self.value = args[0]
 
-    def to_bytes(self) -> bytearray:
-        payload = bytearray()
-        payload.append(self.type_code)
-        payload += len(self.value).to_bytes(2, "big")
-        for v in self.value:
-            payload += v.to_bytes(self._elem_size, "big", signed=True)
-        return payload
+    def write_into(self, out: bytearray, /) -> None:
+        out.append(self.type_code)
+        pack_numbers(out, self._order, self._fmt, self.value)
 
     @classmethod
-    def from_buffer(cls, buf: Buffer) -> "_NumericArrayMixin":
-        length = int.from_bytes(buf.read(2), "big")
-        arr = [
-            int.from_bytes(buf.read(cls._elem_size), "big", signed=True)
-            for _ in range(length)
-        ]
-        return cls(arr)
+    def from_buffer(cls, buf: Buffer, /, *, view: ArrayView = "list") -> "_NumericArrayMixin":
+        length = buf.read_u16()
+        return cls(unpack_numbers(buf.read(length * cls._elem_size), cls._order, cls._fmt, view))
 
 
 @register
@@ -56,29 +99,94 @@ class BoolArray(Field[list[bool]]):
         else:
             self.value = args[0]
 
-    def to_bytes(self) -> bytearray:
-        payload = bytearray()
-        payload.append(self.type_code)
-        payload += len(self.value).to_bytes(2, "big")
+    def write_into(self, out: bytearray, /) -> None:
+        out.append(self.type_code)
+        out += len(self.value).to_bytes(2, "big")
         for v in self.value:
-            payload.append(1 if v else 0)
-        return payload
+            out.append(1 if v else 0)
 
     @classmethod
     def from_buffer(cls, buf: Buffer) -> "BoolArray":
-        length = int.from_bytes(buf.read(2), "big")
-        arr = [bool(int.from_bytes(buf.read(1), "big")) for _ in range(length)]
-        return cls(arr)
+        length = buf.read_u16()
+        return cls([bool(b) for b in buf.read(length)])
 
 
 @register
-@dataclass(slots=True)
-class ByteArray(_NumericArrayMixin):
-    """Array with 8-bit numbers."""
+class ByteArray(Field[list[int]]):
+    """
+    Array with 8-bit numbers (32-bit length), stored as raw bytes.
+
+    Decoded arrays keep a ``memoryview`` slice of the source payload (no copy), so
+    a decoded blob keeps the whole source payload alive. ``data`` gives raw bytes,
+    ``value`` gives a list of signed numbers, like other numeric arrays.
+    """
+
+    __slots__ = ("_data",)
 
-    _elem_size = 1
     type_code = TypeCode.BYTE_ARRAY
 
+    def __init__(self, *args: int | list[int] | bytes | bytearray | memoryview) -> None:
+        """Initialize a ByteArray from bytes-like object or signed numbers."""
+        if len(args) == 0:
+            self._data = b""
+        elif type(args[0]) is int:
+            self.value = list(args)  # type: ignore[assignment]
+        else:
+            self.value = args[0]  # type: ignore[assignment]
+
+    @property
+    def data(self) -> bytes | bytearray | memoryview:
+        return self._data
+
+    @property  # type: ignore[override]
+    def value(self) -> list[int]:
+        return memoryview(self._data).cast("b").tolist()
+
+    @value.setter
+    def value(self, value: list[int] | bytes | bytearray | memoryview) -> None:
+        if isinstance(value, bytes | bytearray):
+            self._data = value
+        elif isinstance(value, memoryview):
+            self._data = value if value.format == "B" else value.cast("B")
+        elif isinstance(value, list | tuple):
+            self._data = struct.pack(f">{len(value)}b", *value)
+        else:
+            self._data = memoryview(value).cast("B")
+
+    def write_into(self, out: bytearray, /) -> None:
+        out.append(self.type_code)
+        out += len(self._data).to_bytes(4, "big")
+        out += self._data
+
+    @classmethod
+    def from_buffer(cls, buf: Buffer, /) -> "ByteArray":
+        length = buf.read_u32()
+        return cls(buf.read(length))
+
+    def __bytes__(self) -> bytes:
+        """Return raw bytes."""
+        return bytes(self._data)
+
+    def __len__(self) -> int:
+        """Return array length."""
+        return len(self._data)
+
+    def __eq__(self, other: object) -> bool:
+        """Compare raw bytes of two ByteArrays."""
+        if type(other) is not ByteArray:
+            return NotImplemented
+        return memoryview(self._data) == memoryview(other._data)
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        """Return represented ByteArray."""
+        return f"ByteArray({bytes(self._data)!r})"
+
+    def __reduce__(self) -> tuple[type["ByteArray"], tuple[bytes]]:
+        """Pickle as bytes, memoryview slices can't be pickled."""
+        return ByteArray, (bytes(self._data),)
+
 
 @register
 @dataclass(slots=True)
@@ -86,6 +194,7 @@ class ShortArray(_NumericArrayMixin):
     """Array with 16-bit numbers."""
 
     _elem_size = 2
+    _fmt = "h"
     type_code = TypeCode.SHORT_ARRAY
 
 
@@ -95,6 +204,7 @@ class IntArray(_NumericArrayMixin):
     """Array with 32-bit numbers."""
 
     _elem_size = 4
+    _fmt = "i"
     type_code = TypeCode.INT_ARRAY
 
 
@@ -104,6 +214,7 @@ class LongArray(_NumericArrayMixin):
     """Array with 64-bit numbers."""
 
     _elem_size = 8
+    _fmt = "q"
     type_code = TypeCode.LONG_ARRAY
 
 
@@ -123,21 +234,14 @@ class FloatArray(Field[list[float]]):
         else:
             self.value = args[0]
 
-    def to_bytes(self) -> bytearray:
-        payload = bytearray()
-        payload.append(self.type_code)
-        payload += len(self.value).to_bytes(2, "big")
-        for v in self.value:
-            payload += bytearray(struct.pack("f", v))
-        return payload
+    def write_into(self, out: bytearray, /) -> None:
+        out.append(self.type_code)
+        pack_numbers(out, "=", "f", self.value)
 
     @classmethod
-    def from_buffer(cls, buf: Buffer) -> "FloatArray":
-        length = int.from_bytes(buf.read(2), "big")
-        arr = [
-            float(struct.unpack("f", buf.read(4))[0]) for _ in range(length)
-        ]
-        return cls(arr)
+    def from_buffer(cls, buf: Buffer, /, *, view: ArrayView = "list") -> "FloatArray":
+        length = buf.read_u16()
+        return cls(unpack_numbers(buf.read(length * 4), "=", "f", view))
 
 
 @register
@@ -156,21 +260,14 @@ class DoubleArray(Field[list[float]]):
         else:
             self.value = args[0]
 
-    def to_bytes(self) -> bytearray:
-        payload = bytearray()
-        payload.append(self.type_code)
-        payload += len(self.value).to_bytes(2, "big")
-        for v in self.value:
-            payload += bytearray(struct.pack("d", v))
-        return payload
+    def write_into(self, out: bytearray, /) -> None:
+        out.append(self.type_code)
+        pack_numbers(out, "=", "d", self.value)
 
     @classmethod
-    def from_buffer(cls, buf: Buffer) -> "DoubleArray":
-        length = int.from_bytes(buf.read(2), "big")
-        arr = [
-            float(struct.unpack("d", buf.read(8))[0]) for _ in range(length)
-        ]
-        return cls(arr)
+    def from_buffer(cls, buf: Buffer, /, *, view: ArrayView = "list") -> "DoubleArray":
+        length = buf.read_u16()
+        return cls(unpack_numbers(buf.read(length * 8), "=", "d", view))
 
 
 @register
@@ -189,16 +286,14 @@ class UtfStringArray(Field[list[str]]):
         else:
             self.value = args[0]
 
-    def to_bytes(self) -> bytearray:
-        payload = bytearray()
-        payload.append(self.type_code)
-        payload += len(self.value).to_bytes(2, "big")
+    def write_into(self, out: bytearray, /) -> None:
+        out.append(self.type_code)
+        out += len(self.value).to_bytes(2, "big")
         for v in self.value:
-            payload += write_small_string(v)
-        return payload
+            write_small_string_into(out, v)
 
     @classmethod
     def from_buffer(cls, buf: Buffer) -> "UtfStringArray":
-        length = int.from_bytes(buf.read(2), "big")
-        arr = [read_small_string(buf) for _ in range(length)]
+        length = buf.read_u16()
+        arr = [buf.read_utf() for _ in range(length)]
         return cls(arr)
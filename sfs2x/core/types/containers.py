@@ -4,12 +4,9 @@ from typing import Any, Never, Union
 
 from sfs2x.core.buffer import Buffer
 from sfs2x.core.field import Field
+from sfs2x.core.keys import key_cache
 from sfs2x.core.registry import decode, register
 from sfs2x.core.type_codes import TypeCode
-from sfs2x.core.utils import (
-    read_small_string,
-    write_small_string,
-)
 
 
 @register
@@ -19,7 +16,7 @@ class Class(Field[Any]):
 
     type_code = TypeCode.CLASS
 
-    def to_bytes(self) -> bytearray:
+    def write_into(self, out: bytearray, /) -> None:
         msg = "Class not implemented yet"
         raise NotImplementedError(msg)
 
@@ -67,23 +64,31 @@ class SFSObject(Field[dict[str, Field]]):
 
         self.value = new_value
 
-    def to_bytes(self) -> bytearray:
-        payload = bytearray()
-        payload.append(self.type_code)
-        payload += len(self.value).to_bytes(2, "big")
+    def write_into(self, out: bytearray, /) -> None:
+        out.append(self.type_code)
+        out += len(self.value).to_bytes(2, "big")
+        # Cache lookup is inlined, misses go through ``key_cache.encode``, hits are counted once.
+        known_keys = key_cache._encoded  # noqa: SLF001
+        encode_key = key_cache.encode
+        hits = 0
         for k, v in self.value.items():
-            payload += write_small_string(k)
-            payload += v.to_bytes()
-        return payload
+            raw = known_keys.get(k)
+            if raw is None:
+                raw = encode_key(k)
+            else:
+                hits += 1
+            out += raw
+            v.write_into(out)
+        key_cache.hits += hits
 
     # noinspection PyTypeChecker
     @classmethod
     def from_buffer(cls, buf: Buffer) -> "SFSObject":
         """Load SFSObject from a buffer."""
-        length = int.from_bytes(buf.read(2), "big")
+        length = buf.read_u16()
         data: dict[str, Field] = {}
         for _ in range(length):
-            obj_name = read_small_string(buf)
+            obj_name = buf.read_key()
             data[obj_name] = decode(buf)
         return cls(data)
 
@@ -91,7 +96,7 @@ class SFSObject(Field[dict[str, Field]]):
         value = self.value.get(item, default)
         if value is None:
             return default
-        if type(value) in (SFSObject, SFSArray):
+        if isinstance(value, SFSObject | SFSArray):
             return value
         return value.value
 
@@ -127,21 +132,21 @@ class SFSObject(Field[dict[str, Field]]):
 
     def values(self) -> Iterator[Any]:
         for v in self.value.values():
-            if type(v) in (SFSObject, SFSArray):
+            if isinstance(v, SFSObject | SFSArray):
                 yield v
             else:
                 yield v.value
 
     def items(self) -> Iterator[tuple[str, Any]]:
-        for k, v in self.items():
-            if type(v) in (SFSObject, SFSArray):
+        for k, v in self.value.items():
+            if isinstance(v, SFSObject | SFSArray):
                 yield k, v
             else:
                 yield k, v.value
 
     def __add__(self, other: Union["SFSObject", dict[str, Field]]) -> "SFSObject":
         """Concat 2 SFSArray."""
-        return SFSObject(self.value | (other.value if type(other) is SFSObject else other))
+        return SFSObject(self.value | (other.value if isinstance(other, SFSObject) else other))
 
     def __or__(self, other: Union["SFSObject", dict[str, Field]]) -> "SFSObject":
         """Concat 2 SFSObjects."""
@@ -188,26 +193,24 @@ class SFSArray(Field[list[Field]]):
 
         self.value = new_value
 
-    def to_bytes(self) -> bytearray:
-        payload = bytearray()
-        payload.append(self.type_code)
-        payload += len(self.value).to_bytes(2, "big")
+    def write_into(self, out: bytearray, /) -> None:
+        out.append(self.type_code)
+        out += len(self.value).to_bytes(2, "big")
         for elem in self.value:
-            payload += elem.to_bytes()
-        return payload
+            elem.write_into(out)
 
     # noinspection PyTypeChecker
     @classmethod
     def from_buffer(cls, buf: Buffer) -> "SFSArray":
         """Load SFSArray from buffer."""
-        length = int.from_bytes(buf.read(2), "big")
+        length = buf.read_u16()
         arr = [decode(buf) for _ in range(length)]
         return cls(arr)
 
     def get(self, index: int) -> Any:  # noqa: ANN401
         """Get item from SFSArray."""
         value = self.value[index]
-        if type(value) in (SFSObject, SFSArray):
+        if isinstance(value, SFSObject | SFSArray):
             return value
         return value.value
 
@@ -228,14 +231,14 @@ class SFSArray(Field[list[Field]]):
     def __iter__(self) -> Iterator[Any]:
         """Iterate all values in SFSArray."""
         for v in self.value:
-            if type(v) in (SFSObject, SFSArray):
+            if isinstance(v, SFSObject | SFSArray):
                 yield v.value
             else:
                 yield v
 
     def __add__(self, other: Union["SFSArray", list[Field]]) -> "SFSArray":
         """Concat 2 SFSArray."""
-        return SFSArray(self.value + (other.value if type(other) is SFSArray else other))
+        return SFSArray(self.value + (other.value if isinstance(other, SFSArray) else other))
 
     def __or__(self, other: Union["SFSArray", list[Field]]) -> "SFSArray":
         """Concat 2 SFSArray."""
@@ -28,7 +28,7 @@ class SFSObject(Field[dict[str, Field]]):
     def put_utf_string(self, key: str, value: str) -> Self: ...
     def put_text(self, key: str, value: str) -> Self: ...
     def put_bool_array(self, key: str, value: list[bool]) -> Self: ...
-    def put_byte_array(self, key: str, value: list[int]) -> Self: ...
+    def put_byte_array(self, key: str, value: list[int] | bytes) -> Self: ...
     def put_short_array(self, key: str, value: list[int]) -> Self: ...
     def put_int_array(self, key: str, value: list[int]) -> Self: ...
     def put_long_array(self, key: str, value: list[int]) -> Self: ...
@@ -61,7 +61,7 @@ class SFSArray(Field[list[Field]]):
     def add_utf_string(self, value: str) -> Self: ...
     def add_text(self, value: str) -> Self: ...
     def add_bool_array(self, value: list[bool]) -> Self: ...
-    def add_byte_array(self, value: list[int]) -> Self: ...
+    def add_byte_array(self, value: list[int] | bytes) -> Self: ...
     def add_short_array(self, value: list[int]) -> Self: ...
     def add_int_array(self, value: list[int]) -> Self: ...
     def add_long_array(self, value: list[int]) -> Self: ...
@@ -4,34 +4,33 @@ import struct
 from dataclasses import dataclass
 from typing import TYPE_CHECKING, ClassVar
 
+from sfs2x.core.buffer import Buffer
 from sfs2x.core.field import Field
 from sfs2x.core.registry import register
 from sfs2x.core.type_codes import TypeCode
 from sfs2x.core.utils import (
     read_big_string,
     read_small_string,
-    write_big_string,
-    write_small_string,
+    write_big_string_into,
+    write_small_string_into,
 )
 
 if TYPE_CHECKING:
-    from sfs2x.core.buffer import Buffer
+    from collections.abc import Callable
 
 
 class _NumericMixin(Field[int]):
     _size: ClassVar[int]
+    _read: ClassVar[Callable[[Buffer], int]]
     type_code: ClassVar[int]
 
-    def to_bytes(self) -> bytearray:
-        payload = bytearray()
-        payload.append(self.type_code)
-        payload += self.value.to_bytes(self._size, "big", signed=True)
-        return payload
+    def write_into(self, out: bytearray, /) -> None:
+        out.append(self.type_code)
+        out += self.value.to_bytes(self._size, "big", signed=True)
 
     @classmethod
     def from_buffer(cls, buf: Buffer) -> _NumericMixin:
-        value = int.from_bytes(buf.read(cls._size), "big", signed=True)
-        return cls(value)
+        return cls(cls._read(buf))
 
 
 @register
@@ -41,16 +40,13 @@ class Bool(Field[bool]): # type: ignore[arg-type]
 
     type_code = TypeCode.BOOL
 
-    def to_bytes(self) -> bytearray:
-        payload = bytearray()
-        payload.append(self.type_code)
-        payload.append(1 if self.value else 0)
-        return payload
+    def write_into(self, out: bytearray, /) -> None:
+        out.append(self.type_code)
+        out.append(1 if self.value else 0)
 
     @classmethod
     def from_buffer(cls, buf: Buffer, /) -> Bool:
-        value = bool(int.from_bytes(buf.read(1), "big"))
-        return cls(value)
+        return cls(bool(buf.read_u8()))
 
 
 @register
@@ -59,6 +55,7 @@ class Byte(_NumericMixin):
     """8-bit integer."""
 
     _size = 1
+    _read = Buffer.read_i8
     type_code = TypeCode.BYTE
 
 
@@ -68,6 +65,7 @@ class Short(_NumericMixin):
     """16-bit integer."""
 
     _size = 2
+    _read = Buffer.read_i16
     type_code = TypeCode.SHORT
 
 
@@ -77,6 +75,7 @@ class Int(_NumericMixin):
     """32-bin integer."""
 
     _size = 4
+    _read = Buffer.read_i32
     type_code = TypeCode.INT
 
 
@@ -86,6 +85,7 @@ class Long(_NumericMixin):
     """64-bit integer."""
 
     _size = 8
+    _read = Buffer.read_i64
     type_code = TypeCode.LONG
 
 
@@ -96,16 +96,13 @@ class Float(Field[float]):
 
     type_code = TypeCode.FLOAT
 
-    def to_bytes(self) -> bytearray:
-        payload = bytearray()
-        payload.append(self.type_code)
-        payload += bytearray(struct.pack("f", self.value))
-        return payload
+    def write_into(self, out: bytearray, /) -> None:
+        out.append(self.type_code)
+        out += struct.pack("f", self.value)
 
     @classmethod
     def from_buffer(cls, buf: Buffer, /) -> Float:
-        value = float(struct.unpack("f", buf.read(4))[0])
-        return cls(value)
+        return cls(buf.read_f32())
 
 
 @register
@@ -115,16 +112,13 @@ class Double(Field[float]):
 
     type_code: ClassVar[int] = TypeCode.DOUBLE
 
-    def to_bytes(self) -> bytearray:
-        payload = bytearray()
-        payload.append(self.type_code)
-        payload += bytearray(struct.pack("d", self.value))
-        return payload
+    def write_into(self, out: bytearray, /) -> None:
+        out.append(self.type_code)
+        out += struct.pack("d", self.value)
 
     @classmethod
     def from_buffer(cls, buf: Buffer, /) -> Double:
-        value = float(struct.unpack("d", buf.read(8))[0])
-        return cls(value)
+        return cls(buf.read_f64())
 
 
 @register
@@ -134,11 +128,9 @@ class UtfString(Field[str]):
 
     type_code: ClassVar[int] = TypeCode.UTF_STRING
 
-    def to_bytes(self) -> bytearray:
-        payload = bytearray()
-        payload.append(self.type_code)
-        payload += write_small_string(self.value)
-        return payload
+    def write_into(self, out: bytearray, /) -> None:
+        out.append(self.type_code)
+        write_small_string_into(out, self.value)
 
     @classmethod
     def from_buffer(cls, buf: Buffer, /) -> UtfString:
@@ -152,11 +144,9 @@ class Text(Field[str]):
 
     type_code: ClassVar[int] = TypeCode.TEXT
 
-    def to_bytes(self) -> bytearray:
-        payload = bytearray()
-        payload.append(self.type_code)
-        payload += write_big_string(self.value)
-        return payload
+    def write_into(self, out: bytearray, /) -> None:
+        out.append(self.type_code)
+        write_big_string_into(out, self.value)
 
     @classmethod
     def from_buffer(cls, buf: Buffer, /) -> Text:
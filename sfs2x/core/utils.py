@@ -7,7 +7,9 @@ __all__ = [
     "read_big_string",
     "read_small_string",
     "write_big_string",
-    "write_small_string"
+    "write_big_string_into",
+    "write_small_string",
+    "write_small_string_into",
 ]
 
 _CAMEL_RE = re.compile(
@@ -20,20 +22,30 @@ _CAMEL_RE = re.compile(
 )
 
 def write_small_string(s: str) -> bytearray:
+    out = bytearray()
+    write_small_string_into(out, s)
+    return out
+
+def write_small_string_into(out: bytearray, s: str) -> None:
     encoded = s.encode("utf-8")
-    return bytearray(len(encoded).to_bytes(2, "big") + encoded)
+    out += len(encoded).to_bytes(2, "big")
+    out += encoded
 
 def read_small_string(buffer: Buffer) -> str:
-    ln = int.from_bytes(buffer.read(2), "big")
-    return bytes(buffer.read(ln)).decode("utf-8")
+    return buffer.read_utf()
 
 def write_big_string(s: str) -> bytearray:
+    out = bytearray()
+    write_big_string_into(out, s)
+    return out
+
+def write_big_string_into(out: bytearray, s: str) -> None:
     encoded = s.encode("utf-8")
-    return bytearray(len(encoded).to_bytes(4, "big") + encoded)
+    out += len(encoded).to_bytes(4, "big")
+    out += encoded
 
 def read_big_string(buffer: Buffer) -> str:
-    ln = int.from_bytes(buffer.read(4), "big")
-    return bytes(buffer.read(ln)).decode("utf-8")
+    return buffer.read_text()
 
 def camel_to_snake(name: str) -> str:
     """Bool → bool, IntArray → int_array, SFSObject → sfs_object."""
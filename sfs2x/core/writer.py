@@ -0,0 +1,125 @@
+import struct
+
+_U8 = struct.Struct(">B")
+_I8 = struct.Struct(">b")
+_U16 = struct.Struct(">H")
+_I16 = struct.Struct(">h")
+_U32 = struct.Struct(">I")
+_I32 = struct.Struct(">i")
+_I64 = struct.Struct(">q")
+_F32 = struct.Struct("f")
+_F64 = struct.Struct("d")
+
+
+class Writer:
+    """
+    Growable binary writer, a counterpart of ``Buffer``.
+
+    Data is written into one buffer, which grows (doubling) and is kept by ``reset``, so a
+    writer reused for many messages stops allocating once it fits the biggest of them.
+    Typed ``write_*`` methods pack big-endian values straight into it, ``reserve`` /
+    ``patch_*`` fill length prefixes later. ``dumps`` serializes fields into a writer too.
+    """
+
+    __slots__ = ("_buf", "_len")
+
+    def __init__(self, capacity: int = 256) -> None:
+        self._buf = bytearray(max(capacity, 1))
+        self._len = 0  # written bytes, the rest of the buffer is spare capacity
+
+    def __len__(self) -> int:
+        """Return number of written bytes."""
+        return self._len
+
+    def __buffer__(self, flags: int) -> memoryview:
+        """Expose written data, so ``bytes(writer)`` and ``memoryview(writer)`` work."""
+        return self.getbuffer()
+
+    def __sizeof__(self) -> int:
+        """Count the whole buffer, spare capacity included."""
+        return object.__sizeof__(self) + self._buf.__sizeof__()
+
+    def write_u8(self, value: int) -> None:
+        _U8.pack_into(self._buf, self._claim(1), value)
+
+    def write_i8(self, value: int) -> None:
+        _I8.pack_into(self._buf, self._claim(1), value)
+
+    def write_u16(self, value: int) -> None:
+        _U16.pack_into(self._buf, self._claim(2), value)
+
+    def write_i16(self, value: int) -> None:
+        _I16.pack_into(self._buf, self._claim(2), value)
+
+    def write_u32(self, value: int) -> None:
+        _U32.pack_into(self._buf, self._claim(4), value)
+
+    def write_i32(self, value: int) -> None:
+        _I32.pack_into(self._buf, self._claim(4), value)
+
+    def write_i64(self, value: int) -> None:
+        _I64.pack_into(self._buf, self._claim(8), value)
+
+    def write_f32(self, value: float) -> None:
+        _F32.pack_into(self._buf, self._claim(4), value)
+
+    def write_f64(self, value: float) -> None:
+        _F64.pack_into(self._buf, self._claim(8), value)
+
+    def write_bytes(self, data: bytes | bytearray | memoryview) -> None:
+        n = len(data)
+        pos = self._claim(n)
+        self._buf[pos:pos + n] = data
+
+    def write_utf(self, s: str) -> None:
+        """Write UTF-8 string with 16-bit length."""
+        encoded = s.encode("utf-8")
+        n = len(encoded)
+        pos = self._claim(2 + n)
+        _U16.pack_into(self._buf, pos, n)
+        self._buf[pos + 2:pos + 2 + n] = encoded
+
+    def write_text(self, s: str) -> None:
+        """Write UTF-8 string with 32-bit length."""
+        encoded = s.encode("utf-8")
+        n = len(encoded)
+        pos = self._claim(4 + n)
+        _U32.pack_into(self._buf, pos, n)
+        self._buf[pos + 4:pos + 4 + n] = encoded
+
+    def reserve(self, n: int) -> int:
+        """Skip ``n`` zero bytes (e.g. length prefix) and return their offset for a later ``patch_*``."""
+        pos = self._claim(n)
+        self._buf[pos:pos + n] = bytes(n)
+        return pos
+
+    def patch_u16(self, offset: int, value: int) -> None:
+        _U16.pack_into(self._buf, offset, value)
+
+    def patch_u32(self, offset: int, value: int) -> None:
+        _U32.pack_into(self._buf, offset, value)
+
+    def reset(self) -> None:
+        """Forget written data, keeping the buffer, views returned by ``getbuffer`` must be released before."""
+        self._len = 0
+
+    def getbuffer(self) -> memoryview:
+        """Return view of written data without copying it."""
+        return memoryview(self._buf)[:self._len]
+
+    def getvalue(self) -> bytes:
+        """Return copy of written data."""
+        with memoryview(self._buf) as mv:
+            return mv[:self._len].tobytes()
+
+    def tell(self) -> int:
+        return self._len
+
+    def _claim(self, n: int) -> int:
+        """Take ``n`` bytes after written data, growing the buffer if needed, and return their offset."""
+        pos = self._len
+        end = pos + n
+        if end > len(self._buf):
+            self._buf += bytes(max(end, 2 * len(self._buf)) - len(self._buf))
+        self._len = end
+        return pos
@@ -6,16 +6,25 @@ except ImportError:
 from sfs2x.protocol.constants import ControllerID, Flag, SysAction  # noqa: I001
 from sfs2x.protocol.exceptions import ProtocolError, UnsupportedFlagError
 from sfs2x.protocol.message import Message
+from sfs2x.protocol.compression import AdaptiveCompression, Compression, CompressionStats
+from sfs2x.protocol.timing import StageStats, TimingCollector, set_timing_hook, timing_hook
 from sfs2x.protocol.codec import decode, encode
 
 __all__ = [
     "AESCipher",
+    "AdaptiveCompression",
+    "Compression",
+    "CompressionStats",
     "ControllerID",
     "Flag",
     "Message",
     "ProtocolError",
+    "StageStats",
     "SysAction",
+    "TimingCollector",
     "UnsupportedFlagError",
     "decode",
-    "encode"
+    "encode",
+    "set_timing_hook",
+    "timing_hook",
 ]
@@ -1,11 +1,36 @@
+import struct
 import zlib
-from typing import overload
+from functools import lru_cache
+from time import perf_counter
+from typing import TYPE_CHECKING, overload
 
-from sfs2x.core import Buffer, SFSObject
-from sfs2x.core import decode as core_decode
-from sfs2x.protocol import AESCipher, Flag, Message, ProtocolError, UnsupportedFlagError
+from sfs2x.core import Buffer, SFSObject, dumps, fast_decode, lazy_decode, profiler
+from sfs2x.protocol import AESCipher, Flag, Message, ProtocolError, UnsupportedFlagError, timing
+
+if TYPE_CHECKING:
+    from sfs2x.core import PayloadProfiler
+    from sfs2x.protocol.compression import Compression
+    from sfs2x.protocol.security import AESCipher as _AESCipher
+    from sfs2x.protocol.timing import TimingHook
 
 _SHORT_MAX = 0xFFFF
+_HEADER_SIZE = 3  # flags and 16-bit length, big packets need 2 more bytes
+_U16 = struct.Struct(">H")
+_U32 = struct.Struct(">I")
+
+@lru_cache(maxsize=64)
+def _cached_cipher(key: bytes) -> "_AESCipher":
+    return AESCipher(key)
+
+
+def get_cipher(encryption_key: "bytes | _AESCipher") -> "_AESCipher":
+    """Return cipher for key (cached) or the cipher itself."""
+    if not isinstance(encryption_key, bytes | bytearray):
+        return encryption_key
+    if AESCipher is None:
+        msg = "Library pycryptodome is not installed. Install it before using encryption (pip install pycryptodome)."
+        raise ImportError(msg)
+    return _cached_cipher(bytes(encryption_key))
 
 
 def _assemble_header(payload_len: int) -> bytearray:
@@ -24,6 +49,33 @@ def _assemble_header(payload_len: int) -> bytearray:
     return hdr
 
 
+def _serialize(msg: Message) -> bytearray:
+    """Serialize message payload after space, reserved for its header (see ``_finish_frame``)."""
+    out = bytearray(_HEADER_SIZE)
+    dumps(msg.to_sfs_object(), out)
+    return out
+
+
+def _finish_frame(out: bytearray, flags: Flag) -> bytearray:
+    """Fill header of a packet, which payload was serialized by ``_serialize``, in place."""
+    payload_len = len(out) - _HEADER_SIZE
+    if payload_len > _SHORT_MAX:
+        out[1:1] = bytes(2)
+        out[0] = flags | Flag.BIG_SIZE
+        _U32.pack_into(out, 1, payload_len)
+    else:
+        out[0] = flags
+        _U16.pack_into(out, 1, payload_len)
+    return out
+
+
+def _encrypted_header(cipher: "_AESCipher", payload_len: int, flags: Flag) -> bytearray:
+    """Assemble header of a packet with ``payload_len`` bytes before encryption."""
+    out = _assemble_header(cipher.encrypted_size(payload_len))
+    out[0] |= flags | Flag.ENCRYPTED
+    return out
+
+
 def _parse_header(buf: Buffer) -> tuple[int, Flag]:
     """Parse first bytes and return packet length and flags."""
     flags = Flag(buf.read(1)[0])
@@ -41,22 +93,105 @@ def _parse_header(buf: Buffer) -> tuple[int, Flag]:
     return length, flags
 
 
-def encode(msg: Message, compress_threshold: int | None = 1024, encryption_key: bytes | None = None) -> bytearray:
-    """Encode message to bytearray, TCP-Ready."""
-    flags = Flag.BINARY
-    payload: bytes = msg.to_sfs_object().to_bytes()
+def encode(
+    msg: Message,
+    compress_threshold: int | None = 1024,
+    encryption_key: "bytes | _AESCipher | None" = None,
+    *,
+    compression: "Compression | None" = None,
+) -> bytearray:
+    """
+    Encode message to bytearray, TCP-Ready, ``encryption_key`` may be a key or ``AESCipher``.
+
+    ``compression`` policy, when given, replaces ``compress_threshold``.
+    """
+    if timing.hook is not None:
+        return _encode_timed(msg, compress_threshold, encryption_key, compression, timing.hook)
+    out = _serialize(msg)
+    if compression is None and compress_threshold is None and encryption_key is None:
+        return _finish_frame(out, Flag.BINARY)
+    with memoryview(out)[_HEADER_SIZE:] as payload:
+        compressed = compress_payload(payload, compress_threshold, compression, msg)
+        if compressed is not None:
+            return frame(compressed, Flag.BINARY | Flag.COMPRESSED, encryption_key)
+        if encryption_key is not None:
+            return frame(payload, Flag.BINARY, encryption_key)
+    return _finish_frame(out, Flag.BINARY)
+
+
+def _encode_timed(
+    msg: Message,
+    compress_threshold: int | None,
+    encryption_key: "bytes | _AESCipher | None",
+    compression: "Compression | None",
+    hook: "TimingHook",
+) -> bytearray:
+    kind = (msg.controller, msg.action, msg.cmd)
+    start = perf_counter()
+    serialized = _serialize(msg)
+    size = len(serialized) - _HEADER_SIZE
+    hook.record("encode", "serialize", kind, perf_counter() - start, 0, size)
+
+    with memoryview(serialized)[_HEADER_SIZE:] as payload:
+        compressed = None
+        if compression is not None or compress_threshold is not None:
+            start = perf_counter()
+            compressed = compress_payload(payload, compress_threshold, compression, msg)
+            seconds = perf_counter() - start
+            hook.record("encode", "compress", kind, seconds, size, len(compressed or payload))
+
+        if compressed is not None or encryption_key is not None:
+            body, flags = (payload, Flag.BINARY) if compressed is None else (compressed, Flag.BINARY | Flag.COMPRESSED)
+            if encryption_key is None:
+                start = perf_counter()
+                out = frame(body, flags)
+                hook.record("encode", "frame", kind, perf_counter() - start, len(body), len(out))
+                return out
+
+            # Header and encryption are separate stages, ciphertext is written right after the header.
+            cipher = get_cipher(encryption_key)
+            start = perf_counter()
+            out = _encrypted_header(cipher, len(body), flags)
+            header_size = len(out)
+            hook.record("encode", "frame", kind, perf_counter() - start, 0, header_size)
+            start = perf_counter()
+            cipher.encrypt_into(out, body)
+            hook.record("encode", "encrypt", kind, perf_counter() - start, len(body), len(out) - header_size)
+            return out
+
+    start = perf_counter()
+    out = _finish_frame(serialized, Flag.BINARY)
+    hook.record("encode", "frame", kind, perf_counter() - start, size, len(out))
+    return out
 
-    if compress_threshold is not None and len(payload) > compress_threshold:
-        payload = zlib.compress(payload)
-        flags |= Flag.COMPRESSED
 
+def compress_payload(
+    payload: bytes | bytearray | memoryview,
+    compress_threshold: int | None,
+    compression: "Compression | None" = None,
+    msg: Message | None = None,
+) -> bytes | None:
+    """Return compressed payload, or ``None``, when it shouldn't be compressed or compressed isn't smaller."""
+    if compression is not None:
+        return compression.apply(payload, msg)
+    if compress_threshold is None or len(payload) <= compress_threshold:
+        return None
+    compressed = zlib.compress(payload)
+    return compressed if len(compressed) < len(payload) else None
+
+
+def frame(
+    payload: bytes | bytearray | memoryview,
+    flags: Flag = Flag.BINARY,
+    encryption_key: "bytes | _AESCipher | None" = None,
+) -> bytearray:
+    """Encrypt (when key is given) serialized, maybe compressed, payload and prepend packet header."""
     if encryption_key is not None:
-        if AESCipher is None:
-            msg = "Library pycryptodome is not installed. Install it before using encryption (pip install pycryptodome)."
-            raise ImportError(msg)
-        cipher = AESCipher(encryption_key)
-        payload = cipher.encrypt(payload)
-        flags |= Flag.ENCRYPTED
+        # Ciphertext is written right after the header, without intermediate copies.
+        cipher = get_cipher(encryption_key)
+        out = _encrypted_header(cipher, len(payload), flags)
+        cipher.encrypt_into(out, payload)
+        return out
 
     header = _assemble_header(len(payload))
     header[0] |= flags
@@ -64,39 +199,98 @@ def encode(msg: Message, compress_threshold: int | None = 1024, encryption_key:
 
 
 @overload
-def decode(buf: Buffer, *, encryption_key: bytes | None = None) -> Message: ...
+def decode(buf: Buffer, *, encryption_key: "bytes | _AESCipher | None" = None, lazy: bool = False,
+           compression: "Compression | None" = None) -> Message: ...
 
 
 @overload
-def decode(raw: bytes | bytearray | memoryview, *, encryption_key: bytes | None = None) -> Message: ...
+def decode(raw: bytes | bytearray | memoryview, *, encryption_key: "bytes | _AESCipher | None" = None, lazy: bool = False,
+           compression: "Compression | None" = None) -> Message: ...
 
 # noinspection PyTypeChecker
-def decode(data, *, encryption_key: bytes | None = None) -> Message:
-    """Decode buffer to message."""
+def decode(data, *, encryption_key: "bytes | _AESCipher | None" = None, lazy: bool = False,
+           compression: "Compression | None" = None) -> Message:
+    """
+    Decode buffer to message, ``lazy`` payload is decoded only on access (see ``lazy_decode``).
+
+    ``compression`` is needed only for packets, compressed with a preset dictionary.
+    """
     buf = data if isinstance(data, Buffer) else Buffer(data)
+    if timing.hook is not None:
+        return _decode_timed(buf, encryption_key, lazy, compression, timing.hook)
 
     length, flags = _parse_header(buf)
     payload_bytes = buf.read(length)
 
     if flags & Flag.ENCRYPTED:
-        if encryption_key is None:
-            msg = "Can't decrypt message without encryption key."
-            raise ProtocolError(msg)
-        if AESCipher is None:
-            msg = "Library pycryptodome is not installed. Install it before using encryption (pip install pycryptodome)."
-            raise ImportError(msg)
-        cipher = AESCipher(encryption_key)
-        try:
-            payload_bytes = cipher.decrypt(payload_bytes)
-        except ValueError as e:
-            msg = "Encryption error occurred."
-            raise ProtocolError(msg) from e
+        payload_bytes = _decrypt(payload_bytes, encryption_key)
 
     if flags & Flag.COMPRESSED:
-        payload_bytes = zlib.decompress(payload_bytes)
+        payload_bytes = zlib.decompress(payload_bytes) if compression is None else compression.decompress(payload_bytes)
+
+    root: SFSObject = lazy_decode(payload_bytes) if lazy else fast_decode(payload_bytes)
+    message = _to_message(root)
+    if profiler.profiler is not None:
+        _profile(profiler.profiler, payload_bytes, message)
+    return message
+
+
+def _decode_timed(
+    buf: Buffer,
+    encryption_key: "bytes | _AESCipher | None",
+    lazy: bool,  # noqa: FBT001
+    compression: "Compression | None",
+    hook: "TimingHook",
+) -> Message:
+    # Message kind is known only at the end, so stages are recorded after deserialization.
+    stages: list[tuple[str, float, int, int]] = []
+    start = perf_counter()
+    length, flags = _parse_header(buf)
+    payload_bytes = buf.read(length)
+    stages.append(("header", perf_counter() - start, length + (5 if flags & Flag.BIG_SIZE else 3), length))
+
+    if flags & Flag.ENCRYPTED:
+        start = perf_counter()
+        payload_bytes = _decrypt(payload_bytes, encryption_key)
+        stages.append(("decrypt", perf_counter() - start, length, len(payload_bytes)))
+
+    if flags & Flag.COMPRESSED:
+        size = len(payload_bytes)
+        start = perf_counter()
+        payload_bytes = zlib.decompress(payload_bytes) if compression is None else compression.decompress(payload_bytes)
+        stages.append(("decompress", perf_counter() - start, size, len(payload_bytes)))
+
+    start = perf_counter()
+    root: SFSObject = lazy_decode(payload_bytes) if lazy else fast_decode(payload_bytes)
+    message = _to_message(root)
+    stages.append(("deserialize", perf_counter() - start, len(payload_bytes), 0))
+
+    kind = (message.controller, message.action, message.cmd)
+    for stage, seconds, bytes_in, bytes_out in stages:
+        hook.record("decode", stage, kind, seconds, bytes_in, bytes_out)
+    if profiler.profiler is not None:
+        _profile(profiler.profiler, payload_bytes, message)
+    return message
+
+
+def _profile(payload_profiler: "PayloadProfiler", payload: bytes | memoryview, message: Message) -> None:
+    if payload_profiler.sample():
+        payload_profiler.record(payload, message.cmd or f"{message.controller}/{message.action}")
+
+
+def _decrypt(payload: bytes | memoryview, encryption_key: "bytes | _AESCipher | None") -> memoryview:
+    if encryption_key is None:
+        msg = "Can't decrypt message without encryption key."
+        raise ProtocolError(msg)
+    cipher = get_cipher(encryption_key)
+    try:
+        return cipher.decrypt_view(payload)
+    except ValueError as e:
+        msg = "Encryption error occurred."
+        raise ProtocolError(msg) from e
 
-    root: SFSObject = core_decode(Buffer(payload_bytes))
 
+def _to_message(root: SFSObject) -> Message:
     controller = root.get("c", 0)
     action = root.get("a", 0)
     params = root.get("p", SFSObject())
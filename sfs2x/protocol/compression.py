@@ -0,0 +1,167 @@
+"""
+Packet compression policy.
+
+Every SFS2X packet is an independent zlib stream, so a stream can't be carried over
+between packets without breaking stock clients. What can be tuned is how each packet is
+compressed: ``level``, ``strategy``, ``mem_level``, window (``wbits``) and a preset
+dictionary (``zdict``). Packets compressed with the dictionary can be decompressed only by
+peers, which use the same one; without it output is interoperable.
+
+A dictionary is set into a template compressor once, every packet copies the template,
+which is cheaper than setting a dictionary of a few kilobytes into a fresh one.
+
+``AdaptiveCompression`` also learns, which messages (by command and size) compress well,
+and stops compressing the rest, e.g. payloads with already compressed blobs.
+"""
+import time
+import zlib
+from dataclasses import dataclass, field, fields
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from sfs2x.protocol.message import Message
+
+__all__ = ["AdaptiveCompression", "Compression", "CompressionStats"]
+
+
+@dataclass(slots=True, eq=False)
+class Compression:
+    """Compression settings of packets, larger than ``threshold`` bytes (``None`` disables compression)."""
+
+    threshold: int | None = 1024
+    level: int = zlib.Z_DEFAULT_COMPRESSION
+    strategy: int = zlib.Z_DEFAULT_STRATEGY
+    mem_level: int = zlib.DEF_MEM_LEVEL
+    wbits: int = zlib.MAX_WBITS
+    zdict: bytes | None = None
+    _template: Any = field(init=False, repr=False, default=None)
+
+    def __post_init__(self) -> None:
+        """Check parameters and prepare template compressor."""
+        if not 9 <= self.wbits <= zlib.MAX_WBITS:  # noqa: PLR2004
+            # Negative (raw deflate) and gzip windows aren't understood by SFS2X peers.
+            msg = "wbits must be in 9..15"
+            raise ValueError(msg)
+        if self.zdict is not None:
+            self._template = zlib.compressobj(
+                self.level, zlib.DEFLATED, self.wbits, self.mem_level, self.strategy, self.zdict)
+
+    def __reduce__(self) -> tuple:
+        """Pickle settings and state without template compressor (rebuilt on load), which can't be pickled."""
+        init = {f.name: getattr(self, f.name) for f in fields(self) if f.init}
+        state = {f.name: getattr(self, f.name) for f in fields(self) if not f.init and f.name != "_template"}
+        return _restore, (type(self), init, state)
+
+    def should_compress(self, size: int) -> bool:
+        return self.threshold is not None and size > self.threshold
+
+    def apply(self, payload: bytes | bytearray, msg: "Message | None" = None) -> bytes | None:  # noqa: ARG002
+        """Return compressed payload, or ``None``, when it isn't worth sending compressed."""
+        if not self.should_compress(len(payload)):
+            return None
+        out = self.compress(payload)
+        return out if len(out) < len(payload) else None
+
+    def compress(self, data: bytes | bytearray | memoryview) -> bytes:
+        if self._template is not None:
+            c = self._template.copy()
+        elif self.strategy == zlib.Z_DEFAULT_STRATEGY and self.mem_level == zlib.DEF_MEM_LEVEL:
+            return zlib.compress(data, self.level, self.wbits)
+        else:
+            c = zlib.compressobj(self.level, zlib.DEFLATED, self.wbits, self.mem_level, self.strategy)
+        return c.compress(data) + c.flush()
+
+    def decompress(self, data: bytes | bytearray | memoryview) -> bytes:
+        if self.zdict is None:
+            return zlib.decompress(data)
+        d = zlib.decompressobj(zlib.MAX_WBITS, self.zdict)
+        out = d.decompress(data)
+        if not d.eof:
+            msg = "Incomplete or truncated stream"
+            raise zlib.error(msg)
+        return out
+
+
+@dataclass(slots=True)
+class CompressionStats:
+    """Counters of ``AdaptiveCompression``."""
+
+    compressed: int = 0  # packets sent compressed
+    skipped: int = 0  # packets above threshold, not compressed, because their kind doesn't compress well
+    rejected: int = 0  # packets compressed, but sent raw, because output wasn't smaller
+    bytes_saved: int = 0
+    cpu_time: float = 0.0  # seconds spent in compression
+
+
+@dataclass(slots=True)
+class _Bucket:
+    ratio: float  # moving average of compressed / raw size
+    skipped: int = 0
+
+
+@dataclass(slots=True, eq=False)
+class AdaptiveCompression(Compression):
+    """
+    Compression, which skips kinds of packets, which don't compress well.
+
+    Packets are grouped by command (``cmd`` of extension messages, controller and action of
+    others) and by power-of-two size bucket. Once average ratio of a group is above
+    ``max_ratio``, its packets are sent raw, and only each ``probe_every``-th of them is
+    compressed to notice a change.
+    """
+
+    max_ratio: float = 0.9
+    probe_every: int = 32
+    _buckets: dict[tuple[Any, int], _Bucket] = field(init=False, repr=False, default_factory=dict)
+    _stats: CompressionStats = field(init=False, repr=False, default_factory=CompressionStats)
+
+    def apply(self, payload: bytes | bytearray, msg: "Message | None" = None) -> bytes | None:
+        size = len(payload)
+        if not self.should_compress(size):
+            return None
+
+        key = (_message_kind(msg), size.bit_length())
+        bucket = self._buckets.get(key)
+        if bucket is not None and bucket.ratio > self.max_ratio:
+            bucket.skipped += 1
+            if bucket.skipped % self.probe_every:
+                self._stats.skipped += 1
+                return None
+
+        start = time.perf_counter()
+        out = self.compress(payload)
+        self._stats.cpu_time += time.perf_counter() - start
+
+        ratio = len(out) / size
+        if bucket is None:
+            self._buckets[key] = _Bucket(ratio)
+        else:
+            bucket.ratio = bucket.ratio * 0.75 + ratio * 0.25
+
+        if len(out) >= size:
+            self._stats.rejected += 1
+            return None
+        self._stats.compressed += 1
+        self._stats.bytes_saved += size - len(out)
+        return out
+
+    def stats(self) -> CompressionStats:
+        s = self._stats
+        return CompressionStats(s.compressed, s.skipped, s.rejected, s.bytes_saved, s.cpu_time)
+
+    def ratios(self) -> dict[tuple[Any, int], float]:
+        """Return average compression ratio of each (message kind, size bit length) group."""
+        return {key: bucket.ratio for key, bucket in self._buckets.items()}
+
+
+def _restore(cls: type[Compression], init: dict[str, Any], state: dict[str, Any]) -> Compression:
+    policy = cls(**init)
+    for name, value in state.items():
+        setattr(policy, name, value)
+    return policy
+
+
+def _message_kind(msg: "Message | None") -> Any:  # noqa: ANN401
+    if msg is None:
+        return None
+    return msg.cmd or (msg.controller, msg.action)
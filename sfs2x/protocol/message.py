@@ -1,6 +1,7 @@
 from dataclasses import dataclass
 
 from sfs2x.core import Byte, Int, SFSObject, Short, UtfString
+from sfs2x.core.registry import Packable
 from sfs2x.protocol import ControllerID, SysAction
 
 
@@ -16,7 +17,7 @@ class Message:
         """Initialize message."""
         self.controller = controller
         self.action = action
-        self.payload = payload if type(payload) is SFSObject else SFSObject(payload)
+        self.payload = payload if isinstance(payload, SFSObject) else SFSObject(payload)
 
 
     def to_sfs_object(self) -> SFSObject:
@@ -28,7 +29,8 @@ class Message:
         })
 
     @classmethod
-    def extension(cls, cmd: str, params: SFSObject | dict, *, request_id: int = -1) -> "Message":
+    def extension(cls, cmd: str, params: SFSObject | dict | Packable, *, request_id: int = -1) -> "Message":
+        """Build extension request, ``params`` may be a ``@schema`` instance (written without boxing)."""
         ext = SFSObject({
             "c": UtfString(cmd),
             "r": Int(request_id),
@@ -36,6 +38,14 @@ class Message:
         })
         return cls(controller=ControllerID.EXTENSION, action=12, payload=ext)
 
+    @property
+    def cmd(self) -> str | None:
+        """Command of extension message, ``None`` for other messages."""
+        if self.controller != ControllerID.EXTENSION:
+            return None
+        cmd = self.payload.get("c")
+        return cmd if isinstance(cmd, str) else None
+
     def __repr__(self) -> str:
         """Return represented message."""
         cname = ControllerID(self.controller).name \
@@ -1,11 +1,14 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from os import urandom
-from typing import Protocol, runtime_checkable
+from threading import Lock
+from typing import Any, Protocol, runtime_checkable
 
 from Crypto.Cipher import AES
-from Crypto.Util.Padding import pad, unpad
+from Crypto.Util.strxor import strxor
 
 _KEY_LENGTH: int = 16
+_BLOCK: int = 16
+_PADS = [bytes((n,)) * n for n in range(_BLOCK + 1)]
 
 
 @runtime_checkable
@@ -19,24 +22,63 @@ class Cipher(Protocol):
 
 @dataclass(slots=True)
 class AESCipher(Cipher):
-    """AES-128-CBC with PKCS#7 and padding (16-bit)."""
+    """
+    AES-128-CBC with PKCS#7 and padding (16-bit).
+
+    Cipher contexts are created once and reused for every message. Encryption chains
+    from the previous message, starting with a random block, which ciphertext becomes
+    the IV of the message, so the output is plain CBC with an unpredictable IV.
+    Decryption is ECB over all blocks, XOR-ed with the previous ciphertext blocks.
+    """
 
     key: bytes  # 16 signs only
+    _encryptor: Any = field(init=False, repr=False, compare=False)
+    _decryptor: Any = field(init=False, repr=False, compare=False)
+    _lock: Lock = field(init=False, repr=False, compare=False)
 
     def __post_init__(self) -> None:
-        """Check key length."""
+        """Check key length and create cipher contexts."""
         if len(self.key) != _KEY_LENGTH:
             msg = "key must be 16 bytes long"
             raise ValueError(msg)
+        self._encryptor = AES.new(self.key, AES.MODE_CBC, urandom(_BLOCK))
+        self._decryptor = AES.new(self.key, AES.MODE_ECB)
+        self._lock = Lock()
+
+    @staticmethod
+    def encrypted_size(n: int) -> int:
+        """Size of IV and ciphertext of ``n`` bytes."""
+        return _BLOCK + (n // _BLOCK + 1) * _BLOCK
 
-    def encrypt(self, data: bytes) -> bytes:
+    def encrypt(self, data: bytes | bytearray | memoryview) -> bytearray:
         """Encrypt data, using AES-128-CBC."""
-        iv = urandom(16)
-        cipher = AES.new(self.key, AES.MODE_CBC, iv)
-        return iv + cipher.encrypt(pad(data, 16))
+        out = bytearray()
+        self.encrypt_into(out, data)
+        return out
+
+    def encrypt_into(self, out: bytearray, data: bytes | bytearray | memoryview) -> None:
+        """Append IV and ciphertext of data to ``out``, encrypting it in place."""
+        start = len(out)
+        out += urandom(_BLOCK)
+        out += data
+        out += _PADS[_BLOCK - len(data) % _BLOCK]
+        with memoryview(out) as mv, self._lock:
+            self._encryptor.encrypt(mv[start:], output=mv[start:])
 
-    def decrypt(self, data: bytes) -> bytes:
+    def decrypt(self, data: bytes | bytearray | memoryview) -> bytes:
         """Decrypt data, using AES-128-CBC."""
-        iv = data[:16]
-        cipher = AES.new(self.key, AES.MODE_CBC, iv)
-        return unpad(cipher.decrypt(data[16:]), 16)
+        return self.decrypt_view(data).tobytes()
+
+    def decrypt_view(self, data: bytes | bytearray | memoryview) -> memoryview:
+        """Decrypt data into view of plaintext without padding, avoiding unpad copy."""
+        n = len(data) - _BLOCK
+        if n <= 0 or n % _BLOCK:
+            msg = "Data must be padded to 16 byte boundary in CBC mode"
+            raise ValueError(msg)
+        with memoryview(data) as mv:
+            plain = strxor(self._decryptor.decrypt(mv[_BLOCK:]), mv[:n])
+        pad = plain[-1]
+        if not 0 < pad <= _BLOCK or plain[-pad:] != _PADS[pad]:
+            msg = "Padding is incorrect."
+            raise ValueError(msg)
+        return memoryview(plain)[:-pad]
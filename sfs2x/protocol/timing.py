@@ -0,0 +1,110 @@
+"""
+Per-stage timing of ``encode`` / ``decode``.
+
+Install a hook (e.g. ``TimingCollector``) with ``set_timing_hook`` or the ``timing_hook``
+context manager, and codec reports every stage it runs: ``serialize``, ``compress``,
+``encrypt`` (ciphertext only) and ``frame`` (header, and payload copy of unencrypted packets)
+when encoding; ``header``, ``decrypt``, ``decompress`` and ``deserialize`` when decoding.
+Each record carries message kind (controller, action and extension ``cmd``), time and sizes
+of stage input and output. Without hook codec only checks one module attribute per call.
+"""
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Protocol
+
+__all__ = ["MessageKind", "StageStats", "TimingCollector", "TimingHook", "set_timing_hook", "timing_hook"]
+
+# (controller, action, extension cmd or None)
+MessageKind = tuple[int, int, str | None]
+
+
+class TimingHook(Protocol):
+    """Receiver of stage timings."""
+
+    def record(self, direction: str, stage: str, kind: MessageKind, seconds: float, bytes_in: int, bytes_out: int) -> None: ...  # noqa: PLR0913, PLR0917
+
+
+hook: TimingHook | None = None
+
+
+def set_timing_hook(new: TimingHook | None) -> TimingHook | None:
+    """Install hook (``None`` disables timing) and return the previous one."""
+    global hook
+    old, hook = hook, new
+    return old
+
+
+@contextmanager
+def timing_hook[H: TimingHook](new: H) -> Iterator[H]:
+    """Install hook for the duration of ``with`` block."""
+    old = set_timing_hook(new)
+    try:
+        yield new
+    finally:
+        set_timing_hook(old)
+
+
+@dataclass(slots=True)
+class StageStats:
+    """Accumulated timings of one stage."""
+
+    count: int = 0
+    seconds: float = 0.0
+    max_seconds: float = 0.0
+    bytes_in: int = 0
+    bytes_out: int = 0
+
+    @property
+    def mean_seconds(self) -> float:
+        return self.seconds / self.count if self.count else 0.0
+
+
+class TimingCollector:
+    """Hook, which accumulates ``StageStats`` per (direction, stage, message kind)."""
+
+    def __init__(self) -> None:
+        self.stats: dict[tuple[str, str, MessageKind], StageStats] = {}
+
+    def record(self, direction: str, stage: str, kind: MessageKind, seconds: float, bytes_in: int, bytes_out: int) -> None:  # noqa: PLR0913, PLR0917
+        key = (direction, stage, kind)
+        s = self.stats.get(key)
+        if s is None:
+            s = self.stats[key] = StageStats()
+        s.count += 1
+        s.seconds += seconds
+        s.max_seconds = max(s.max_seconds, seconds)
+        s.bytes_in += bytes_in
+        s.bytes_out += bytes_out
+
+    def by_stage(self) -> dict[tuple[str, str], StageStats]:
+        """Return stats of stages, summed over message kinds."""
+        out: dict[tuple[str, str], StageStats] = {}
+        for (direction, stage, _), s in self.stats.items():
+            total = out.setdefault((direction, stage), StageStats())
+            total.count += s.count
+            total.seconds += s.seconds
+            total.max_seconds = max(total.max_seconds, s.max_seconds)
+            total.bytes_in += s.bytes_in
+            total.bytes_out += s.bytes_out
+        return out
+
+    def report(self, top: int = 20) -> str:
+        """Format stages and the most expensive (stage, message kind) pairs."""
+        lines = [f"{'stage':<30} {'count':>8} {'total ms':>10} {'mean us':>9} {'max us':>9} {'in KB':>9} {'out KB':>9}"]
+        rows = [(f"{d}.{stage}", s) for (d, stage), s in self.by_stage().items()]
+        rows.append(("", StageStats()))
+        ranked = sorted(self.stats.items(), key=lambda item: item[1].seconds, reverse=True)[:top]
+        rows += [(f"{d}.{stage} {cmd or f'{c}/{a}'}", s) for (d, stage, (c, a, cmd)), s in ranked]
+        for name, s in rows:
+            if not name:
+                lines.append("")
+                continue
+            lines.append(
+                f"{name:<30} {s.count:>8} {s.seconds * 1e3:>10.2f} {s.mean_seconds * 1e6:>9.1f} "
+                f"{s.max_seconds * 1e6:>9.1f} {s.bytes_in / 1024:>9.1f} {s.bytes_out / 1024:>9.1f}",
+            )
+        return "\n".join(lines)
+
+    def reset(self) -> None:
+        self.stats.clear()
@@ -1,12 +1,28 @@
 from sfs2x.transport.base import Acceptor, Transport  # noqa: I001
 from sfs2x.transport.tcp import TCPAcceptor, TCPTransport
+from sfs2x.transport.memory import MemoryAcceptor, MemoryTransport
+from sfs2x.transport.unix import PeerCredentials, UnixAcceptor, UnixTransport
+from sfs2x.transport.workers import WorkerPool
 from sfs2x.transport.factory import client_from_url, server_from_url
+from sfs2x.transport.broadcast import broadcast
+from sfs2x.transport.session import OverflowPolicy, Session, SessionManager, SessionStats
 
 __all__ = [
     "Acceptor",
+    "MemoryAcceptor",
+    "MemoryTransport",
+    "OverflowPolicy",
+    "PeerCredentials",
+    "Session",
+    "SessionManager",
+    "SessionStats",
     "TCPAcceptor",
     "TCPTransport",
     "Transport",
+    "UnixAcceptor",
+    "UnixTransport",
+    "WorkerPool",
+    "broadcast",
     "client_from_url",
     "server_from_url",
 ]
@@ -1,9 +1,12 @@
+import asyncio
 from abc import ABC, abstractmethod
-from collections.abc import AsyncIterator
+from collections.abc import AsyncIterator, Iterable
+from concurrent.futures import Executor
+from functools import partial
 from typing import Protocol
 
 from sfs2x.core import Buffer
-from sfs2x.protocol import Message, decode, encode
+from sfs2x.protocol import AESCipher, Compression, Message, decode, encode
 
 
 class Transport(ABC):
@@ -11,10 +14,32 @@ class Transport(ABC):
 
     _closed: bool
     _compress_threshold: int | None = None
-    _encryption_key: bytes | None = None
+    _compression: Compression | None = None  # replaces ``_compress_threshold``, when set
+    _key: bytes | None = None
+    _cipher: "AESCipher | bytes | None" = None  # cipher of the key, reused for every message
+    _coalesce_max_bytes: int | None = None  # None, when coalescing is disabled
+    _coalesce_max_delay: float = 0.0
+    _offload_threshold: int | None = None  # None, when decode offloading is disabled
+    _offload_executor: Executor | None = None
 
     def __init__(self) -> None:
         self._closed = True
+        self._pending: list[bytes] = []
+        self._pending_bytes = 0
+        self._flush_handle: asyncio.Handle | None = None
+        self._flush_error: Exception | None = None
+        # Keeps order of messages, when recv with offloading is awaited by several tasks.
+        self._recv_lock = asyncio.Lock()
+
+    @property
+    def _encryption_key(self) -> bytes | None:
+        return self._key
+
+    @_encryption_key.setter
+    def _encryption_key(self, key: bytes | None) -> None:
+        self._key = key
+        # Without pycryptodome, codec raises ImportError, when it gets the key.
+        self._cipher = AESCipher(key) if key is not None and AESCipher is not None else key
 
     async def open(self) -> "Transport":
         await self._open()
@@ -25,18 +50,135 @@ class Transport(ABC):
         if self._closed:
             err_msg = "Connection closed by remote host"
             raise ConnectionError(err_msg)
-        await self._send_raw(
-            encode(msg, compress_threshold=self._compress_threshold, encryption_key=self._encryption_key))
+        raw = self._encode(msg)
+        if self._coalesce_max_bytes is None:
+            await self._send_raw(raw)
+        else:
+            self._write_frame(raw)
+            await self._drain()
+
+    async def send_many(self, messages: Iterable[Message]) -> None:
+        """Encode messages and write them with a single write and drain."""
+        if self._closed:
+            err_msg = "Connection closed by remote host"
+            raise ConnectionError(err_msg)
+        raws = [self._encode(msg) for msg in messages]
+        if not raws:
+            return
+        if not self._batching:
+            await self._send_raw(b"".join(raws))
+            return
+        self._pending += raws
+        self._flush_now()
+        await self._drain()
+
+    def enable_coalescing(self, max_bytes: int = 0x10000, max_delay: float = 0.0) -> None:
+        """
+        Gather frames, sent in the same event loop tick (or within ``max_delay`` seconds), into one write.
+
+        Batch is written immediately, once it reaches ``max_bytes``. ``send`` still waits for drain
+        when transport's write buffer is full.
+        """
+        if not self._batching:
+            msg = f"{type(self).__name__} doesn't support coalescing"
+            raise NotImplementedError(msg)
+        self._coalesce_max_bytes = max_bytes
+        self._coalesce_max_delay = max_delay
+
+    async def flush(self) -> None:
+        """Write coalesced frames now."""
+        self._flush_now()
+        await self._drain()
+
+    async def disable_coalescing(self) -> None:
+        self._coalesce_max_bytes = None
+        await self.flush()
+
+    def _encode(self, msg: Message) -> bytearray:
+        return encode(msg, self._compress_threshold, self._cipher, compression=self._compression)  # type: ignore[arg-type]
+
+    @property
+    def write_buffer_size(self) -> int:
+        """Bytes written, but not yet sent to the peer."""
+        return 0
+
+    @property
+    def _batching(self) -> bool:
+        """Whether transport implements ``_write_many`` (and so batching and coalescing)."""
+        return type(self)._write_many is not Transport._write_many  # noqa: SLF001
+
+    def _write_frame(self, raw: bytes) -> None:
+        """Write (or queue, when coalescing) one encoded frame without waiting for drain."""
+        if self._coalesce_max_bytes is None:
+            self._write_many([raw])
+            return
+        if self._flush_error is not None:
+            err, self._flush_error = self._flush_error, None
+            raise err
+        self._pending.append(raw)
+        self._pending_bytes += len(raw)
+        if self._pending_bytes >= self._coalesce_max_bytes:  # type: ignore[operator]
+            self._flush_now()
+        elif self._flush_handle is None:
+            loop = asyncio.get_running_loop()
+            if self._coalesce_max_delay > 0:
+                self._flush_handle = loop.call_later(self._coalesce_max_delay, self._flush_later)
+            else:
+                self._flush_handle = loop.call_soon(self._flush_later)
+
+    def _flush_now(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if self._pending:
+            batch, self._pending, self._pending_bytes = self._pending, [], 0
+            self._write_many(batch)
+
+    def _flush_later(self) -> None:
+        self._flush_handle = None
+        try:
+            self._flush_now()
+        except Exception as e:  # noqa: BLE001
+            # Nobody awaits callback, error is raised by the next send.
+            self._flush_error = e
+
+    def enable_decode_offload(self, threshold: int = 0x40000, executor: Executor | None = None) -> None:
+        """
+        Decode frames of ``threshold`` bytes or more in ``executor`` instead of the event loop.
+
+        By default loop's thread pool is used: it keeps the loop responsive, and zlib and AES
+        release the GIL, but decoding of the SFSObject tree itself is pure Python and holds the
+        GIL, so large uncompressed frames decode no faster than on the loop. Pass
+        ``ProcessPoolExecutor`` to decode them on other cores. Messages are still returned by
+        ``recv`` in the order they were received, also when offloading is reconfigured.
+        """
+        self._offload_threshold = threshold
+        self._offload_executor = executor
+
+    def disable_decode_offload(self) -> None:
+        self._offload_threshold = None
 
     async def recv(self) -> Message:
         if self._closed:
             msg = "Connection closed by remote host"
             raise ConnectionError(msg)
-        raw = await self._recv_raw()
-        return decode(Buffer(raw), encryption_key=self._encryption_key)
+        if self._offload_threshold is None and not self._recv_lock.locked():
+            raw = await self._recv_raw()
+            return decode(Buffer(raw), encryption_key=self._cipher, compression=self._compression)
+
+        async with self._recv_lock:
+            raw = await self._recv_raw()
+            if self._offload_threshold is None or len(raw) < self._offload_threshold:
+                return decode(Buffer(raw), encryption_key=self._cipher, compression=self._compression)
+            # Key (unlike cipher) can be sent to a process pool, codec caches its cipher there.
+            return await asyncio.get_running_loop().run_in_executor(
+                self._offload_executor,
+                partial(decode, raw, encryption_key=self._encryption_key, compression=self._compression))
 
     async def close(self) -> None:
         if not self._closed:
+            if self._pending:
+                self._flush_now()
             await self._close_impl()
             self._closed = True
 
@@ -69,6 +211,14 @@ class Transport(ABC):
     async def _recv_raw(self) -> bytes:
         ...
 
+    def _write_many(self, raws: list[bytes]) -> None:
+        """Write frames without waiting for drain, transports override it to support batching."""
+        raise NotImplementedError
+
+    async def _drain(self) -> None:
+        """Wait until write buffer is below its high-water mark."""
+        return
+
     @abstractmethod
     async def _close_impl(self) -> None:
         ...
@@ -0,0 +1,73 @@
+"""
+Encode-once fan-out of one message to many transports.
+
+The message tree is serialized once and compressed at most once. Transports, which share
+compression decision and encryption key, get the very same frame bytes, so AES runs once
+per distinct key. All frames are written before waiting for any drain, so one slow peer
+doesn't delay delivery to the rest.
+"""
+from collections.abc import Iterable
+
+from sfs2x.core import dumps
+from sfs2x.protocol import Compression, Flag, Message
+from sfs2x.protocol.codec import compress_payload, frame
+from sfs2x.transport.base import Transport
+
+__all__ = ["FrameCache", "broadcast"]
+
+
+class FrameCache:
+    """Frames of one message, built lazily for each transport's compression and encryption settings."""
+
+    __slots__ = ("_compressed", "_frames", "_msg", "_payload")
+
+    def __init__(self, msg: Message) -> None:
+        self._msg = msg
+        self._payload = dumps(msg.to_sfs_object())
+        # Compression variant (policy, or whether threshold is exceeded) -> compressed payload or None
+        self._compressed: dict[Compression | bool, bytes | None] = {}
+        self._frames: dict[tuple[Compression | bool, bytes | None], bytearray] = {}
+
+    def get(self, transport: Transport) -> bytearray:
+        comp, key = transport._compression, transport._encryption_key  # noqa: SLF001
+        threshold = transport._compress_threshold  # noqa: SLF001
+        variant = comp if comp is not None else threshold is not None and len(self._payload) > threshold
+        raw = self._frames.get((variant, key))
+        if raw is None:
+            if variant in self._compressed:
+                compressed = self._compressed[variant]
+            else:
+                compressed = self._compressed[variant] = compress_payload(self._payload, threshold, comp, self._msg)
+            if compressed is not None:
+                raw = frame(compressed, Flag.BINARY | Flag.COMPRESSED, transport._cipher)  # noqa: SLF001
+            else:
+                raw = frame(self._payload, Flag.BINARY, transport._cipher)  # noqa: SLF001
+            self._frames[variant, key] = raw
+        return raw
+
+
+async def broadcast(msg: Message, transports: Iterable[Transport]) -> list[Transport]:
+    """Send ``msg`` to every open transport and return those, which failed to send it."""
+    frames = FrameCache(msg)
+    written: list[Transport] = []
+    failed: list[Transport] = []
+
+    for t in transports:
+        if t._closed:  # noqa: SLF001
+            continue
+        raw = frames.get(t)
+        try:
+            if t._batching:  # noqa: SLF001
+                t._write_frame(raw)  # noqa: SLF001
+                written.append(t)
+            else:
+                await t._send_raw(raw)  # noqa: SLF001
+        except ConnectionError:
+            failed.append(t)
+
+    for t in written:
+        try:
+            await t._drain()  # noqa: SLF001
+        except ConnectionError:
+            failed.append(t)
+    return failed
@@ -1,13 +1,34 @@
 from urllib.parse import urlparse
 
-from sfs2x.transport import Acceptor, TCPAcceptor, TCPTransport, Transport
+from sfs2x.protocol import Compression
+from sfs2x.transport import (
+    Acceptor,
+    MemoryAcceptor,
+    MemoryTransport,
+    TCPAcceptor,
+    TCPTransport,
+    Transport,
+    UnixAcceptor,
+    UnixTransport,
+)
+from sfs2x.transport.framing import MAX_FRAME_SIZE
+from sfs2x.transport.workers import SelectWorker, WorkerPool
 
 
-def client_from_url(url: str, *, compress_threshold: int | None = None, encryption_key: bytes | None = None) -> Transport:
+def client_from_url(
+    url: str,
+    *,
+    compress_threshold: int | None = None,
+    encryption_key: bytes | None = None,
+    compression: Compression | None = None,
+    max_frame_size: int = MAX_FRAME_SIZE,
+) -> Transport:
     """
-    Create transport from url.
+    Create transport from url, ``max_frame_size`` limits received frames of socket transports.
 
     * ``tcp://host:port``
+    * ``mem://name`` (in-process, see ``MemoryAcceptor``)
+    * ``unix:///path/to/socket``, ``unix://@name`` (abstract namespace)
     * ``ws://host:port/path``
     * ``http://host:port/path
     """
@@ -16,22 +37,54 @@ def client_from_url(url: str, *, compress_threshold: int | None = None, encrypti
 
     if scheme == "tcp":
         port = u.port or 9933
-        return TCPTransport(u.hostname or "localhost", port, compress_threshold=compress_threshold, encryption_key=encryption_key)
+        return TCPTransport(u.hostname or "localhost", port, compress_threshold=compress_threshold,
+                            encryption_key=encryption_key, compression=compression, max_frame_size=max_frame_size)
+    if scheme == "mem":
+        return MemoryTransport(u.netloc, compress_threshold, encryption_key, compression=compression)
+    if scheme == "unix":
+        return UnixTransport(u.netloc + u.path, compress_threshold, encryption_key, compression=compression,
+                             max_frame_size=max_frame_size)
     raise NotImplementedError
 
 
-def server_from_url(url: str, compress_threshold: int | None = None, encryption_key: bytes | None = None) -> TCPAcceptor | Acceptor:
+def server_from_url(  # noqa: PLR0913
+    url: str,
+    compress_threshold: int | None = None,
+    encryption_key: bytes | None = None,
+    *,
+    compression: Compression | None = None,
+    max_frame_size: int = MAX_FRAME_SIZE,
+    workers: int | None = None,
+    select_worker: SelectWorker | None = None,
+) -> TCPAcceptor | Acceptor | WorkerPool:
     """
-    Create acceptor from url.
+    Create acceptor from url, ``max_frame_size`` limits received frames of socket transports.
 
     * ``tcp://host:port``
+    * ``mem://name`` (in-process, see ``MemoryAcceptor``)
+    * ``unix:///path/to/socket``, ``unix://@name`` (abstract namespace)
     * ``ws://host:port/path``
     * ``http://host:port/path
+
+    With ``workers`` returns ``WorkerPool`` of that many processes instead, see ``WorkerPool.run``.
     """
     u = urlparse(url)
     scheme = u.scheme.lower()
 
     if scheme == "tcp":
         port = u.port or 9933
-        return TCPAcceptor(u.hostname or "localhost", port, compress_threshold=compress_threshold, encryption_key=encryption_key)
+        if workers is not None:
+            return WorkerPool(u.hostname or "localhost", port, workers, compress_threshold=compress_threshold,
+                              encryption_key=encryption_key, compression=compression, max_frame_size=max_frame_size,
+                              select_worker=select_worker)
+        return TCPAcceptor(u.hostname or "localhost", port, compress_threshold=compress_threshold,
+                           encryption_key=encryption_key, compression=compression, max_frame_size=max_frame_size)
+    if workers is not None:
+        msg = "Multi-process server is supported only over TCP"
+        raise NotImplementedError(msg)
+    if scheme == "mem":
+        return MemoryAcceptor(u.netloc, compress_threshold, encryption_key, compression=compression)
+    if scheme == "unix":
+        return UnixAcceptor(u.netloc + u.path, compress_threshold, encryption_key, compression=compression,
+                            max_frame_size=max_frame_size)
     raise NotImplementedError
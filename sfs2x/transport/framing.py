@@ -0,0 +1,214 @@
+"""
+Streaming SFS2X frame reader on top of ``asyncio.BufferedProtocol``.
+
+Socket data is received straight into one reusable buffer, complete frames (header and
+body) are sliced out of it with a single copy each and queued, so a packet costs no
+extra awaits and no header reassembly. Reading is paused while too many frames wait
+for the consumer. Any number of tasks may wait in ``read_frame`` and ``drain`` at once.
+
+The buffer grows (doubling) as data arrives, never up front from the length a header
+declares, and frames longer than ``max_frame_size`` close the connection.
+"""
+import asyncio
+import contextlib
+import struct
+from collections import deque
+from collections.abc import Callable
+
+from sfs2x.protocol import Flag, ProtocolError
+
+__all__ = ["FrameProtocol"]
+
+_U16 = struct.Struct(">H")
+_U32 = struct.Struct(">I")
+
+_MIN_FREE = 4096
+MAX_FRAME_SIZE = 0x400000  # like default max request size of SFS2X server (4 MB)
+
+
+class FrameProtocol(asyncio.BufferedProtocol):
+    """Protocol, which splits incoming stream into SFS2X frames and controls write flow."""
+
+    def __init__(
+        self,
+        on_connect: Callable[["FrameProtocol"], None] | None = None,
+        *,
+        buffer_size: int = 0x10000,
+        max_pending: int = 64,
+        max_frame_size: int = MAX_FRAME_SIZE,
+    ) -> None:
+        self.transport: asyncio.Transport | None = None
+        self._on_connect = on_connect
+        self._buf = bytearray(buffer_size)
+        self._start = 0  # first byte of unparsed data
+        self._end = 0  # end of received data
+        self._frames: deque[bytes] = deque()
+        self._max_pending = max_pending
+        self._max_frame_size = max_frame_size
+        self._reading_paused = False
+        self._writing_paused = False
+        self._waiters: deque[asyncio.Future[None]] = deque()  # readers
+        self._drain_waiters: deque[asyncio.Future[None]] = deque()  # writers
+        self._exc: Exception | None = None
+        self._closed: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+
+    # asyncio callbacks
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        self.transport = transport  # type: ignore[assignment]
+        if self._on_connect is not None:
+            self._on_connect(self)
+
+    def get_buffer(self, sizehint: int) -> memoryview:
+        free = len(self._buf) - self._end
+        need = max(sizehint, _MIN_FREE)
+        if free < need:
+            self._compact(need)
+        return memoryview(self._buf)[self._end:]
+
+    def buffer_updated(self, nbytes: int) -> None:
+        self._end += nbytes
+        end = self._end
+        start = self._start
+        buf = self._buf
+
+        with memoryview(buf) as mv:
+            while end - start >= 3:  # noqa: PLR2004
+                flags = buf[start]
+                if not flags & Flag.BINARY:
+                    self._fail(ProtocolError("Invalid packet type"))
+                    return
+                if flags & Flag.BIG_SIZE:
+                    if end - start < 5:  # noqa: PLR2004
+                        break
+                    body = start + 5
+                    frame_end = body + _U32.unpack_from(buf, start + 1)[0]
+                else:
+                    body = start + 3
+                    frame_end = body + _U16.unpack_from(buf, start + 1)[0]
+
+                if frame_end - body > self._max_frame_size:
+                    self._fail(ProtocolError("Frame is larger than max_frame_size"))
+                    return
+                if frame_end > end:
+                    break
+                self._frames.append(bytes(mv[start:frame_end]))
+                start = frame_end
+
+        if start == end:
+            start = self._end = 0
+        self._start = start
+
+        if self._frames:
+            self._wake()
+            if len(self._frames) >= self._max_pending and not self._reading_paused and self.transport is not None:
+                self._reading_paused = True
+                self.transport.pause_reading()
+
+    def eof_received(self) -> None:
+        return None
+
+    def connection_lost(self, exc: Exception | None) -> None:  # noqa: ARG002
+        if not self._closed.done():
+            self._closed.set_result(None)
+        self._wake()
+        _complete(self._drain_waiters, ConnectionError("Connection closed by remote host"))
+
+    def pause_writing(self) -> None:
+        self._writing_paused = True
+
+    def resume_writing(self) -> None:
+        self._writing_paused = False
+        _complete(self._drain_waiters)
+
+    # Consumer API
+
+    async def read_frame(self) -> bytes:
+        """Return next complete frame (header included)."""
+        while not self._frames:
+            if self._exc is not None:
+                raise self._exc
+            if self._closed.done():
+                msg = "Connection closed by remote host"
+                raise ConnectionError(msg)
+            await _wait(self._waiters)
+
+        frame = self._frames.popleft()
+        if self._reading_paused and len(self._frames) <= self._max_pending // 2 and self.transport is not None:
+            self._reading_paused = False
+            self.transport.resume_reading()
+        return frame
+
+    def write(self, data: bytes | bytearray | memoryview) -> None:
+        if self.transport is None or self._closed.done():
+            msg = "Connection closed by remote host"
+            raise ConnectionError(msg)
+        self.transport.write(data)
+
+    def writelines(self, data: list[bytes]) -> None:
+        if self.transport is None or self._closed.done():
+            msg = "Connection closed by remote host"
+            raise ConnectionError(msg)
+        self.transport.writelines(data)
+
+    async def drain(self) -> None:
+        """Wait until transport's write buffer is below its high-water mark."""
+        if self._closed.done():
+            msg = "Connection closed by remote host"
+            raise ConnectionError(msg)
+        if not self._writing_paused:
+            return
+        await _wait(self._drain_waiters)
+
+    def close(self) -> None:
+        if self.transport is not None:
+            self.transport.close()
+
+    async def wait_closed(self) -> None:
+        await self._closed
+
+    # Internals
+
+    def _compact(self, need: int) -> None:
+        """Move unparsed data to the front of the buffer, growing it if there is not enough room."""
+        pending = self._end - self._start
+        if pending + need <= len(self._buf):
+            # Same-size slice assignment, doesn't resize the buffer.
+            self._buf[:pending] = self._buf[self._start:self._end]
+        else:
+            buf = bytearray(max(len(self._buf) * 2, pending + need))
+            buf[:pending] = self._buf[self._start:self._end]
+            self._buf = buf
+        self._start, self._end = 0, pending
+
+    def _wake(self) -> None:
+        # Every reader is woken and checks for frames itself, so a cancelled one doesn't strand a frame.
+        _complete(self._waiters)
+
+    def _fail(self, exc: Exception) -> None:
+        self._exc = exc
+        self._wake()
+        if self.transport is not None:
+            self.transport.close()
+
+
+async def _wait(waiters: deque[asyncio.Future[None]]) -> None:
+    """Wait on a future of its own, added to ``waiters``."""
+    waiter = asyncio.get_running_loop().create_future()
+    waiters.append(waiter)
+    try:
+        await waiter
+    finally:
+        with contextlib.suppress(ValueError):
+            waiters.remove(waiter)
+
+
+def _complete(waiters: deque[asyncio.Future[None]], exc: Exception | None = None) -> None:
+    """Wake all ``waiters``, which aren't done (e.g. cancelled), raising ``exc`` in them if given."""
+    for waiter in waiters:
+        if not waiter.done():
+            if exc is None:
+                waiter.set_result(None)
+            else:
+                waiter.set_exception(exc)
+    waiters.clear()
@@ -0,0 +1,276 @@
+"""
+In-process transport: ``mem://name``.
+
+``MemoryAcceptor(name)`` listens on a name in the current process, ``MemoryTransport(name)``
+connects to it. Each direction of a connection is a queue of frames in memory, so services,
+running in one event loop, talk without sockets, and benchmarks measure codec without kernel.
+
+By default encoded frames are passed, exactly as over TCP. When both ends are created with
+``skip_codec=True``, ``send`` passes ``Message`` objects themselves, without encode and decode.
+Such messages are shared by both ends, so they shouldn't be changed after ``send``.
+Frames written directly (``broadcast``, ``Session.send_frame``) are still decoded by ``recv``.
+Queued messages aren't encoded, so ``write_buffer_size`` counts each of them as ``MESSAGE_SIZE`` bytes.
+"""
+import asyncio
+import contextlib
+import errno
+import logging
+from collections import deque
+from collections.abc import AsyncIterator, Iterable
+
+from sfs2x.core import Buffer
+from sfs2x.protocol import Compression, Message, decode
+from sfs2x.transport.base import Acceptor, Transport
+
+__all__ = ["MESSAGE_SIZE", "MemoryAcceptor", "MemoryTransport"]
+
+logger = logging.getLogger("SFS2X/MemoryTransport")
+
+_acceptors: dict[str, "MemoryAcceptor"] = {}
+
+# Size, which a queued ``Message`` is assumed to have in ``write_buffer_size`` (typical small message).
+MESSAGE_SIZE = 128
+
+
+def _size(item: bytes | Message) -> int:
+    return MESSAGE_SIZE if isinstance(item, Message) else len(item)
+
+
+class _Channel:
+    """One direction of a connection: frames (or messages) with flow control like ``FrameProtocol``."""
+
+    def __init__(self, max_pending: int) -> None:
+        self.items: deque[bytes | Message] = deque()
+        self.bytes = 0
+        self.closed = False
+        self._max_pending = max_pending
+        self._waiters: deque[asyncio.Future[None]] = deque()  # readers, woken one per item
+        self._drain_waiters: deque[asyncio.Future[None]] = deque()  # writers, woken all at once
+
+    def put(self, item: bytes | Message) -> None:
+        if self.closed:
+            msg = "Connection closed by remote host"
+            raise ConnectionError(msg)
+        self.items.append(item)
+        self.bytes += _size(item)
+        self._wakeup_next()
+
+    async def get(self) -> bytes | Message:
+        """Return next item, queued items are still returned after close."""
+        while not self.items:
+            if self.closed:
+                msg = "Connection closed by remote host"
+                raise ConnectionError(msg)
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                waiter.cancel()
+                with contextlib.suppress(ValueError):
+                    self._waiters.remove(waiter)
+                # Item, this reader was woken for, goes to the next one.
+                if self.items and not waiter.cancelled():
+                    self._wakeup_next()
+                raise
+
+        item = self.items.popleft()
+        self.bytes -= _size(item)
+        if self._drain_waiters and len(self.items) <= self._max_pending // 2:
+            for waiter in self._drain_waiters:
+                if not waiter.done():
+                    waiter.set_result(None)
+            self._drain_waiters.clear()
+        return item
+
+    async def drain(self) -> None:
+        """Wait until reader takes items, while ``max_pending`` or more of them are queued."""
+        if self.closed:
+            msg = "Connection closed by remote host"
+            raise ConnectionError(msg)
+        if len(self.items) < self._max_pending:
+            return
+        # Each writer has its own future, so cancelling one doesn't cancel the others.
+        waiter = asyncio.get_running_loop().create_future()
+        self._drain_waiters.append(waiter)
+        try:
+            await waiter
+        finally:
+            with contextlib.suppress(ValueError):
+                self._drain_waiters.remove(waiter)
+
+    def _wakeup_next(self) -> None:
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+
+    def close(self) -> None:
+        self.closed = True
+        for waiter in self._waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+        self._waiters.clear()
+        for waiter in self._drain_waiters:
+            if not waiter.done():
+                waiter.set_exception(ConnectionError("Connection closed by remote host"))
+        self._drain_waiters.clear()
+
+
+class MemoryTransport(Transport):
+    """Client of ``MemoryAcceptor`` with the same ``name`` in this process."""
+
+    def __init__(  # noqa: PLR0913
+        self,
+        name: str,
+        compress_threshold: int | None = None,
+        encryption_key: bytes | None = None,
+        *,
+        compression: Compression | None = None,
+        skip_codec: bool = False,
+        max_pending: int = 1024,
+    ) -> None:
+        super().__init__()
+        self._name = name
+        self._encryption_key = encryption_key
+        self._compress_threshold = compress_threshold
+        self._compression = compression
+        self._skip_codec = skip_codec  # requested, set to the agreed value on connect
+        self._max_pending = max_pending
+        self._inbox: _Channel | None = None
+        self._outbox: _Channel | None = None
+
+    @property
+    def host(self) -> str:
+        return self._name
+
+    @property
+    def port(self) -> int:
+        return 0
+
+    @property
+    def skip_codec(self) -> bool:
+        """Whether messages are passed without encode and decode (both ends asked for it)."""
+        return self._skip_codec
+
+    @property
+    def write_buffer_size(self) -> int:
+        return self._outbox.bytes if self._outbox is not None else 0
+
+    async def send(self, msg: Message) -> None:
+        if not self._skip_codec:
+            await super().send(msg)
+            return
+        if self._closed:
+            err_msg = "Connection closed by remote host"
+            raise ConnectionError(err_msg)
+        self._outbox.put(msg)  # type: ignore[union-attr]
+        await self._drain()
+
+    async def send_many(self, messages: Iterable[Message]) -> None:
+        if not self._skip_codec:
+            await super().send_many(messages)
+            return
+        if self._closed:
+            err_msg = "Connection closed by remote host"
+            raise ConnectionError(err_msg)
+        for msg in messages:
+            self._outbox.put(msg)  # type: ignore[union-attr]
+        await self._drain()
+
+    async def recv(self) -> Message:
+        if not self._skip_codec:
+            return await super().recv()
+        if self._closed:
+            msg = "Connection closed by remote host"
+            raise ConnectionError(msg)
+        item = await self._channel(self._inbox).get()
+        if isinstance(item, Message):
+            return item
+        return decode(Buffer(item), encryption_key=self._cipher, compression=self._compression)
+
+    async def _open(self) -> None:
+        acceptor = _acceptors.get(self._name)
+        if acceptor is None:
+            msg = f"No memory acceptor named {self._name!r}"
+            raise ConnectionRefusedError(errno.ECONNREFUSED, msg)
+        acceptor._on_conn(self)  # noqa: SLF001
+        logger.info("Opened connection to mem://%s", self._name)
+
+    async def _send_raw(self, raw: bytes) -> None:
+        self._channel(self._outbox).put(raw)
+        await self._drain()
+
+    def _write_many(self, raws: list[bytes]) -> None:
+        outbox = self._channel(self._outbox)
+        for raw in raws:
+            outbox.put(raw)
+
+    async def _drain(self) -> None:
+        await self._channel(self._outbox).drain()
+
+    async def _recv_raw(self) -> bytes:
+        return await self._channel(self._inbox).get()  # type: ignore[return-value]
+
+    async def _close_impl(self) -> None:
+        # Peer still reads frames sent before close, then gets ConnectionError.
+        for channel in (self._inbox, self._outbox):
+            if channel is not None:
+                channel.close()
+        logger.info("Closed connection to mem://%s", self._name)
+
+    @staticmethod
+    def _channel(channel: _Channel | None) -> _Channel:
+        if channel is None:
+            msg = "Connection closed by remote host"
+            raise ConnectionError(msg)
+        return channel
+
+
+class MemoryAcceptor(Acceptor):
+    """Server side of ``mem://name``, listens while it is iterated."""
+
+    def __init__(  # noqa: PLR0913
+        self,
+        name: str,
+        compress_threshold: int | None = None,
+        encryption_key: bytes | None = None,
+        *,
+        compression: Compression | None = None,
+        skip_codec: bool = False,
+        max_pending: int = 1024,
+    ) -> None:
+        super().__init__()
+        self._name = name
+        self._compress_threshold = compress_threshold
+        self._encryption_key = encryption_key
+        self._compression = compression
+        self._skip_codec = skip_codec
+        self._max_pending = max_pending
+        self._queue: asyncio.Queue[MemoryTransport] = asyncio.Queue()
+
+    async def __aiter__(self) -> AsyncIterator[Transport]:  # type: ignore  # noqa: PGH003
+        """Iterate all new connections."""
+        if self._name in _acceptors:
+            msg = f"Memory acceptor {self._name!r} already exists"
+            raise OSError(errno.EADDRINUSE, msg)
+        _acceptors[self._name] = self
+        logger.info("Started server on mem://%s", self._name)
+        try:
+            while True:
+                yield await self._queue.get()
+        finally:
+            if _acceptors.get(self._name) is self:
+                del _acceptors[self._name]
+
+    def _on_conn(self, client: MemoryTransport) -> None:
+        skip_codec = self._skip_codec and client._skip_codec  # noqa: SLF001
+        server = MemoryTransport(self._name, self._compress_threshold, self._encryption_key,
+                                 compression=self._compression, skip_codec=skip_codec, max_pending=self._max_pending)
+        to_server, to_client = _Channel(client._max_pending), _Channel(self._max_pending)  # noqa: SLF001
+        client._outbox = server._inbox = to_server  # noqa: SLF001
+        client._inbox = server._outbox = to_client  # noqa: SLF001
+        client._skip_codec = skip_codec  # noqa: SLF001
+        server._closed = False  # noqa: SLF001
+        self._queue.put_nowait(server)
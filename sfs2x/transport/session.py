@@ -0,0 +1,243 @@
+"""
+Server-side sessions with bounded outgoing queues.
+
+Every ``Session`` owns a writer task, which writes all queued frames at once and then waits
+for drain. ``Session.send`` only queues encoded frame and never waits, so a slow client
+fills its own queue instead of stalling the caller; what happens once the queue is full
+is decided by ``OverflowPolicy``.
+"""
+import asyncio
+import logging
+from collections import deque
+from collections.abc import AsyncIterator, Callable, Iterable
+from dataclasses import dataclass, fields
+from enum import StrEnum
+from typing import Self
+
+from sfs2x.protocol import Message
+from sfs2x.transport.base import Acceptor, Transport
+from sfs2x.transport.broadcast import FrameCache
+
+__all__ = ["OverflowPolicy", "Session", "SessionManager", "SessionStats"]
+
+logger = logging.getLogger("SFS2X/Session")
+
+
+class OverflowPolicy(StrEnum):
+    """What to do with a frame, which doesn't fit into the full queue."""
+
+    DROP_OLDEST = "drop_oldest"
+    DROP_NEWEST = "drop_newest"
+    DISCONNECT = "disconnect"
+
+
+@dataclass(slots=True)
+class SessionStats:
+    """Counters of one session (or sums over all sessions of a manager)."""
+
+    queued_frames: int = 0
+    queued_bytes: int = 0
+    buffered_bytes: int = 0  # written to transport, but not sent to socket yet
+    sent_frames: int = 0
+    sent_bytes: int = 0
+    dropped_frames: int = 0
+    overflows: int = 0
+
+    @property
+    def bytes_in_flight(self) -> int:
+        return self.queued_bytes + self.buffered_bytes
+
+    def __iadd__(self, other: "SessionStats") -> Self:
+        """Add counters of another session."""
+        for f in fields(self):
+            setattr(self, f.name, getattr(self, f.name) + getattr(other, f.name))
+        return self
+
+
+class Session:
+    """Transport wrapper with bounded send queue, drained by its own writer task."""
+
+    def __init__(
+        self,
+        transport: Transport,
+        *,
+        max_frames: int = 256,
+        max_bytes: int | None = None,
+        policy: OverflowPolicy = OverflowPolicy.DROP_OLDEST,
+        on_close: Callable[["Session"], None] | None = None,
+    ) -> None:
+        self.transport = transport
+        self.max_frames = max_frames
+        self.max_bytes = max_bytes
+        self.policy = OverflowPolicy(policy)
+        self._on_close = on_close
+        self._queue: deque[bytes] = deque()
+        self._queued_bytes = 0
+        self._stats = SessionStats()
+        self._wakeup = asyncio.Event()
+        self._closing = False
+        self._writer = asyncio.get_running_loop().create_task(self._write_loop())
+
+    @property
+    def closed(self) -> bool:
+        return self._closing
+
+    def send(self, msg: Message) -> bool:
+        """Encode and queue message, return ``False`` if it was dropped."""
+        return self.send_frame(self.transport._encode(msg))  # noqa: SLF001
+
+    def send_frame(self, raw: bytes) -> bool:
+        """Queue already encoded frame, return ``False`` if it was dropped."""
+        if self._closing:
+            return False
+        if self._overflows(len(raw)):
+            self._stats.overflows += 1
+            too_big = self.max_bytes is not None and len(raw) > self.max_bytes
+            if self.policy is OverflowPolicy.DROP_NEWEST or too_big:
+                self._stats.dropped_frames += 1
+                return False
+            if self.policy is OverflowPolicy.DISCONNECT:
+                logger.warning("Send queue overflow, disconnecting %s:%s", self.transport.host, self.transport.port)
+                self.abort()
+                return False
+            while self._queue and self._overflows(len(raw)):
+                self._queued_bytes -= len(self._queue.popleft())
+                self._stats.dropped_frames += 1
+
+        self._queue.append(raw)
+        self._queued_bytes += len(raw)
+        self._wakeup.set()
+        return True
+
+    async def recv(self) -> Message:
+        return await self.transport.recv()
+
+    def listen(self) -> AsyncIterator[Message]:
+        return self.transport.listen()
+
+    def stats(self) -> SessionStats:
+        stats = SessionStats(**{f.name: getattr(self._stats, f.name) for f in fields(SessionStats)})
+        stats.queued_frames = len(self._queue)
+        stats.queued_bytes = self._queued_bytes
+        stats.buffered_bytes = self.transport.write_buffer_size
+        return stats
+
+    def abort(self) -> None:
+        """Drop queued frames and close connection in background."""
+        if self._closing:
+            return
+        self._queue.clear()
+        self._queued_bytes = 0
+        self._writer.cancel()
+        self._closing = True
+        self._writer = asyncio.get_running_loop().create_task(self._close())
+
+    async def close(self) -> None:
+        """Send queued frames and close connection."""
+        if not self._closing:
+            self._closing = True
+            self._wakeup.set()
+        await self._writer
+
+    def _overflows(self, size: int) -> bool:
+        if len(self._queue) >= self.max_frames:
+            return True
+        return self.max_bytes is not None and self._queued_bytes + size > self.max_bytes
+
+    async def _write_loop(self) -> None:
+        t = self.transport
+        cancelled = False
+        try:
+            while True:
+                if not self._queue:
+                    if self._closing:
+                        break
+                    self._wakeup.clear()
+                    await self._wakeup.wait()
+                    continue
+
+                batch = list(self._queue)
+                size = self._queued_bytes
+                self._queue.clear()
+                self._queued_bytes = 0
+                if t._batching:  # noqa: SLF001
+                    t._write_many(batch)  # noqa: SLF001
+                    await t._drain()  # noqa: SLF001
+                else:
+                    await t._send_raw(b"".join(batch))  # noqa: SLF001
+                self._stats.sent_frames += len(batch)
+                self._stats.sent_bytes += size
+        except OSError as e:  # ConnectionError included
+            logger.info("Session %s:%s lost: %s", t.host, t.port, e)
+        except asyncio.CancelledError:
+            cancelled = True  # abort() closes transport itself
+            raise
+        finally:
+            self._closing = True
+            self._queue.clear()
+            self._queued_bytes = 0
+            if not cancelled:
+                await self._close()
+
+    async def _close(self) -> None:
+        try:
+            await self.transport.close()
+        finally:
+            if self._on_close is not None:
+                self._on_close(self)
+
+
+class SessionManager:
+    """
+    Wraps accepted transports into ``Session`` objects and keeps track of them.
+
+    Iterate over the manager instead of the acceptor::
+
+        async for session in SessionManager(server_from_url("tcp://0.0.0.0:9933"), max_frames=128):
+            asyncio.create_task(handle(session))
+    """
+
+    def __init__(
+        self,
+        acceptor: Acceptor,
+        *,
+        max_frames: int = 256,
+        max_bytes: int | None = None,
+        policy: OverflowPolicy = OverflowPolicy.DROP_OLDEST,
+    ) -> None:
+        self._acceptor = acceptor
+        self._options = {"max_frames": max_frames, "max_bytes": max_bytes, "policy": policy}
+        self.sessions: set[Session] = set()
+
+    def add(self, transport: Transport) -> Session:
+        """Start session over already opened transport."""
+        session = Session(transport, on_close=self.sessions.discard, **self._options)  # type: ignore[arg-type]
+        self.sessions.add(session)
+        return session
+
+    async def __aiter__(self) -> AsyncIterator[Session]:
+        """Accept connections and yield their sessions."""
+        async for transport in self._acceptor:
+            yield self.add(transport)
+
+    def __len__(self) -> int:
+        """Return number of open sessions."""
+        return len(self.sessions)
+
+    def broadcast(self, msg: Message, sessions: Iterable[Session] | None = None) -> int:
+        """Queue message to sessions (all by default), encoding it once per key, and return number of queued."""
+        frames = FrameCache(msg)
+        queued = 0
+        for session in list(self.sessions if sessions is None else sessions):
+            if not session.closed:
+                queued += session.send_frame(frames.get(session.transport))
+        return queued
+
+    def stats(self) -> SessionStats:
+        total = SessionStats()
+        for session in self.sessions:
+            total += session.stats()
+        return total
+
+    async def close(self) -> None:
+        await asyncio.gather(*(session.close() for session in list(self.sessions)))
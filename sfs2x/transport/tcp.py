@@ -1,25 +1,36 @@
 import asyncio
 import logging
-from asyncio import AbstractServer, IncompleteReadError, StreamReader, StreamWriter, get_running_loop, start_server
+from asyncio import AbstractServer, get_running_loop
 from collections.abc import AsyncIterator
 
-from sfs2x.protocol import Flag
+from sfs2x.protocol import Compression
 from sfs2x.transport import Acceptor, Transport
+from sfs2x.transport.framing import MAX_FRAME_SIZE, FrameProtocol
 
 logger = logging.getLogger("SFS2X/TCPTransport")
 
 
 class TCPTransport(Transport):
-    """SmartFox Transport realisation with Async Streams."""
-
-    def __init__(self, host: str, port: int, compress_threshold: int | None = None, encryption_key: bytes | None = None) -> None:
+    """SmartFox Transport realisation with asyncio protocol, see ``FrameProtocol`` (and its ``max_frame_size``)."""
+
+    def __init__(  # noqa: PLR0913
+        self,
+        host: str,
+        port: int,
+        compress_threshold: int | None = None,
+        encryption_key: bytes | None = None,
+        *,
+        compression: Compression | None = None,
+        max_frame_size: int = MAX_FRAME_SIZE,
+    ) -> None:
         super().__init__()
         self._host = host
         self._port = port
-        self._reader: StreamReader | None = None
-        self._writer: StreamWriter | None = None
+        self._protocol: FrameProtocol | None = None
         self._encryption_key = encryption_key
         self._compress_threshold = compress_threshold
+        self._compression = compression
+        self._max_frame_size = max_frame_size
 
     @property
     def host(self) -> str:
@@ -29,68 +40,84 @@ class TCPTransport(Transport):
     def port(self) -> int:
         return self._port
 
+    @property
+    def write_buffer_size(self) -> int:
+        if self._protocol is None or self._protocol.transport is None:
+            return 0
+        return self._protocol.transport.get_write_buffer_size()
+
+    def _new_protocol(self) -> FrameProtocol:
+        return FrameProtocol(max_frame_size=self._max_frame_size)
+
     async def _open(self) -> None:
-        self._reader, self._writer = await asyncio.open_connection(self._host, self._port)
+        _, self._protocol = await get_running_loop().create_connection(self._new_protocol, self._host, self._port)
         logger.info("Opened connection to %s:%s", self._host, self._port)
 
     async def _send_raw(self, raw: bytes) -> None:
-        if not self._writer:
+        if not self._protocol:
             msg = "Connection closed by remote host"
             raise ConnectionError(msg)
 
-        self._writer.write(raw)
-        await self._writer.drain()
+        self._protocol.write(raw)
+        await self._protocol.drain()
         logger.info("Sent %s bytes", {len(raw)})
 
-    async def _recv_raw(self) -> bytes:
-        if not self._reader:
+    def _write_many(self, raws: list[bytes]) -> None:
+        if not self._protocol:
             msg = "Connection closed by remote host"
             raise ConnectionError(msg)
 
-        try:
-            _flags = await self._reader.readexactly(1)
-            flags = Flag(_flags[0])
-            if not flags & Flag.BINARY:
-                msg = "Invalid packet type"
-                raise RuntimeWarning(msg)
-
-            len_bytes = await self._reader.readexactly(2)
-            if flags & Flag.BIG_SIZE:
-                len_bytes += await self._reader.readexactly(2)
-
-            length = int.from_bytes(len_bytes, byteorder="big", signed=False)
-            body = await self._reader.readexactly(length)
-        except IncompleteReadError as e:
-            msg = "Connection closed by remote host"
-            raise ConnectionError(msg) from e
+        self._protocol.writelines(raws)
+        logger.info("Sent %s frames", len(raws))
+
+    async def _drain(self) -> None:
+        if self._protocol:
+            await self._protocol.drain()
 
-        logger.info("Received %s bytes from %s:%s", length, self._host, self._port)
+    async def _recv_raw(self) -> bytes:
+        if not self._protocol:
+            msg = "Connection closed by remote host"
+            raise ConnectionError(msg)
 
-        return _flags + len_bytes + body
+        frame = await self._protocol.read_frame()
+        logger.info("Received %s bytes from %s:%s", len(frame), self._host, self._port)
+        return frame
 
     async def _close_impl(self) -> None:
-        if self._writer:
-            self._writer.close()
-            await self._writer.wait_closed()
+        if self._protocol:
+            self._protocol.close()
+            await self._protocol.wait_closed()
         logger.info("Closed connection to %s:%s", self._host, self._port)
 
 
 class TCPAcceptor(Acceptor):
     """Server-Side implementation of the TCP Acceptor."""
 
-    def __init__(self, host: str, port: int, compress_threshold: int | None = None, encryption_key: bytes | None = None) -> None:
+    def __init__(  # noqa: PLR0913
+        self,
+        host: str,
+        port: int,
+        compress_threshold: int | None = None,
+        encryption_key: bytes | None = None,
+        *,
+        compression: Compression | None = None,
+        reuse_port: bool = False,
+        max_frame_size: int = MAX_FRAME_SIZE,
+    ) -> None:
         super().__init__()
         self._host = host
         self._port = port
         self._server: AbstractServer | None = None
         self._compress_threshold = compress_threshold
+        self._compression = compression
         self._encryption_key = encryption_key
+        self._reuse_port = reuse_port
+        self._max_frame_size = max_frame_size
 
     async def __aiter__(self) -> AsyncIterator[Transport]:  # type: ignore  # noqa: PGH003
         """Iterate all new connections."""
         loop = get_running_loop()
-        self._server = await start_server(self._on_conn, self._host, self._port)
-        logger.info("Started server on %s:%s", self._host, self._port)
+        self._server = await self._start_server()
 
         self._queue: asyncio.Queue[TCPTransport] = asyncio.Queue()
 
@@ -106,13 +133,25 @@ class TCPAcceptor(Acceptor):
         finally:
             self._server.close()
 
-    async def _on_conn(self, reader: StreamReader, writer: StreamWriter) -> None:
-        host, port = writer.get_extra_info("peername")
+    async def _start_server(self) -> AbstractServer:
+        server = await get_running_loop().create_server(
+            self._new_protocol, self._host, self._port, reuse_port=self._reuse_port or None)
+        logger.info("Started server on %s:%s", self._host, self._port)
+        return server
+
+    def _new_protocol(self) -> FrameProtocol:
+        return FrameProtocol(self._on_conn, max_frame_size=self._max_frame_size)
+
+    def _new_transport(self, protocol: FrameProtocol) -> TCPTransport:
+        host, port = protocol.transport.get_extra_info("peername")[:2]  # type: ignore[union-attr]
         logger.info("Connection from %s:%s", host, port)
-        transport = TCPTransport(host, port)
-        transport._reader = reader  # noqa: SLF001
-        transport._writer = writer  # noqa: SLF001
+        return TCPTransport(host, port)
+
+    def _on_conn(self, protocol: FrameProtocol) -> None:
+        transport = self._new_transport(protocol)
+        transport._protocol = protocol  # noqa: SLF001
         transport._closed = False  # noqa: SLF001
         transport._encryption_key = self._encryption_key  # noqa: SLF001
         transport._compress_threshold = self._compress_threshold  # noqa: SLF001
-        await self._queue.put(transport)
+        transport._compression = self._compression  # noqa: SLF001
+        self._queue.put_nowait(transport)
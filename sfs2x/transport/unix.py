@@ -0,0 +1,121 @@
+"""
+Unix domain socket transport: ``unix:///path/to/socket``.
+
+Same framing as ``TCPTransport`` (``FrameProtocol``) over ``AF_UNIX`` sockets, which skip
+the TCP stack and have lower latency between processes of one host. Paths, starting with
+``@`` (or a NUL byte), are Linux abstract namespace names, which need no file and no cleanup.
+On platforms with ``SO_PEERCRED`` connections report pid, uid and gid of the peer process.
+"""
+import contextlib
+import logging
+import os
+import socket
+import struct
+from asyncio import AbstractServer, get_running_loop
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+
+from sfs2x.protocol import Compression
+from sfs2x.transport.base import Transport
+from sfs2x.transport.framing import MAX_FRAME_SIZE, FrameProtocol
+from sfs2x.transport.tcp import TCPAcceptor, TCPTransport
+
+__all__ = ["PeerCredentials", "UnixAcceptor", "UnixTransport"]
+
+logger = logging.getLogger("SFS2X/UnixTransport")
+
+_PEERCRED = struct.Struct("3i")
+
+
+@dataclass(slots=True, frozen=True)
+class PeerCredentials:
+    """Process on the other end of unix socket."""
+
+    pid: int
+    uid: int
+    gid: int
+
+
+def _socket_path(path: str) -> str:
+    return "\0" + path[1:] if path.startswith("@") else path
+
+
+def _is_abstract(path: str) -> bool:
+    return path.startswith("\0")
+
+
+class UnixTransport(TCPTransport):
+    """Client over unix domain socket, ``path`` starting with ``@`` is an abstract name."""
+
+    def __init__(
+        self,
+        path: str,
+        compress_threshold: int | None = None,
+        encryption_key: bytes | None = None,
+        *,
+        compression: Compression | None = None,
+        max_frame_size: int = MAX_FRAME_SIZE,
+    ) -> None:
+        super().__init__(_socket_path(path), 0, compress_threshold, encryption_key, compression=compression,
+                         max_frame_size=max_frame_size)
+
+    @property
+    def path(self) -> str:
+        return self._host
+
+    @property
+    def peer_credentials(self) -> PeerCredentials | None:
+        """Credentials of the peer process, ``None`` if platform doesn't support ``SO_PEERCRED``."""
+        if not hasattr(socket, "SO_PEERCRED") or self._protocol is None or self._protocol.transport is None:
+            return None
+        sock = self._protocol.transport.get_extra_info("socket")
+        if sock is None:
+            return None
+        return PeerCredentials(*_PEERCRED.unpack(sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, _PEERCRED.size)))
+
+    async def _open(self) -> None:
+        _, self._protocol = await get_running_loop().create_unix_connection(self._new_protocol, self._host)
+        logger.info("Opened connection to %r", self._host)
+
+
+class UnixAcceptor(TCPAcceptor):
+    """Server on unix domain socket, stale socket file is replaced, and the one it bound is removed on close."""
+
+    def __init__(
+        self,
+        path: str,
+        compress_threshold: int | None = None,
+        encryption_key: bytes | None = None,
+        *,
+        compression: Compression | None = None,
+        max_frame_size: int = MAX_FRAME_SIZE,
+    ) -> None:
+        super().__init__(_socket_path(path), 0, compress_threshold, encryption_key, compression=compression,
+                         max_frame_size=max_frame_size)
+        self._bound = False
+
+    @property
+    def path(self) -> str:
+        return self._host
+
+    async def __aiter__(self) -> AsyncIterator[Transport]:  # type: ignore  # noqa: PGH003
+        """Iterate all new connections."""
+        self._bound = False
+        try:
+            async for transport in super().__aiter__():
+                yield transport
+        finally:
+            # A file at the path, which failed the bind, isn't ours.
+            if self._bound and not _is_abstract(self._host):
+                with contextlib.suppress(FileNotFoundError):
+                    os.unlink(self._host)  # noqa: PTH108
+
+    async def _start_server(self) -> AbstractServer:
+        server = await get_running_loop().create_unix_server(self._new_protocol, self._host)
+        self._bound = True
+        logger.info("Started server on %r", self._host)
+        return server
+
+    def _new_transport(self, protocol: FrameProtocol) -> TCPTransport:  # noqa: ARG002
+        logger.info("Connection on %r", self._host)
+        return UnixTransport(self._host)
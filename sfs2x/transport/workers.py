@@ -0,0 +1,230 @@
+"""
+Multi-process TCP server.
+
+``WorkerPool.run`` forks ``workers`` processes, each running its own event loop and
+``TCPAcceptor``. By default every worker binds the same address with ``SO_REUSEPORT`` and
+the kernel spreads new connections between them. With ``select_worker`` hook the parent
+accepts connections itself and passes each socket to the worker, which the hook picks.
+
+SIGINT / SIGTERM of the parent stops the pool gracefully: workers stop accepting, their
+``main`` is cancelled, and workers still alive after ``shutdown_timeout`` are killed.
+"""
+import asyncio
+import contextlib
+import logging
+import os
+import signal
+import socket
+from collections.abc import AsyncIterator, Awaitable, Callable
+
+from sfs2x.protocol import Compression
+from sfs2x.transport.base import Transport
+from sfs2x.transport.framing import MAX_FRAME_SIZE
+from sfs2x.transport.tcp import TCPAcceptor
+
+__all__ = ["WorkerPool"]
+
+logger = logging.getLogger("SFS2X/WorkerPool")
+
+WorkerMain = Callable[[TCPAcceptor], Awaitable[None]]
+SelectWorker = Callable[[tuple[str, int], int], int]  # (peer address, number of workers) -> worker index
+
+
+class _DispatchedAcceptor(TCPAcceptor):
+    """Acceptor of connections, which parent process passes through unix socket."""
+
+    def __init__(self, channel: socket.socket, **kwargs) -> None:  # noqa: ANN003
+        super().__init__(**kwargs)
+        self._channel = channel
+
+    async def __aiter__(self) -> AsyncIterator[Transport]:  # type: ignore  # noqa: PGH003
+        """Iterate connections, passed by parent process."""
+        loop = asyncio.get_running_loop()
+        self._queue: asyncio.Queue[Transport] = asyncio.Queue()
+        done = loop.create_future()
+        self._channel.setblocking(False)  # noqa: FBT003
+
+        def on_readable() -> None:
+            while True:
+                try:
+                    data, fds, _, _ = socket.recv_fds(self._channel, 1, 1)
+                except BlockingIOError:
+                    return
+                if not data:
+                    loop.remove_reader(self._channel)
+                    if not done.done():
+                        done.set_result(None)
+                    return
+                for fd in fds:
+                    sock = socket.socket(fileno=fd)
+                    loop.create_task(loop.connect_accepted_socket(self._new_protocol, sock))  # noqa: RUF006
+
+        loop.add_reader(self._channel, on_readable)
+        try:
+            while True:
+                get = loop.create_task(self._queue.get())
+                await asyncio.wait((get, done), return_when=asyncio.FIRST_COMPLETED)
+                if not get.done():
+                    get.cancel()
+                    return
+                yield get.result()
+        finally:
+            loop.remove_reader(self._channel)
+
+
+class WorkerPool:
+    """Pool of server processes, see module docs."""
+
+    def __init__(  # noqa: PLR0913
+        self,
+        host: str,
+        port: int,
+        workers: int,
+        *,
+        compress_threshold: int | None = None,
+        encryption_key: bytes | None = None,
+        compression: Compression | None = None,
+        max_frame_size: int = MAX_FRAME_SIZE,
+        select_worker: SelectWorker | None = None,
+        shutdown_timeout: float = 10.0,
+    ) -> None:
+        if not hasattr(os, "fork"):
+            msg = "Multi-process server requires os.fork"
+            raise NotImplementedError(msg)
+        if select_worker is None and not hasattr(socket, "SO_REUSEPORT"):
+            msg = "SO_REUSEPORT is not supported on this platform, use select_worker instead"
+            raise NotImplementedError(msg)
+        if workers < 1:
+            msg = "workers must be positive"
+            raise ValueError(msg)
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.select_worker = select_worker
+        self.shutdown_timeout = shutdown_timeout
+        self.worker_id: int | None = None  # index of the current process' worker, None in parent
+        self._options = {
+            "compress_threshold": compress_threshold, "encryption_key": encryption_key, "compression": compression,
+            "max_frame_size": max_frame_size,
+        }
+
+    def run(self, main: WorkerMain) -> None:
+        """Fork workers, running ``main(acceptor)`` each, and block until they exit or pool is stopped."""
+        listener = None
+        if self.select_worker is not None:
+            listener = socket.create_server((self.host, self.port))
+            listener.setblocking(False)  # noqa: FBT003
+
+        pids: list[int] = []
+        channels: list[socket.socket] = []
+        for i in range(self.workers):
+            parent_end, child_end = socket.socketpair() if listener else (None, None)
+            pid = os.fork()
+            if pid == 0:
+                if listener is not None:
+                    listener.close()
+                    parent_end.close()  # type: ignore[union-attr]
+                    for ch in channels:
+                        ch.close()
+                self.worker_id = i
+                os._exit(self._run_worker(main, child_end))
+            pids.append(pid)
+            if parent_end is not None:
+                child_end.close()  # type: ignore[union-attr]
+                channels.append(parent_end)
+
+        logger.info("Started %s workers on %s:%s", self.workers, self.host, self.port)
+        try:
+            asyncio.run(self._supervise(pids, listener, channels))
+        finally:
+            if listener is not None:
+                listener.close()
+            for ch in channels:
+                ch.close()
+
+    # Worker side
+
+    def _run_worker(self, main: WorkerMain, channel: socket.socket | None) -> int:
+        try:
+            asyncio.run(self._worker(main, channel))
+        except Exception:
+            logger.exception("Worker %s failed", self.worker_id)
+            return 1
+        return 0
+
+    async def _worker(self, main: WorkerMain, channel: socket.socket | None) -> None:
+        loop = asyncio.get_running_loop()
+        if channel is None:
+            acceptor = TCPAcceptor(self.host, self.port, reuse_port=True, **self._options)  # type: ignore[arg-type]
+        else:
+            acceptor = _DispatchedAcceptor(channel, host=self.host, port=self.port, **self._options)
+
+        task = loop.create_task(main(acceptor))
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, task.cancel)
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+
+    # Parent side
+
+    async def _supervise(self, pids: list[int], listener: socket.socket | None, channels: list[socket.socket]) -> None:
+        loop = asyncio.get_running_loop()
+        stop = asyncio.Event()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, stop.set)
+
+        dispatcher = None
+        if listener is not None:
+            dispatcher = loop.create_task(self._dispatch(listener, channels))
+
+        alive = set(pids)
+        while alive and not stop.is_set():
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(stop.wait(), 0.2)
+            alive -= self._reap(alive)
+
+        if dispatcher is not None:
+            dispatcher.cancel()
+        for pid in alive:
+            with contextlib.suppress(ProcessLookupError):
+                os.kill(pid, signal.SIGTERM)
+
+        deadline = loop.time() + self.shutdown_timeout
+        while alive and loop.time() < deadline:
+            await asyncio.sleep(0.05)
+            alive -= self._reap(alive)
+        for pid in alive:
+            logger.warning("Worker %s didn't stop in time, killing it", pid)
+            with contextlib.suppress(ProcessLookupError):
+                os.kill(pid, signal.SIGKILL)
+            os.waitpid(pid, 0)  # noqa: ASYNC222 - killed process exits at once
+
+    @staticmethod
+    def _reap(pids: set[int]) -> set[int]:
+        exited = set()
+        for pid in pids:
+            done, status = os.waitpid(pid, os.WNOHANG)
+            if done:
+                exited.add(pid)
+                if status:
+                    logger.warning("Worker %s exited with status %s", pid, status)
+        return exited
+
+    async def _dispatch(self, listener: socket.socket, channels: list[socket.socket]) -> None:
+        loop = asyncio.get_running_loop()
+        select = self.select_worker
+        accepted = 0
+        while True:
+            conn, addr = await loop.sock_accept(listener)
+            accepted += 1
+            with conn:
+                try:
+                    i = select(addr[:2], len(channels)) % len(channels)  # type: ignore[misc]
+                except Exception:
+                    # Faulty hook mustn't stop the parent from accepting, fall back to round-robin.
+                    logger.exception("select_worker failed for %s", addr)
+                    i = accepted % len(channels)
+                try:
+                    socket.send_fds(channels[i], [b"\0"], [conn.fileno()])
+                except OSError:
+                    logger.warning("Can't pass connection to worker %s", i)
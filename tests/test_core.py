@@ -1,3 +1,10 @@
+import copy
+import pickle
+import struct
+import sys
+from array import array
+from dataclasses import field
+
 import pytest
 
 from sfs2x.core import (
@@ -12,18 +19,31 @@ from sfs2x.core import (
     FloatArray,
     Int,
     IntArray,
+    KeyCache,
+    LazySFSArray,
+    LazySFSObject,
     Long,
     LongArray,
+    PayloadProfiler,
     SFSArray,
     SFSObject,
     Short,
     ShortArray,
     Text,
+    TypeCode,
     UtfString,
     UtfStringArray,
+    Writer,
     decode,
+    dumps,
+    fast_decode,
+    key_cache,
+    lazy_decode,
+    loads,
+    schema,
 )
 from sfs2x.core.exceptions import FieldError
+from sfs2x.core.profiler import OTHER
 from sfs2x.core.utils import read_small_string, write_small_string
 
 SAMPLE_TYPES_VALUES = {
@@ -92,6 +112,61 @@ def test_decode_unknown_type():
         decode(Buffer(unknown_packet))
 
 
+def test_fast_decode_errors():
+    with pytest.raises(ValueError):
+        fast_decode(bytearray([30]))
+
+    with pytest.raises(EOFError):
+        fast_decode(SFSObject({"str": UtfString("Hello")}).to_bytes()[:-2])
+
+
+@pytest.mark.parametrize("cls,typecode,sample", [
+    (ShortArray, "h", [100, -1000, 5000]),
+    (IntArray, "i", [10000, -100000, 500000]),
+    (LongArray, "q", [10000000, -100000000, 500000000]),
+    (DoubleArray, "d", [-92.14, 0.5, 1e300]),
+])
+def test_numeric_array_views(cls, typecode, sample):
+    raw = cls(sample).to_bytes()
+
+    assert cls(array(typecode, sample)).to_bytes() == raw
+
+    back = fast_decode(raw, array_view="array")
+    assert type(back) is cls
+    assert back.value == array(typecode, sample)
+    assert back.to_bytes() == raw
+
+    buf = Buffer(raw)
+    buf.read(1)
+    assert cls.from_buffer(buf, view="array").value == array(typecode, sample)
+
+
+def test_byte_array_is_zero_copy():
+    blob = bytes(range(256)) * 800  # > 65535 bytes
+    raw = SFSObject({"blob": ByteArray(blob)}).to_bytes()
+
+    for back in (fast_decode(raw), decode(Buffer(raw))):
+        field = back.value["blob"]
+        assert isinstance(field.data, memoryview)
+        assert field.data.obj is raw
+        assert bytes(field) == blob
+        assert back.to_bytes() == raw
+
+    assert ByteArray([20, -10, 50]) == ByteArray(b"\x14\xf6\x32")
+    assert ByteArray(b"\x14\xf6\x32").value == [20, -10, 50]
+
+
+def test_numeric_array_numpy_view():
+    np = pytest.importorskip("numpy")
+
+    raw = IntArray(list(range(-500, 500))).to_bytes()
+    back = fast_decode(raw, array_view="numpy")
+
+    assert isinstance(back.value, np.ndarray)
+    assert back.value.tolist() == list(range(-500, 500))
+    assert IntArray(np.arange(-500, 500)).to_bytes() == raw
+
+
 def test_prefixed_string_helpers():
     text = "Hello, world!"
     packed = write_small_string(text)
@@ -99,6 +174,47 @@ def test_prefixed_string_helpers():
     assert unpacked == text
 
 
+def test_buffer_typed_reads():
+    buf = Buffer(b"\xff\xff\xfe\x00\x00\x00\x07" + struct.pack("d", 1.5) + write_small_string("hi"))
+    assert buf.read_u8() == 255
+    assert buf.read_i16() == -2
+    assert buf.read_i32() == 7
+    assert buf.read_f64() == 1.5
+    assert buf.read_utf() == "hi"
+    assert buf.tell() == 19
+
+    with pytest.raises(EOFError):
+        buf.read_u8()
+    with pytest.raises(EOFError):
+        Buffer(b"\x00\x05abc").read_utf()
+
+
+def test_writer():
+    w = Writer()
+    w.write_u8(255)
+    at = w.reserve(2)
+    w.write_i32(-7)
+    w.write_f64(1.5)
+    w.write_utf("hi")
+    w.patch_u16(at, w.tell() - at - 2)
+
+    buf = Buffer(w.getvalue())
+    assert buf.read_u8() == 255
+    assert buf.read_u16() == 16
+    assert buf.read_i32() == -7
+    assert buf.read_f64() == 1.5
+    assert buf.read_utf() == "hi"
+
+    obj = SFSObject(SAMPLE_TYPES_VALUES[SFSObject])
+    for _ in range(2):
+        size = sys.getsizeof(w)
+        w.reset()
+        assert sys.getsizeof(w) == size  # reset keeps the grown buffer
+        assert dumps(obj, w) is w
+        assert w.getbuffer() == bytes(w) == obj.to_bytes()
+    assert type(dumps(obj)) is type(write_small_string("hi")) is bytearray
+
+
 # noinspection PyArgumentList
 @pytest.mark.parametrize("cls,sample", SAMPLE_TYPES_VALUES.items())
 def test_roundtrip_all_types(cls, sample):
@@ -119,6 +235,25 @@ def test_roundtrip_all_types(cls, sample):
     assert back.to_bytes() == raw
 
 
+# noinspection PyArgumentList
+@pytest.mark.parametrize("cls,sample", SAMPLE_TYPES_VALUES.items())
+def test_fast_decode_matches_decode(cls, sample):
+    raw = cls(sample).to_bytes()
+    buf = Buffer(raw + b"\x00")
+
+    assert fast_decode(buf) == decode(Buffer(raw))
+    assert buf.tell() == len(raw)
+
+
+@pytest.mark.parametrize("packed,non_packed", SAMPLE_PACKED_VALUES.items())
+def test_dumps_single_buffer(packed: bytes, non_packed: SFSObject):
+    assert dumps(non_packed) == packed
+
+    out = bytearray(b"\xff")
+    assert dumps(non_packed, out) is out
+    assert out == b"\xff" + packed
+
+
 @pytest.mark.parametrize("packed,non_packed", SAMPLE_PACKED_VALUES.items())
 def test_serialization_compatibility(packed: bytes, non_packed: SFSObject):
     new_packed = non_packed.to_bytes()
@@ -191,4 +326,310 @@ def test_objects_concatenation():
     assert obj1 | obj2 == obj3
     assert obj1.update(name=UtfString('hi')) == obj3
 
-    assert BoolArray(False, False) + BoolArray(True, True) == BoolArray([False, False, True, True])
\ No newline at end of file
+    assert BoolArray(False, False) + BoolArray(True, True) == BoolArray([False, False, True, True])
+
+def test_lazy_decode():
+    packed = SFSObject({
+        "c": UtfString("move"),
+        "p": {
+            "x": Int(12),
+            "path": [SFSObject({"y": Short(-20)}), IntArray([1, 2, 3])],
+        },
+    }).to_bytes()
+
+    lazy = decode(Buffer(packed), lazy=True)
+    assert type(lazy) is LazySFSObject
+    assert lazy.get("c") == "move"
+    assert lazy._cache.keys() == {"c"}
+
+    params = lazy.get("p")
+    path = params.get("path")
+    assert type(params) is LazySFSObject
+    assert type(path) is LazySFSArray
+    assert path.get(-1) == [1, 2, 3]
+    assert path.get(0).get("y") == -20
+    assert "x" in params and "missing" not in params
+    assert lazy.get("missing", 5) == 5
+
+    params["x"] = Int(13)
+    params.put_bool("new", True)
+    assert list(params.keys()) == ["x", "path", "new"]
+    assert params.get("x") == 13
+
+    eager = fast_decode(packed)
+    eager.value["p"].value["x"] = Int(13)
+    eager.value["p"].value["new"] = Bool(True)
+    assert lazy == eager
+    assert lazy.to_bytes() == eager.to_bytes()
+
+
+def test_lazy_read_only_traversal():
+    packed = bytes(SFSObject({
+        "id": Int(7),
+        "blob": ByteArray(b"\x01\x02"),
+        "users": [SFSObject({"n": UtfString("neo")}), Int(1)],
+    }).to_bytes())
+    eager = fast_decode(packed)
+
+    lazy = lazy_decode(packed)
+    assert list(lazy.items()) == list(eager.items())
+    assert list(lazy.values()) == list(eager.values())
+    assert list(lazy.get("users")) == list(eager.get("users"))
+    assert not lazy.dirty
+    assert lazy.to_bytes() == packed
+
+
+def test_lazy_duplicated_keys():
+    first, second = (bytes(SFSObject({"a": Int(n)}).to_bytes()) for n in (1, 2))
+    packed = first[:1] + b"\x00\x02" + first[3:] + second[3:]
+    eager = fast_decode(packed)
+
+    lazy = lazy_decode(packed)
+    assert lazy.get("a") == eager.get("a") == 2
+    assert lazy == eager
+    assert lazy.to_bytes() == packed
+
+    lazy = lazy_decode(packed)
+    lazy["a"] = Int(3)
+    assert lazy.get("a") == 3
+    assert lazy.to_bytes() == SFSObject({"a": Int(3)}).to_bytes()
+
+
+def test_lazy_pickle_and_copy():
+    packed = SFSObject({"a": Int(1), "arr": [Int(2), SFSObject({"b": Short(3)})]}).to_bytes()
+    lazy = lazy_decode(packed)
+    lazy.get("arr").add(Int(4))
+
+    for restored in (pickle.loads(pickle.dumps(lazy)), copy.deepcopy(lazy)):  # noqa: S301
+        assert type(restored) is LazySFSObject
+        assert restored == lazy
+        assert restored.to_bytes() == lazy.to_bytes()
+    assert copy.deepcopy(lazy.get("arr")) == lazy.get("arr")
+
+    merged = SFSObject({"c": Int(5)}) + lazy
+    assert list(merged.keys()) == ["c", "a", "arr"]
+    assert merged == SFSObject({"c": Int(5)}) | lazy
+    assert SFSArray([Int(0)]) + lazy.get("arr") == SFSArray([Int(0), Int(2), SFSObject({"b": Short(3)}), Int(4)])
+
+
+def test_lazy_decode_advances_buffer():
+    packed = SAMPLE_PACKED_VALUES.keys()
+    for raw in packed:
+        buf = Buffer(raw + b"\x01\x01")
+        assert lazy_decode(buf) == decode(Buffer(raw))
+        assert buf.tell() == len(raw)
+
+
+def test_lazy_pass_through():
+    packed = bytes(SFSObject({
+        "room": {"id": Int(7), "users": [SFSObject({"n": UtfString("neo")})] * 3},
+        "state": {"tiles": IntArray(list(range(100))), "seed": Long(42)},
+    }).to_bytes())
+
+    lazy = lazy_decode(packed)
+    assert lazy.get("room").get("id") == 7
+    assert not lazy.dirty
+    assert lazy.raw == packed
+    assert lazy.to_bytes() == packed
+
+    lazy.get("room")["id"] = Int(8)
+    assert lazy.dirty
+    state = lazy.get("state")
+    assert not state.dirty
+
+    expected = fast_decode(packed)
+    expected.value["room"].value["id"] = Int(8)
+    assert lazy.to_bytes() == expected.to_bytes()
+    assert state._cache == {}
+
+    state.get("tiles").append(100)
+    assert state.dirty
+    expected.value["state"].value["tiles"].value.append(100)
+    assert lazy.to_bytes() == expected.to_bytes()
+
+
+@schema
+class _Vec:
+    x: Float
+    y: Double
+
+
+@schema
+class _Move:
+    id: Int
+    name: UtfString
+    pos: _Vec
+    tags: UtfStringArray
+    ok: Bool = True
+    cmd: UtfString = field(default="move", metadata={"key": "c"})
+    extra: SFSObject = field(default_factory=SFSObject)
+
+
+@schema
+class _Blob:
+    id: Int
+    blob: ByteArray
+
+
+def test_schema_matches_sfs_object():
+    move = _Move(7, "héllo", _Vec(1.5, 2.25), ["a", "b"])
+    generic = SFSObject({
+        "id": Int(7),
+        "name": UtfString("héllo"),
+        "pos": SFSObject({"x": Float(1.5), "y": Double(2.25)}),
+        "tags": UtfStringArray(["a", "b"]),
+        "ok": Bool(True),
+        "c": UtfString("move"),
+        "extra": SFSObject(),
+    })
+
+    raw = dumps(move)
+    assert raw == generic.to_bytes()
+    assert move.to_sfs_object() == generic
+    assert _Move.loads(raw) == move
+    assert fast_decode(SFSObject({"p": move}).to_bytes()).get("p") == generic
+
+    with pytest.raises(EOFError):
+        _Move.loads(raw[:-3])
+
+
+def test_schema_decodes_other_layouts():
+    reordered = SFSObject({
+        "c": UtfString("jump"),
+        "pos": SFSObject({"y": Double(2.0), "x": Float(1.0)}),
+        "tags": UtfStringArray([]),
+        "name": UtfString("n"),
+        "id": Int(1),
+    }).to_bytes()
+
+    assert _Move.loads(reordered) == _Move(1, "n", _Vec(1.0, 2.0), [], cmd="jump")
+
+    with pytest.raises(FieldError):
+        schema(type("Bad", (), {"__annotations__": {"x": int}}))
+
+
+def test_schema_byte_array_is_bytes():
+    raw = dumps(_Blob(1, b"\x01\xff"))
+    assert raw == SFSObject({"id": Int(1), "blob": ByteArray(b"\x01\xff")}).to_bytes()
+    assert _Blob.loads(raw).blob == b"\x01\xff" == loads(raw, raw=True)["blob"]
+
+    reordered = SFSObject({"blob": ByteArray(b"\x02"), "id": Int(1)}).to_bytes()
+    assert _Blob.loads(reordered).blob == b"\x02"
+
+
+def test_key_cache():
+    cache = KeyCache(maxsize=2, max_key_length=4)
+    cache.seed(["uid"])
+    assert cache.encode("uid") == b"\x00\x03uid"
+    assert cache.encode("x") == b"\x00\x01x"  # first use, not cached
+    assert cache.encode("x") == cache.encode("x") == b"\x00\x01x"
+    assert cache.encode("long_key") == cache.encode("long_key")  # too long, never cached
+    assert cache.stats().encoded_keys == 2
+
+    cache.encode("y")
+    cache.encode("y")  # table is full, non-seeded keys are dropped
+    stats = cache.stats()
+    assert (stats.encoded_keys, stats.flushes) == (2, 1)
+    assert cache.encode("uid") == b"\x00\x03uid"
+
+    mv = memoryview(b"uidx")
+    assert cache.decode(mv, 0, 3) is cache.decode(memoryview(bytearray(b"uid")), 0, 3)
+    assert cache.decode(mv, 3, 1) == cache.decode(mv, 3, 1) == "x"
+    assert cache.decode(mv, 3, 1) is cache.decode(mv, 3, 1)
+
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.encoded_keys, stats.decoded_keys) == (7, 8, 2, 2)
+    assert stats.hit_rate == 7 / 15
+
+    with pytest.raises(EOFError):
+        cache.decode(mv, 3, 2)
+
+
+def test_decoded_keys_are_shared():
+    raw = SFSObject({"shared_key": Int(1)}).to_bytes()
+    before = key_cache.stats().hits
+    fast_decode(raw)  # keys are cached from their second use
+    a, b = fast_decode(raw), fast_decode(bytes(raw))
+
+    assert next(iter(a.keys())) is next(iter(b.keys()))
+    assert key_cache.stats().hits > before
+
+
+def test_native_dumps_loads():
+    native = {
+        "c": 1,
+        "big": 1 << 40,
+        "ok": True,
+        "pi": 3.5,
+        "name": "Zewsic",
+        "blob": b"\x00\xff",
+        "items": [{"id": 1}, "x", [False]],
+        "pos": [1.5, 2.5],
+        "field": Short(2),
+    }
+    fields = SFSObject({
+        "c": Byte(1),
+        "big": Long(1 << 40),
+        "ok": Bool(True),
+        "pi": Double(3.5),
+        "name": UtfString("Zewsic"),
+        "blob": ByteArray(b"\x00\xff"),
+        "items": SFSArray([SFSObject({"id": Byte(1)}), UtfString("x"), SFSArray([Bool(False)])]),
+        "pos": DoubleArray([1.5, 2.5]),
+        "field": Short(2),
+    })
+
+    raw = dumps(native, int_type=Byte, type_hints={"pos": DoubleArray})
+    assert raw == fields.to_bytes()
+    assert loads(raw) == fields
+    assert loads(raw, raw=True) == native | {"items": [{"id": 1}, "x", [False]], "field": 2}
+
+    assert dumps({"n": 5}) == SFSObject({"n": Int(5)}).to_bytes()
+    assert dumps({"n": 5}, type_hints={"n": Short}) == SFSObject({"n": Short(5)}).to_bytes()
+
+    with pytest.raises(FieldError):
+        dumps({"bad": None})
+    with pytest.raises(OverflowError):
+        dumps(1 << 64)
+
+
+def test_payload_profiler():
+    payload = dumps(SFSObject({
+        "xs": SFSArray([Int(i) for i in range(10)]),
+        "ys": IntArray([1, 2, 3]),
+        "n": SFSObject({"s": UtfString("abc")}),
+    }))
+    profiler = PayloadProfiler()
+    profiler.observe(payload, "move")
+    profiler.observe(Buffer(payload), "move")
+
+    assert sum(s.bytes for s in profiler.types.values()) == 2 * len(payload)
+    assert profiler.types[TypeCode.INT].count == 20
+    assert profiler.types[TypeCode.UTF_STRING].bytes == 2 * 6
+    shape = profiler.shapes["move"]
+    assert (shape.messages, shape.max_depth) == (2, 2)
+    assert shape.keys["xs"] == 2
+    assert shape.arrays["ys", TypeCode.INT_ARRAY].max == 3
+    assert shape.homogeneous["xs", TypeCode.INT] == 2
+    assert "SFS_ARRAY of INT (2x) could be INT_ARRAY" in profiler.report()
+
+    sampled = PayloadProfiler(sample_rate=0.01)
+    for _ in range(1000):
+        sampled.observe(payload)
+    assert sampled.seen == 1000
+    assert 0 < sampled.sampled < 100
+
+
+def test_payload_profiler_limits():
+    profiler = PayloadProfiler(max_commands=2, max_keys=2)
+    for i in range(4):
+        payload = dumps(SFSObject({f"k{i}": Int(i), f"a{i}": IntArray([i]), "xs": SFSArray([Int(i)])}))
+        profiler.record(payload, f"cmd{i}")
+        profiler.record(payload, "cmd0")
+
+    assert profiler.shapes.keys() == {"cmd0", "cmd1", OTHER}
+    assert profiler.shapes[OTHER].messages == 2
+    shape = profiler.shapes["cmd0"]
+    assert shape.keys == {"k0": 2, "a0": 2, OTHER: 11}
+    assert shape.arrays.keys() == {("a0", TypeCode.INT_ARRAY), (OTHER, TypeCode.SFS_ARRAY), (OTHER, TypeCode.INT_ARRAY)}
+    assert shape.homogeneous == {(OTHER, TypeCode.INT): 5}
@@ -1,15 +1,28 @@
+import pickle
+import zlib
+from os import urandom
+
 import pytest
+from Crypto.Cipher import AES
+from Crypto.Util.Padding import pad, unpad
 
-from sfs2x.core import UtfStringArray, Int, Text
+from sfs2x.core import ByteArray, PayloadProfiler, UtfStringArray, Int, Text, dumps, payload_profiler, schema
 from sfs2x.core.buffer import Buffer
 from sfs2x.core.types.containers import SFSObject
+from sfs2x.protocol.codec import frame
 from sfs2x.protocol import (
+    AESCipher,
+    AdaptiveCompression,
+    Compression,
     Message,
     ControllerID,
     SysAction,
     encode,
     decode,
     Flag,
+    TimingCollector,
+    set_timing_hook,
+    timing_hook,
 )
 
 
@@ -61,6 +74,16 @@ def test_long_packet():
     assert decoded.payload.get("blob") == big_string
 
 
+@pytest.mark.parametrize("size", [10, 70000])
+@pytest.mark.parametrize("compress_threshold", [None, 1 << 20])
+def test_encode_writes_header_in_place(size, compress_threshold):
+    msg = Message(ControllerID.SYSTEM, SysAction.HANDSHAKE, make_payload(blob="x" * size))
+    raw = encode(msg, compress_threshold=compress_threshold)
+
+    assert type(raw) is bytearray
+    assert raw == frame(dumps(msg.to_sfs_object()))
+
+
 def test_encrypted_and_compressed_long_packet():
     big_string = "x" * 70000
     msg = Message(
@@ -79,6 +102,21 @@ def test_encrypted_and_compressed_long_packet():
     assert decoded.payload.get("blob") == big_string
 
 
+def test_aes_cipher_is_plain_cbc():
+    key = b'1234567890123456'
+    cipher = AESCipher(key)
+    for data in [b'', b'x' * 15, b'y' * 16, urandom(1000)]:
+        encrypted = cipher.encrypt(data)
+        assert unpad(AES.new(key, AES.MODE_CBC, bytes(encrypted[:16])).decrypt(bytes(encrypted[16:])), 16) == data
+        iv = urandom(16)
+        assert cipher.decrypt(iv + AES.new(key, AES.MODE_CBC, iv).encrypt(pad(data, 16))) == data
+
+    raw = encode(Message(ControllerID.SYSTEM, SysAction.HANDSHAKE, make_payload(a="b")), encryption_key=cipher)
+    assert decode(raw, encryption_key=key).payload.get("a") == "b"
+    with pytest.raises(ValueError):
+        cipher.decrypt(bytes(cipher.encrypt(b'data'))[:-1])
+
+
 def test_unpack_binary_packet():
     binary_message = b'\x80\x00T\x12\x00\x03\x00\x01c\x02\x01\x00\x01a\x03\x00\x0c\x00\x01p\x12\x00\x03\x00\x01c\x08\x00\x0ctest_command\x00\x01r\x04\xff\xff\xff\xff\x00\x01p\x12\x00\x02\x00\x03num\x04\xff\xff\xff\xff\x00\x07strings\x10\x00\x02\x00\x02hi\x00\x04mega'
     decoded = decode(binary_message)
@@ -91,3 +129,113 @@ def test_unpack_binary_packet():
     assert decoded.controller == ControllerID.EXTENSION
     assert decoded.action == 12
     assert decoded == re_encoded
+
+
+def test_lazy_decode_payload():
+    msg = Message.extension("move", {"x": Int(10), "path": UtfStringArray(["a", "b"])})
+    decoded = decode(encode(msg), lazy=True)
+
+    assert decoded.payload.get("c") == "move"
+    assert decoded.payload.get("p").get("x") == 10
+    assert decoded == msg
+
+
+def test_lazy_relay_reencode():
+    msg = Message.extension("move", {"x": Int(10), "path": UtfStringArray(["a", "b"])})
+    raw = encode(msg, compress_threshold=None)
+
+    relayed = decode(raw, lazy=True)
+    assert encode(relayed, compress_threshold=None) == raw
+
+    relayed.payload.get("p")["x"] = Int(11)
+    msg.payload.get("p")["x"] = Int(11)
+    assert encode(relayed, compress_threshold=None) == encode(msg, compress_threshold=None)
+
+
+@schema
+class MovePayload:
+    x: Int
+    path: UtfStringArray
+
+
+def test_schema_extension_payload():
+    msg = Message.extension("move", MovePayload(10, ["a", "b"]))
+    generic = Message.extension("move", {"x": Int(10), "path": UtfStringArray(["a", "b"])})
+    assert encode(msg) == encode(generic)
+
+    decoded = decode(encode(msg), lazy=True)
+    assert MovePayload.loads(decoded.payload.get("p").raw) == MovePayload(10, ["a", "b"])
+
+
+def test_compression_policy():
+    msg = Message(ControllerID.SYSTEM, SysAction.HANDSHAKE, make_payload(a="player " * 300))
+    fast = Compression(threshold=100, level=1, strategy=zlib.Z_FILTERED, mem_level=9)
+    raw = encode(msg, compression=fast)
+    assert Flag(raw[0]) & Flag.COMPRESSED
+    assert decode(raw).payload.get("a") == "player " * 300  # stock zlib stream
+
+    assert not Flag(encode(msg, compression=Compression(threshold=None))[0]) & Flag.COMPRESSED
+
+    trained = Compression(threshold=100, zdict=b"player " * 50)
+    raw = encode(msg, compression=trained)
+    assert len(raw) < len(encode(msg, compress_threshold=100))
+    assert decode(raw, compression=trained).payload.get("a") == "player " * 300
+    with pytest.raises(zlib.error):
+        decode(raw)
+
+
+def test_adaptive_compression_skips_incompressible():
+    policy = AdaptiveCompression(threshold=100, probe_every=4)
+    blob = Message.extension("blob", {"b": ByteArray(urandom(2000))})
+    chat = Message.extension("chat", make_payload(t="hello " * 300))
+
+    flags = [Flag(encode(blob, compression=policy)[0]) & Flag.COMPRESSED for _ in range(8)]
+    assert not any(flags)
+    assert Flag(encode(chat, compression=policy)[0]) & Flag.COMPRESSED
+
+    stats = policy.stats()
+    assert (stats.compressed, stats.rejected, stats.skipped) == (1, 2, 6)  # every 4th blob is probed
+    assert stats.bytes_saved > 1000 and stats.cpu_time > 0
+    assert policy.ratios()[("blob", 12)] > 1
+
+
+def test_timing_hook_records_stages():
+    key = b"0123456789abcdef"
+    ext = Message.extension("chat", make_payload(t="hello " * 300))
+    sys = Message(ControllerID.SYSTEM, SysAction.HANDSHAKE, make_payload(api="1.7.8"))
+
+    with timing_hook(TimingCollector()) as collector:
+        decode(encode(ext, 100, key), encryption_key=key)
+        decode(encode(sys, None), encryption_key=key)
+    assert set_timing_hook(None) is None  # hook is removed after the block
+
+    stages = collector.by_stage()
+    assert {stage for _, stage in stages} == {
+        "serialize", "compress", "encrypt", "frame", "header", "decrypt", "decompress", "deserialize"}
+    chat = collector.stats["encode", "compress", (ControllerID.EXTENSION, 12, "chat")]
+    assert chat.count == 1 and chat.bytes_out < chat.bytes_in
+    assert ("decode", "header", (ControllerID.SYSTEM, SysAction.HANDSHAKE, None)) in collector.stats
+    encrypted = collector.stats["encode", "encrypt", (ControllerID.EXTENSION, 12, "chat")]
+    header = collector.stats["encode", "frame", (ControllerID.EXTENSION, 12, "chat")]
+    assert encrypted.bytes_in == chat.bytes_out and encrypted.bytes_out > chat.bytes_out
+    assert (header.bytes_in, header.bytes_out) == (0, 3)
+    assert "decode.decompress chat" in collector.report()
+
+
+def test_payload_profiler_hook():
+    with payload_profiler(PayloadProfiler()) as profiler:
+        decode(encode(Message.extension("chat", make_payload(t="hi"))))
+        decode(encode(Message(ControllerID.SYSTEM, SysAction.HANDSHAKE, make_payload(api="1.7.8"))))
+    decode(encode(Message.extension("chat", make_payload(t="hi"))))
+    assert set(profiler.shapes) == {"chat", f"{ControllerID.SYSTEM}/{SysAction.HANDSHAKE}"}
+    assert profiler.sampled == 2
+
+
+def test_compression_pickles_with_dictionary():
+    trained = AdaptiveCompression(threshold=100, zdict=b"player " * 50)
+    raw = encode(Message.extension("chat", make_payload(a="player " * 300)), compression=trained)
+
+    copy = pickle.loads(pickle.dumps(trained))
+    assert copy.ratios() == trained.ratios() and copy.stats() == trained.stats()
+    assert decode(raw, compression=copy).payload.get("p").get("a") == "player " * 300
+    assert encode(Message.extension("chat", make_payload(a="player " * 300)), compression=copy) == raw
@@ -1,10 +1,27 @@
 import asyncio
+import os
+import signal
+import socket
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
 import pytest
 import pytest_asyncio
 
-from sfs2x.core import Float, UtfString, Int, Double, SFSObject
-from sfs2x.transport import client_from_url, server_from_url, TCPTransport
-from sfs2x.protocol import Message, ControllerID, SysAction
+from sfs2x.core import Float, UtfString, Int, Double, SFSObject, Text
+from sfs2x.transport import (
+    MemoryAcceptor,
+    MemoryTransport,
+    OverflowPolicy,
+    SessionManager,
+    TCPTransport,
+    broadcast,
+    client_from_url,
+    server_from_url,
+)
+from sfs2x.transport.framing import FrameProtocol
+from sfs2x.transport.memory import MESSAGE_SIZE, _Channel
+from sfs2x.protocol import Compression, Message, ControllerID, SysAction, ProtocolError, decode, encode
 
 @pytest_asyncio.fixture
 async def echo_server(event_loop):
@@ -66,4 +83,452 @@ async def test_msm_server():
         await conn.send(Message(ControllerID.SYSTEM, SysAction.LOGIN, auth_info))
 
         resp = await conn.recv()
-        assert resp.payload['ec'] == 1
\ No newline at end of file
+        assert resp.payload['ec'] == 1
+
+def _feed(protocol: FrameProtocol, data: bytes) -> None:
+    """Emulate socket reads into protocol's buffer."""
+    while data:
+        buf = protocol.get_buffer(-1)
+        n = min(len(buf), len(data))
+        buf[:n] = data[:n]
+        protocol.buffer_updated(n)
+        data = data[n:]
+
+
+@pytest.mark.asyncio
+async def test_frame_protocol_splits_stream():
+    small = encode(Message(ControllerID.SYSTEM, SysAction.PING_PONG, SFSObject({'n': Int(1)})), compress_threshold=None)
+    big = encode(Message(ControllerID.SYSTEM, SysAction.PING_PONG, SFSObject({'t': Text('x' * 200_000)})), compress_threshold=None)
+    stream = small + big + small
+
+    protocol = FrameProtocol(buffer_size=16)
+    for i in range(0, len(stream), 5000):
+        _feed(protocol, stream[i:i + 5000])
+
+    assert await protocol.read_frame() == small
+    assert await protocol.read_frame() == big
+    assert await protocol.read_frame() == small
+
+    _feed(protocol, b'\x00\x00\x01')
+    with pytest.raises(ProtocolError):
+        await protocol.read_frame()
+
+
+@pytest.mark.asyncio
+async def test_frame_protocol_limits_frame_size():
+    protocol = FrameProtocol(buffer_size=16, max_frame_size=1000)
+    _feed(protocol, bytes([0x88]) + (0xFFFF_FFFF).to_bytes(4, 'big'))  # header of a 4 GB frame
+    assert len(protocol._buf) <= 8192
+    with pytest.raises(ProtocolError):
+        await protocol.read_frame()
+
+    protocol = FrameProtocol(buffer_size=16)
+    _feed(protocol, bytes([0x88]) + (200_000).to_bytes(4, 'big') + b'x' * 5000)
+    assert len(protocol._buf) < 200_000  # grows with received data, not with declared length
+
+
+@pytest.mark.asyncio
+async def test_frame_protocol_many_waiters():
+    frame = encode(Message(ControllerID.SYSTEM, SysAction.PING_PONG, SFSObject({'n': Int(1)})), compress_threshold=None)
+    protocol = FrameProtocol()
+    readers = [asyncio.ensure_future(protocol.read_frame()) for _ in range(3)]
+    protocol.pause_writing()
+    writers = [asyncio.ensure_future(protocol.drain()) for _ in range(3)]
+    await asyncio.sleep(0)
+    readers[0].cancel()
+    writers[0].cancel()
+
+    _feed(protocol, frame + frame)
+    protocol.resume_writing()
+    assert await asyncio.wait_for(asyncio.gather(*readers[1:], *writers[1:]), 1) == [frame, frame, None, None]
+
+    protocol.pause_writing()
+    writers = [asyncio.ensure_future(protocol.drain()) for _ in range(2)]
+    reader = asyncio.ensure_future(protocol.read_frame())
+    await asyncio.sleep(0)
+    protocol.connection_lost(None)
+    for waiter in (*writers, reader):
+        with pytest.raises(ConnectionError):
+            await waiter
+
+
+class _RecordingTransport:
+    """Asyncio transport stub, which records writes."""
+
+    def __init__(self):
+        self.writes = []
+
+    def write(self, data):
+        self.writes.append([bytes(data)])
+
+    def writelines(self, data):
+        self.writes.append(list(data))
+
+    def is_closing(self):
+        return False
+
+
+@pytest.mark.asyncio
+async def test_send_many_and_coalescing():
+    protocol = FrameProtocol()
+    protocol.transport = _RecordingTransport()
+    conn = TCPTransport("localhost", 0)
+    conn._compress_threshold = None
+    conn._protocol, conn._closed = protocol, False
+
+    msgs = [Message(ControllerID.SYSTEM, SysAction.PING_PONG, SFSObject({'n': Int(i)})) for i in range(3)]
+    frames = [encode(m, compress_threshold=None) for m in msgs]
+
+    await conn.send_many(msgs)
+    assert protocol.transport.writes == [frames]
+
+    protocol.transport.writes.clear()
+    conn.enable_coalescing()
+    await asyncio.gather(*(conn.send(m) for m in msgs))
+    await asyncio.sleep(0)
+    assert protocol.transport.writes == [frames]
+
+    protocol.transport.writes.clear()
+    conn.enable_coalescing(max_bytes=2 * len(frames[0]))
+    for m in msgs:
+        await conn.send(m)
+    await conn.flush()
+    assert protocol.transport.writes == [frames[:2], frames[2:]]
+
+
+@pytest.mark.asyncio
+async def test_broadcast_encodes_once_per_key():
+    def connect(key, threshold):
+        protocol = FrameProtocol()
+        protocol.transport = _RecordingTransport()
+        conn = TCPTransport("localhost", 0, compress_threshold=threshold, encryption_key=key)
+        conn._protocol, conn._closed = protocol, False
+        return conn
+
+    key = b'mega_secured_key'
+    conns = [connect(None, None), connect(None, None), connect(key, None), connect(key, None), connect(key, 10)]
+    closed = connect(None, None)
+    closed._closed = True
+    msg = Message(ControllerID.SYSTEM, SysAction.PING_PONG, SFSObject({'t': UtfString('x' * 100)}))
+
+    assert await broadcast(msg, [*conns, closed]) == []
+    frames = [c._protocol.transport.writes[0][0] for c in conns]
+    assert frames[0] is frames[1] and frames[2] is frames[3]
+    assert frames[0] == encode(msg, compress_threshold=None)
+    assert closed._protocol.transport.writes == []
+    for raw in frames[2:]:
+        assert decode(raw, encryption_key=key).payload.get('t') == 'x' * 100
+
+
+@pytest.mark.asyncio
+async def test_session_overflow_policies():
+    class Stalled(_RecordingTransport):
+        def get_write_buffer_size(self):
+            return 0
+
+        def close(self):
+            self.protocol.connection_lost(None)
+
+    def connect():
+        protocol = FrameProtocol()
+        protocol.transport = Stalled()
+        protocol.transport.protocol = protocol
+        protocol._writing_paused = True  # peer doesn't read
+        conn = TCPTransport("localhost", 0)
+        conn._protocol, conn._closed = protocol, False
+        return conn
+
+    manager = SessionManager(server_from_url("tcp://localhost:0"), max_frames=2)
+    frames = [encode(Message(ControllerID.SYSTEM, SysAction.PING_PONG, SFSObject({'n': Int(i)})), compress_threshold=None) for i in range(4)]
+
+    oldest = manager.add(connect())
+    await asyncio.sleep(0)
+    oldest.send_frame(frames[0])
+    await asyncio.sleep(0)  # first frame is written, writer waits for drain
+    assert [oldest.send_frame(f) for f in frames[1:]] == [True, True, True]
+    assert list(oldest._queue) == frames[2:]
+    stats = oldest.stats()
+    assert (stats.sent_frames, stats.queued_frames, stats.dropped_frames) == (0, 2, 1)  # sent after drain
+
+    newest = manager.add(connect())
+    newest.policy = OverflowPolicy.DROP_NEWEST
+    assert [newest.send_frame(f) for f in frames[1:]] == [True, True, False]
+    assert list(newest._queue) == frames[1:3]
+
+    disconnect = manager.add(connect())
+    disconnect.policy = OverflowPolicy.DISCONNECT
+    assert [disconnect.send_frame(f) for f in frames[1:]] == [True, True, False]
+    assert disconnect.closed
+    await asyncio.sleep(0.01)
+    assert disconnect not in manager.sessions
+    stats = manager.stats()
+    assert (len(manager), stats.queued_frames, stats.sent_frames) == (2, 2, 0)
+
+    class Broken(Stalled):
+        def writelines(self, data):
+            raise OSError("broken pipe")
+
+    conn = connect()
+    conn._protocol.transport = Broken()
+    conn._protocol.transport.protocol = conn._protocol
+    broken = manager.add(conn)
+    broken.send_frame(frames[0])
+    await asyncio.sleep(0.01)
+    assert broken.closed and broken not in manager.sessions  # on_close ran
+    assert broken.stats().sent_frames == 0
+
+
+_POOL_SCRIPT = '''
+import itertools, sys
+from sfs2x.core import Int, SFSObject
+from sfs2x.protocol import ControllerID, Message, SysAction
+from sfs2x.transport import server_from_url
+
+rr = itertools.count()
+
+def faulty(addr, n):
+    raise RuntimeError("broken hook")
+
+hooks = {"dispatch": lambda addr, n: next(rr), "faulty_hook": faulty}
+pool = server_from_url(f"tcp://127.0.0.1:{sys.argv[1]}", workers=2, select_worker=hooks.get(sys.argv[2]))
+
+async def main(acceptor):
+    async for conn in acceptor:
+        await conn.send(Message(ControllerID.SYSTEM, SysAction.PING_PONG, SFSObject({'w': Int(pool.worker_id)})))
+
+pool.run(main)
+'''
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("mode", ["reuse_port", "dispatch", "faulty_hook"])
+async def test_worker_pool(mode):
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    proc = await asyncio.create_subprocess_exec(sys.executable, "-c", _POOL_SCRIPT, str(port), mode, cwd=root)
+    try:
+        workers = set()
+        for _ in range(20):
+            try:
+                async with client_from_url(f"tcp://127.0.0.1:{port}") as conn:
+                    workers.add((await asyncio.wait_for(conn.recv(), 5)).payload.get('w'))
+            except ConnectionRefusedError:
+                await asyncio.sleep(0.1)
+            if len(workers) == 2 and mode != "reuse_port":
+                break
+        assert workers <= {0, 1} and workers
+        if mode != "reuse_port":  # faulty hook falls back to round-robin
+            assert workers == {0, 1}
+    finally:
+        proc.send_signal(signal.SIGTERM)
+        assert await asyncio.wait_for(proc.wait(), 15) == 0
+
+
+@pytest.mark.asyncio
+async def test_decode_offload_keeps_order():
+    key = b'mega_secured_key'
+    protocol = FrameProtocol()
+    conn = TCPTransport("localhost", 0, encryption_key=key)
+    conn._protocol, conn._closed = protocol, False
+
+    msgs = [Message(ControllerID.SYSTEM, SysAction.PING_PONG, SFSObject({'t': Text(str(i) * size)}))
+            for i, size in enumerate([200_000, 1, 300_000, 2])]
+    for msg in msgs:
+        _feed(protocol, encode(msg, compress_threshold=1024, encryption_key=key))
+
+    with ProcessPoolExecutor(1) as pool:
+        conn.enable_decode_offload(threshold=100, executor=pool)
+        received = await asyncio.gather(conn.recv(), conn.recv())
+        conn.enable_decode_offload(threshold=100)
+        received += await asyncio.gather(conn.recv(), conn.recv())
+    assert [m.payload.get('t') for m in received] == [m.payload.get('t') for m in msgs]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("skip_codec", [False, True])
+async def test_memory_transport(skip_codec):
+    key = b'mega_secured_key'
+    acceptor = MemoryAcceptor("lobby", 10, key, skip_codec=True)
+    it = acceptor.__aiter__()
+    accepted = asyncio.ensure_future(it.__anext__())
+    await asyncio.sleep(0)
+
+    msg = Message(ControllerID.SYSTEM, SysAction.PING_PONG, SFSObject({'t': UtfString('x' * 100)}))
+    async with MemoryTransport("lobby", 10, key, skip_codec=skip_codec) as client:
+        server = await accepted
+        assert client.skip_codec is server.skip_codec is skip_codec
+
+        await client.send_many([msg, msg])
+        assert (await server.recv() is msg) is skip_codec
+        assert (await server.recv()).payload.get('t') == 'x' * 100
+
+        await broadcast(msg, [server])  # encoded frame is decoded even without codec
+        assert (await client.recv()).payload.get('t') == 'x' * 100
+        await server.send(msg)
+
+    with pytest.raises(ConnectionError):
+        await server.recv()
+    async with client_from_url("mem://lobby") as other:
+        peer = await it.__anext__()
+        await other.send(msg)
+        assert (await peer.recv()).payload.get('t') == 'x' * 100
+    await it.aclose()
+    with pytest.raises(ConnectionRefusedError):
+        await client_from_url("mem://lobby").open()
+
+
+@pytest.mark.asyncio
+async def test_memory_transport_queue():
+    acceptor = MemoryAcceptor("queue", skip_codec=True)
+    it = acceptor.__aiter__()
+    accepted = asyncio.ensure_future(it.__anext__())
+    await asyncio.sleep(0)
+
+    msg = Message(ControllerID.SYSTEM, SysAction.PING_PONG, SFSObject({'t': UtfString('x')}))
+    async with MemoryTransport("queue", skip_codec=True) as client:
+        server = await accepted
+        await client.send_many([msg, msg])
+        assert client.write_buffer_size == 2 * MESSAGE_SIZE
+        await server.recv()
+        await server.recv()
+        assert client.write_buffer_size == 0
+
+        readers = [asyncio.ensure_future(server.recv()) for _ in range(3)]
+        await asyncio.sleep(0)
+        readers[0].cancel()
+        await client.send_many([msg, msg])
+        assert await asyncio.wait_for(asyncio.gather(*readers[1:]), 1) == [msg, msg]
+    await it.aclose()
+
+
+@pytest.mark.asyncio
+async def test_memory_channel_drain_cancel():
+    channel = _Channel(max_pending=2)
+    channel.put(b"a")
+    channel.put(b"b")
+    writers = [asyncio.ensure_future(channel.drain()) for _ in range(3)]
+    await asyncio.sleep(0)
+    writers[0].cancel()
+    await asyncio.sleep(0)
+
+    assert await channel.get() == b"a"  # wakes the rest of the writers
+    await asyncio.wait_for(asyncio.gather(*writers[1:]), 1)
+    assert writers[0].cancelled()
+
+    channel.put(b"c")
+    late = [asyncio.ensure_future(channel.drain()) for _ in range(2)]
+    await asyncio.sleep(0)
+    late[0].cancel()
+    channel.close()
+    with pytest.raises(ConnectionError):
+        await late[1]
+    assert await channel.get() == b"b"
+
+
+async def _start_acceptor(url):
+    """Start acceptor on ``url``, return its generator and future of the first connection."""
+    it = server_from_url(url, encryption_key=b'mega_secured_key').__aiter__()
+    accepted = asyncio.ensure_future(it.__anext__())
+    await asyncio.sleep(0.05)
+    return it, accepted
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("abstract", [
+    False,
+    pytest.param(True, marks=pytest.mark.skipif(not sys.platform.startswith("linux"), reason="abstract namespace is Linux-only")),
+])
+async def test_unix_transport(tmp_path, abstract):
+    url = f"unix://@sfs2x-test-{os.getpid()}" if abstract else f"unix://{tmp_path}/sfs.sock"
+    it, accepted = await _start_acceptor(url)
+
+    msg = Message(ControllerID.SYSTEM, SysAction.PING_PONG, SFSObject({'t': UtfString('unix')}))
+    async with client_from_url(url, encryption_key=b'mega_secured_key') as client:
+        server = await accepted
+        await client.send(msg)
+        assert (await server.recv()).payload.get('t') == 'unix'
+        await server.send(msg)
+        assert (await client.recv()).payload.get('t') == 'unix'
+
+    await it.aclose()
+    assert not (tmp_path / "sfs.sock").exists()
+
+
+@pytest.mark.asyncio
+async def test_max_frame_size_option(tmp_path):
+    url = f"unix://{tmp_path}/sfs.sock"
+    it = server_from_url(url, max_frame_size=0x800000).__aiter__()
+    accepted = asyncio.ensure_future(it.__anext__())
+    await asyncio.sleep(0.05)
+
+    big = Message(ControllerID.SYSTEM, SysAction.PING_PONG, SFSObject({'t': Text('x' * 0x500000)}))
+    async with client_from_url(url, max_frame_size=1000) as client:
+        server = await accepted
+        await client.send(big)  # above the default 4 MB limit
+        assert len((await server.recv()).payload.get('t')) == 0x500000
+        await server.send(Message(ControllerID.SYSTEM, SysAction.PING_PONG, SFSObject({'t': Text('x' * 2000)})))
+        with pytest.raises(ProtocolError):
+            await client.recv()
+    await it.aclose()
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not hasattr(socket, "SO_PEERCRED"), reason="SO_PEERCRED is not supported")
+async def test_unix_peer_credentials(tmp_path):
+    url = f"unix://{tmp_path}/sfs.sock"
+    it, accepted = await _start_acceptor(url)
+    async with client_from_url(url) as client:
+        server = await accepted
+        assert server.peer_credentials.pid == os.getpid()
+        assert client.peer_credentials.uid == os.getuid()
+    await it.aclose()
+
+
+@pytest.mark.asyncio
+async def test_unix_acceptor_keeps_foreign_file(tmp_path):
+    path = tmp_path / "sfs.sock"
+    path.write_text("not a socket")
+
+    with pytest.raises(OSError):
+        await server_from_url(f"unix://{path}").__aiter__().__anext__()
+    assert path.read_text() == "not a socket"
+
+
+@pytest.mark.asyncio
+async def test_decode_offload_to_process_pool_with_dictionary():
+    key = b'mega_secured_key'
+    policy = Compression(threshold=100, zdict=b'player ' * 50)
+    protocol = FrameProtocol()
+    conn = TCPTransport("localhost", 0, encryption_key=key, compression=policy)
+    conn._protocol, conn._closed = protocol, False
+
+    msg = Message(ControllerID.SYSTEM, SysAction.PING_PONG, SFSObject({'t': Text('player ' * 30_000)}))
+    _feed(protocol, encode(msg, encryption_key=key, compression=policy))
+
+    with ProcessPoolExecutor(1) as pool:
+        conn.enable_decode_offload(threshold=100, executor=pool)
+        assert (await conn.recv()).payload.get('t') == 'player ' * 30_000
+
+
+@pytest.mark.asyncio
+async def test_decode_offload_reconfigured_while_receiving():
+    protocol = FrameProtocol()
+    conn = TCPTransport("localhost", 0)
+    conn._protocol, conn._closed = protocol, False
+
+    conn.enable_decode_offload(threshold=100)
+    first = asyncio.ensure_future(conn.recv())
+    await asyncio.sleep(0)
+    conn.enable_decode_offload(threshold=1000)
+    second = asyncio.ensure_future(conn.recv())
+    await asyncio.sleep(0)
+
+    msgs = [Message(ControllerID.SYSTEM, SysAction.PING_PONG, SFSObject({'t': Text(str(i) * size)}))
+            for i, size in enumerate([100_000, 1])]
+    for msg in msgs:
+        _feed(protocol, encode(msg, compress_threshold=None))
+    received = await asyncio.wait_for(asyncio.gather(first, second), 5)
+    assert [m.payload.get('t') for m in received] == [m.payload.get('t') for m in msgs]